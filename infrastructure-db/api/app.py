@@ -2,30 +2,562 @@
 """
 Infrastructure API
 Flask API serving infrastructure data from SQLite database
+
+Requests borrow a read-only connection from a per-process pool and return it
+on teardown, so connects, PRAGMAs and the page cache survive across
+requests. Tuned through API_DB_POOL_SIZE (idle connections kept, 8),
+API_DB_BUSY_TIMEOUT_MS (5000), API_DB_MMAP_MB (64) and API_DB_CACHE_MB (16).
 """
 
 import os
+import sys
 import sqlite3
+import base64
+import gzip
+import hashlib
 import json
-from flask import Flask, jsonify, request, send_from_directory
+import queue
+import re
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Flask, Response, g, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from pathlib import Path
 
+# Optional speedups: orjson serializes responses, brotli adds `br` encoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# metrics.py is shared with the discovery scripts (deployed next to app.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'discovery'))
+import metrics
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON through orjson; types orjson lacks go through Flask's default()"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 app = Flask(__name__, static_folder='static')
-CORS(app)  # Enable CORS for all routes
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+CORS(app, expose_headers=['X-Next-Cursor'])  # Enable CORS for all routes
+
+# Responses at least this large are compressed when the client accepts it
+COMPRESS_MIN_BYTES = int(os.getenv('API_COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_MIMETYPES = ('application/json', 'text/plain', 'text/html')
+
+# Color codes in the scraper's output
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
 
 # Database path
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'infrastructure.db')
 
+# Request metrics, labelled by route pattern (e.g. /api/host/<hostname>)
+API_REQUESTS = metrics.Counter('infra_api_requests_total', 'API requests by route, method and status',
+                               ['endpoint', 'method', 'status'])
+API_REQUEST_SECONDS = metrics.Histogram('infra_api_request_duration_seconds', 'API request latency by route',
+                                        ['endpoint'], buckets=metrics.FAST_BUCKETS)
+REFRESH_JOBS = metrics.Counter('infra_api_refresh_jobs_total', 'Refresh jobs run by this API process, by outcome',
+                               ['status'])
+API_DB_CONNECTIONS = metrics.Counter('infra_api_db_connections_total', 'SQLite connections opened by the API (pool misses)')
+metrics.Gauge('infra_db_size_bytes', 'Database file size including the WAL',
+              callback=lambda: metrics.sqlite_size_bytes(DB_PATH))
+
+class ConnectionPool:
+    """Read-only SQLite connections reused across requests (one pool per worker process)
+
+    Connections are opened on demand, so a burst can borrow more than `size`;
+    only `size` are kept idle afterwards. Each one gets its PRAGMAs once:
+    WAL (the sync writer's mode, so readers never block it), a busy timeout
+    instead of immediate "database is locked" during checkpoints, memory-mapped
+    reads, a larger page cache, and query_only so a stray write fails.
+    """
+
+    def __init__(self, db_path, size=8, busy_timeout_ms=5000, mmap_mb=64, cache_mb=16):
+        self.db_path = db_path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.mmap_mb = mmap_mb
+        self.cache_mb = cache_mb
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def connect(self):
+        """A new connection with the pool's PRAGMAs (not tracked by the pool)"""
+        API_DB_CONNECTIONS.inc()
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_mb) * 1024 * 1024}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_mb) * 1024}")
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def acquire(self):
+        """An idle connection, or a new one"""
+        with self._lock:
+            # Connections inherited from the parent across a (pre)fork are not ours to use
+            if self._pid != os.getpid():
+                self._idle, self._pid = [], os.getpid()
+            conn = self._idle.pop() if self._idle else None
+        return conn if conn is not None else self.connect()
+
+    def release(self, conn):
+        """Return a connection (ending any read transaction left open), or close it if the pool is full"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if self._pid == os.getpid() and len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def idle(self):
+        return len(self._idle)
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+db_pool = ConnectionPool(
+    DB_PATH,
+    size=int(os.getenv('API_DB_POOL_SIZE', '8')),
+    busy_timeout_ms=int(os.getenv('API_DB_BUSY_TIMEOUT_MS', '5000')),
+    mmap_mb=int(os.getenv('API_DB_MMAP_MB', '64')),
+    cache_mb=int(os.getenv('API_DB_CACHE_MB', '16')),
+)
+metrics.Gauge('infra_api_db_pool_idle', 'Idle pooled SQLite connections in this API process',
+              callback=db_pool.idle)
+
+_schema_tables = (None, frozenset())
+
+def existing_tables(conn):
+    """Names of the tables and views in the database (migrations are applied by hand),
+    read again only when PRAGMA schema_version changes"""
+    global _schema_tables
+    schema = conn.execute("PRAGMA schema_version").fetchone()[0]
+    if schema != _schema_tables[0]:
+        names = conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
+        _schema_tables = (schema, frozenset(row[0] for row in names))
+    return _schema_tables[1]
+
+# What the Docker read queries use in place of a migration's table or view
+# that does not exist (the committed infrastructure.db has neither): the
+# inline columns before 005 moved them to content_blobs, and no usage rollup
+# before 002 (a LEFT JOIN on the stand-in matches nothing)
+SCHEMA_STANDINS = {
+    'v_docker_containers': 'docker_containers',
+    'docker_container_usage': """(SELECT NULL AS docker_container_id, NULL AS cpu_percent, NULL AS mem_usage_mb,
+        NULL AS mem_limit_mb, NULL AS mem_percent, NULL AS mem_max_mb, NULL AS sampled_at)""",
+}
+
+def schema_sql(conn, query):
+    """query with SCHEMA_STANDINS substituted for the names it uses that do not exist"""
+    tables = existing_tables(conn)
+    for name, standin in SCHEMA_STANDINS.items():
+        if name not in tables:
+            query = re.sub(rf'\b{name}\b', standin, query)
+    return query
+
+# Everything the inventory endpoints serve changes with one of these: audited
+# row changes, sync runs starting or finishing, the summary counts. All are
+# primary-key or single-row lookups. Alias -> (table it reads, subquery).
+DATA_VERSION_COLUMNS = {
+    'change_id': ('infrastructure_changes', "SELECT MAX(id) FROM infrastructure_changes"),
+    'changed_at': ('infrastructure_changes', "SELECT change_timestamp FROM infrastructure_changes ORDER BY id DESC LIMIT 1"),
+    'sync_run_id': ('sync_runs', "SELECT MAX(id) FROM sync_runs"),
+    'synced_at': ('sync_runs', "SELECT COALESCE(finished_at, started_at) FROM sync_runs ORDER BY id DESC LIMIT 1"),
+    'stats_at': ('inventory_stats', "SELECT updated_at FROM inventory_stats WHERE id = 1"),
+}
+
+def data_version_query(tables):
+    """DATA_VERSION_COLUMNS as one SELECT, NULL for columns whose table does not exist"""
+    columns = [
+        f"({subquery}) AS {alias}" if table in tables else f"NULL AS {alias}"
+        for alias, (table, subquery) in DATA_VERSION_COLUMNS.items()
+    ]
+    return f"SELECT {', '.join(columns)}"
+
+class DataVersion:
+    """ETag and Last-Modified for the current database contents
+
+    PRAGMA data_version on a dedicated connection changes whenever another
+    connection commits, so between writes the cached version is returned
+    without reading any table. After a write, the data version query is run
+    once and gives the same version in every worker process. That query is
+    built from the tables present, and rebuilt when the schema changes: a
+    database without migrations 007 (sync_runs) or 011 (inventory_stats)
+    is versioned by infrastructure_changes alone.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._conn = None
+        self._seen = None
+        self._tables = None
+        self._query = None
+        self._current = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def current(self):
+        """(etag, last_modified datetime or None)"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._conn, self._current, self._pid = None, None, os.getpid()
+            if self._conn is None:
+                self._conn = self.pool.connect()
+            seen = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._current is None or seen != self._seen:
+                # A migration applied by another connection also changes data_version
+                tables = existing_tables(self._conn)
+                if tables is not self._tables:
+                    missing = sorted({table for table, _ in DATA_VERSION_COLUMNS.values()} - tables)
+                    if missing:
+                        app.logger.warning(f"Versioning without {', '.join(missing)}: migrations not applied")
+                    self._query, self._tables = data_version_query(tables), tables
+                row = self._conn.execute(self._query).fetchone()
+                digest = hashlib.blake2b(repr(tuple(row)).encode(), digest_size=6).hexdigest()
+                etag = f"{row['change_id'] or 0}-{row['sync_run_id'] or 0}-{digest}"
+                stamps = [row[key] for key in ('changed_at', 'synced_at', 'stats_at') if row[key]]
+                last_modified = None
+                if stamps:
+                    last_modified = datetime.strptime(max(stamps)[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+                self._current, self._seen = (etag, last_modified), seen
+            return self._current
+
+data_version = DataVersion(db_pool)
+
+def conditional(view):
+    """Answer 304 Not Modified when the client has the current data version
+
+    Checked before the view runs, so an unchanged database costs no query.
+    ETags are weak: the same data may be sent with different encodings.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag, last_modified = data_version.current()
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = (last_modified is not None and request.if_modified_since is not None
+                            and last_modified <= request.if_modified_since)
+
+        response = Response(status=304) if not_modified else app.make_response(view(*args, **kwargs))
+        if response.status_code in (200, 304):
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Cacheable, but revalidated on every use
+            response.cache_control.no_cache = True
+        return response
+    return wrapper
+
 def get_db_connection():
-    """Create a database connection with row factory"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """The request's pooled read-only connection (returned to the pool on teardown)"""
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        db_pool.release(conn)
+
+# List endpoints: output field -> SQL expression (response order), the FROM
+# clause, fixed conditions, ?filter= parameters (comma-separated values
+# match any) and the keyset sort key: raw columns, unique together, in the
+# order of an index (migration 014) so a page is a seek, not a sort
+HOST_LIST = {
+    'columns': {
+        'id': 'h.id',
+        'hostname': 'h.hostname',
+        'host_type': 'h.host_type',
+        'management_ip': 'h.management_ip',
+        'status': 'h.status',
+        'cpu_cores': 'h.cpu_cores',
+        'total_ram_mb': 'h.total_ram_mb',
+        'vmid': 'h.vmid',
+        'criticality': 'h.criticality',
+        'purpose': 'h.purpose',
+        'container_type': 'pc.container_type',
+        'vm_type': 'pc.vm_type',
+        'os_type': 'pc.os_type',
+        'os_template': 'pc.os_template',
+        'unprivileged': 'pc.unprivileged',
+        'auto_start': 'pc.auto_start',
+        'parent_hostname': 'ph.hostname',
+    },
+    'from': """hosts h
+        LEFT JOIN proxmox_containers pc ON h.id = pc.host_id
+        LEFT JOIN hosts ph ON h.parent_host_id = ph.id""",
+    # Unary + keeps SQLite off idx_hosts_type (this matches nearly every
+    # host) so it walks idx_hosts_vmid in order
+    'where': ["+h.host_type IN ('lxc', 'vm', 'physical')"],
+    'filters': {'host_type': 'h.host_type', 'status': 'h.status'},
+    'order': ['h.vmid', 'h.hostname', 'h.id'],
+}
+
+CONTAINER_LIST = {
+    'columns': {
+        'id': 'dc.id',
+        'container_name': 'dc.container_name',
+        'image': 'dc.image',
+        'image_tag': 'dc.image_tag',
+        'status': 'dc.status',
+        'health_status': 'dc.health_status',
+        'ports': 'dc.ports',
+        'networks': 'dc.networks',
+        'docker_host': 'h.hostname',
+        'host_ip': 'h.management_ip',
+        'docker_host_id': 'h.id',
+        'cpu_percent': 'u.cpu_percent',
+        'mem_usage_mb': 'u.mem_usage_mb',
+        'mem_limit_mb': 'u.mem_limit_mb',
+        'mem_percent': 'u.mem_percent',
+        'mem_max_mb': 'u.mem_max_mb',
+        'stats_sampled_at': 'u.sampled_at',
+    },
+    # CROSS JOIN fixes the loop order: hosts by hostname, then each host's
+    # containers by name (both UNIQUE indexes), so no sort
+    'from': """hosts h
+        CROSS JOIN v_docker_containers dc ON dc.docker_host_id = h.id
+        LEFT JOIN docker_container_usage u ON u.docker_container_id = dc.id""",
+    'where': [],
+    'filters': {'status': 'dc.status', 'health_status': 'dc.health_status', 'docker_host': 'h.hostname'},
+    'order': ['h.hostname', 'dc.container_name', 'dc.id'],
+}
+
+TOPOLOGY_LIST = {
+    'columns': {
+        'network_name': 'n.network_name',
+        'cidr': 'n.cidr',
+        'vlan_id': 'n.vlan_id',
+        'gateway': 'n.gateway',
+        'security_zone': 'n.security_zone',
+        'hostname': 'h.hostname',
+        'host_type': 'h.host_type',
+        'interface_name': 'ni.interface_name',
+        'ip_address': 'ip.ip_address',
+    },
+    'from': """networks n
+        LEFT JOIN ip_addresses ip ON ip.network_id = n.id
+        LEFT JOIN hosts h ON ip.host_id = h.id
+        LEFT JOIN network_interfaces ni ON ip.interface_id = ni.id""",
+    'where': [],
+    'filters': {'vlan_id': 'n.vlan_id', 'host_type': 'h.host_type'},
+    # Networks by idx_networks_vlan, each network's addresses by idx_ip_network_address
+    'order': ['n.vlan_id', 'n.id', 'ip.ip_address', 'ip.id'],
+}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+class BadQuery(ValueError):
+    """Invalid list parameters (answered with 400)"""
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).rstrip(b'=').decode()
+
+def decode_cursor(cursor, size):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise BadQuery('Invalid cursor')
+    if not isinstance(key, list) or len(key) != size:
+        raise BadQuery('Invalid cursor')
+    return key
+
+def keyset_after(order, key):
+    """WHERE clause and parameters for the rows sorting after key in ORDER BY order
+
+    A row value comparison is NULL when a column is, so the clause is built
+    a column at a time: equal (IS) on the leading columns and after on the
+    next one, where after a NULL (first in SQLite's order) is IS NOT NULL.
+    A non-NULL first value also bounds the first column, for the index seek.
+    """
+    clause, params = None, []
+    for expression, value in reversed(list(zip(order, key))):
+        if value is None:
+            after, after_params = f"{expression} IS NOT NULL", []
+        else:
+            after, after_params = f"{expression} > ?", [value]
+        if clause is not None:
+            after = f"{after} OR ({expression} IS ? AND ({clause}))"
+            after_params += [value] + params
+        clause, params = after, after_params
+    if key[0] is not None:
+        return f"{order[0]} >= ? AND ({clause})", [key[0]] + params
+    return f"({clause})", params
+
+def list_rows(conn, spec):
+    """Rows of a list endpoint for the request's ?fields=, filters and page
+
+    Without ?limit= or ?cursor= every row is returned (the original
+    behaviour). With them, rows come in pages of `limit` after the cursor's
+    sort key; the second return value is the cursor of the next page, or
+    None on the last one.
+    """
+    args = request.args
+    columns = spec['columns']
+
+    fields = list(columns)
+    if args.get('fields'):
+        fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise BadQuery(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(columns)})")
+
+    where = list(spec['where'])
+    params = []
+    for name, expression in spec['filters'].items():
+        if name in args:
+            values = args[name].split(',')
+            where.append(f"{expression} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+    order = spec['order']
+    paged = 'limit' in args or 'cursor' in args
+    if paged:
+        limit = args.get('limit', str(DEFAULT_PAGE_SIZE))
+        limit = int(limit) if limit.isdigit() else 0
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise BadQuery(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        if args.get('cursor'):
+            clause, key_params = keyset_after(order, decode_cursor(args['cursor'], len(order)))
+            where.append(clause)
+            params.extend(key_params)
+
+    select = [f"{columns[field]} AS {field}" for field in fields]
+    select += [f"{expression} AS _key{index}" for index, expression in enumerate(order)]
+    query = f"SELECT {', '.join(select)} FROM {spec['from']}"
+    if where:
+        query += f" WHERE {' AND '.join(where)}"
+    query += f" ORDER BY {', '.join(order)}"
+    if paged:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+
+    rows = conn.execute(schema_sql(conn, query), params).fetchall()
+    next_cursor = None
+    if paged and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][f"_key{index}"] for index in range(len(order))])
+
+    if JSON_COLUMNS.isdisjoint(fields):
+        return [{field: row[field] for field in fields} for row in rows], next_cursor
+    return [decode_json_columns({field: row[field] for field in fields}) for row in rows], next_cursor
+
+def list_response(rows, next_cursor):
+    """JSON array of rows, with X-Next-Cursor when there is a next page"""
+    response = jsonify(rows)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def spec_rows(conn, spec, ids=None):
+    """All rows of a list endpoint (all fields), or only those with the given ids"""
+    columns = spec['columns']
+    where = list(spec['where'])
+    if ids is not None:
+        where.append(f"{columns['id']} IN ({', '.join('?' * len(ids))})")
+    query = f"SELECT {', '.join(f'{expression} AS {field}' for field, expression in columns.items())} FROM {spec['from']}"
+    if where:
+        query += f" WHERE {' AND '.join(where)}"
+    query += f" ORDER BY {', '.join(spec['order'])}"
+    return [decode_json_columns(dict(row)) for row in conn.execute(schema_sql(conn, query), list(ids or ())).fetchall()]
+
+# TEXT columns holding JSON (schema comments), sent as real arrays/objects
+JSON_COLUMNS = frozenset({
+    'networks', 'ports', 'environment_vars', 'labels', 'options',
+    'network_interfaces', 'additional_disks', 'mount_points', 'network_config',
+    'bridge_ports', 'raid_members', 'dns_servers',
+})
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+def decode_json_columns(data):
+    """Replace JSON text in JSON_COLUMNS with its value (malformed text is left as is)"""
+    for key in JSON_COLUMNS.intersection(data):
+        value = data[key]
+        if isinstance(value, str):
+            try:
+                data[key] = json_loads(value)
+            except ValueError:
+                pass
+    return data
 
 def row_to_dict(row):
-    """Convert sqlite3.Row to dict"""
-    return dict(row) if row else None
+    """Convert sqlite3.Row to dict, decoding its JSON columns"""
+    return decode_json_columns(dict(row)) if row else None
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    """Count the request and observe its latency under its route pattern"""
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    API_REQUESTS.labels(endpoint, request.method, response.status_code).inc()
+    start = g.get('request_start')
+    if start is not None:
+        API_REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """gzip or brotli (when installed) for large responses, as the client's Accept-Encoding prefers"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESS_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    if encoding == 'br':
+        # Quality 4: most of brotli's gain over gzip at gzip-like speed
+        response.set_data(brotli.compress(data, quality=4))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = encoding
+    return response
 
 @app.route('/')
 def index():
@@ -33,73 +565,21 @@ def index():
     return send_from_directory('static', 'index.html')
 
 @app.route('/api/hosts')
+@conditional
 def get_hosts():
-    """Get all hosts with LXC/VM information"""
+    """Get hosts with LXC/VM information (?host_type=, ?status=, ?fields=, ?limit=/?cursor=)"""
     conn = get_db_connection()
-
-    # Get hosts with their proxmox container details
-    query = """
-        SELECT
-            h.id,
-            h.hostname,
-            h.host_type,
-            h.management_ip,
-            h.status,
-            h.cpu_cores,
-            h.total_ram_mb,
-            h.vmid,
-            h.criticality,
-            h.purpose,
-            pc.container_type,
-            pc.vm_type,
-            pc.os_type,
-            pc.os_template,
-            pc.unprivileged,
-            pc.auto_start,
-            ph.hostname as parent_hostname
-        FROM hosts h
-        LEFT JOIN proxmox_containers pc ON h.id = pc.host_id
-        LEFT JOIN hosts ph ON h.parent_host_id = ph.id
-        WHERE h.host_type IN ('lxc', 'vm', 'physical')
-        ORDER BY h.vmid, h.hostname
-    """
-
-    cursor = conn.execute(query)
-    hosts = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-
-    return jsonify(hosts)
+    return list_response(*list_rows(conn, HOST_LIST))
 
 @app.route('/api/containers')
+@conditional
 def get_containers():
-    """Get all Docker containers with host information"""
+    """Get Docker containers with host information (?status=, ?health_status=, ?docker_host=, ?fields=, ?limit=/?cursor=)"""
     conn = get_db_connection()
-
-    query = """
-        SELECT
-            dc.id,
-            dc.container_name,
-            dc.image,
-            dc.image_tag,
-            dc.status,
-            dc.health_status,
-            dc.ports,
-            dc.networks,
-            h.hostname as docker_host,
-            h.management_ip as host_ip,
-            h.id as docker_host_id
-        FROM docker_containers dc
-        JOIN hosts h ON dc.docker_host_id = h.id
-        ORDER BY h.hostname, dc.container_name
-    """
-
-    cursor = conn.execute(query)
-    containers = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-
-    return jsonify(containers)
+    return list_response(*list_rows(conn, CONTAINER_LIST))
 
 @app.route('/api/containers/<int:host_id>')
+@conditional
 def get_containers_by_host(host_id):
     """Get Docker containers for a specific host"""
     conn = get_db_connection()
@@ -113,88 +593,158 @@ def get_containers_by_host(host_id):
             dc.status,
             dc.health_status,
             dc.ports,
-            dc.networks
-        FROM docker_containers dc
+            dc.networks,
+            u.cpu_percent,
+            u.mem_usage_mb,
+            u.mem_limit_mb,
+            u.mem_percent,
+            u.mem_max_mb,
+            u.sampled_at as stats_sampled_at
+        FROM v_docker_containers dc
+        LEFT JOIN docker_container_usage u ON u.docker_container_id = dc.id
         WHERE dc.docker_host_id = ?
         ORDER BY dc.container_name
     """
 
-    cursor = conn.execute(query, (host_id,))
+    cursor = conn.execute(schema_sql(conn, query), (host_id,))
     containers = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return jsonify(containers)
 
+@app.route('/api/container/<int:container_id>/stats')
+def get_container_stats(container_id):
+    """Get resource usage rollup and ring-buffer samples for a Docker container"""
+    conn = get_db_connection()
+
+    usage = conn.execute(
+        schema_sql(conn, "SELECT * FROM docker_container_usage WHERE docker_container_id = ?"),
+        (container_id,)
+    ).fetchone()
+
+    if not usage:
+        return jsonify({'error': 'No stats for container'}), 404
+
+    cursor = conn.execute(
+        """SELECT sample_seq, sampled_at, cpu_percent, mem_usage_mb, mem_percent,
+                  net_rx_bytes, net_tx_bytes, block_read_bytes, block_write_bytes, pids
+           FROM docker_container_stats
+           WHERE docker_container_id = ?
+           ORDER BY sample_seq""",
+        (container_id,)
+    )
+    samples = [row_to_dict(row) for row in cursor.fetchall()]
+
+    return jsonify({'usage': row_to_dict(usage), 'samples': samples})
+
 @app.route('/api/stats')
+@conditional
 def get_stats():
-    """Get infrastructure summary statistics"""
-    conn = get_db_connection()
+    """Get infrastructure summary statistics (one row kept current by triggers, migration 011)"""
+    return jsonify(read_stats(get_db_connection()))
 
-    stats = {}
+# The counts inventory_stats keeps, aggregated from the tables (as the original
+# /api/stats did; v_inventory_stats is the same query but needs migration 011)
+STATS_AGGREGATE_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM hosts) AS hosts_total,
+        (SELECT COUNT(*) FROM hosts WHERE host_type = 'physical') AS hosts_physical,
+        (SELECT COUNT(*) FROM hosts WHERE host_type = 'lxc' AND status = 'active') AS hosts_lxc_active,
+        (SELECT COUNT(*) FROM hosts WHERE host_type = 'vm' AND status = 'active') AS hosts_vm_active,
+        (SELECT COUNT(*) FROM docker_containers) AS docker_containers,
+        (SELECT COUNT(*) FROM docker_containers WHERE status = 'running') AS docker_running,
+        (SELECT COUNT(*) FROM docker_containers WHERE health_status = 'healthy') AS docker_healthy,
+        (SELECT COUNT(*) FROM docker_networks) AS docker_networks,
+        (SELECT COUNT(*) FROM services) AS services_total,
+        (SELECT COUNT(*) FROM services WHERE status = 'running' OR status = 'healthy') AS services_running,
+        (SELECT COUNT(*) FROM proxmox_containers) AS proxmox_containers,
+        (SELECT COUNT(*) FROM proxmox_containers WHERE container_type = 'lxc') AS proxmox_lxc,
+        (SELECT COUNT(*) FROM proxmox_containers WHERE container_type = 'vm') AS proxmox_vm
+"""
 
-    # Host counts by type
-    stats['hosts'] = {
-        'total': conn.execute("SELECT COUNT(*) FROM hosts").fetchone()[0],
-        'physical': conn.execute("SELECT COUNT(*) FROM hosts WHERE host_type = 'physical'").fetchone()[0],
-        'lxc': conn.execute("SELECT COUNT(*) FROM hosts WHERE host_type = 'lxc' AND status = 'active'").fetchone()[0],
-        'vm': conn.execute("SELECT COUNT(*) FROM hosts WHERE host_type = 'vm' AND status = 'active'").fetchone()[0],
-    }
+def read_stats(conn):
+    """The /api/stats body"""
+    return stats_from_row(stats_row(conn, existing_tables(conn)))
 
-    # Docker counts
-    stats['docker'] = {
-        'containers': conn.execute("SELECT COUNT(*) FROM docker_containers").fetchone()[0],
-        'running': conn.execute("SELECT COUNT(*) FROM docker_containers WHERE status = 'running'").fetchone()[0],
-        'healthy': conn.execute("SELECT COUNT(*) FROM docker_containers WHERE health_status = 'healthy'").fetchone()[0],
-        'networks': conn.execute("SELECT COUNT(*) FROM docker_networks").fetchone()[0],
-    }
+def stats_row(conn, tables):
+    """The inventory_stats row, or the same counts aggregated when the table
+    (migration 011 not applied) or its row (deleted by hand) is missing"""
+    row = None
+    if 'inventory_stats' in tables:
+        row = conn.execute("SELECT * FROM inventory_stats WHERE id = 1").fetchone()
+    if row is None:
+        row = conn.execute(STATS_AGGREGATE_QUERY).fetchone()
+    return row
 
-    # Service counts
-    stats['services'] = {
-        'total': conn.execute("SELECT COUNT(*) FROM services").fetchone()[0],
-        'running': conn.execute("SELECT COUNT(*) FROM services WHERE status = 'running' OR status = 'healthy'").fetchone()[0],
+def stats_from_row(row):
+    """Shape an inventory_stats / STATS_AGGREGATE_QUERY row like the original /api/stats response"""
+    return {
+        'hosts': {
+            'total': row['hosts_total'],
+            'physical': row['hosts_physical'],
+            'lxc': row['hosts_lxc_active'],
+            'vm': row['hosts_vm_active'],
+        },
+        'docker': {
+            'containers': row['docker_containers'],
+            'running': row['docker_running'],
+            'healthy': row['docker_healthy'],
+            'networks': row['docker_networks'],
+        },
+        'services': {
+            'total': row['services_total'],
+            'running': row['services_running'],
+        },
+        'proxmox': {
+            'containers': row['proxmox_containers'],
+            'lxc': row['proxmox_lxc'],
+            'vm': row['proxmox_vm'],
+        },
     }
 
-    # Proxmox counts
-    stats['proxmox'] = {
-        'containers': conn.execute("SELECT COUNT(*) FROM proxmox_containers").fetchone()[0],
-        'lxc': conn.execute("SELECT COUNT(*) FROM proxmox_containers WHERE container_type = 'lxc'").fetchone()[0],
-        'vm': conn.execute("SELECT COUNT(*) FROM proxmox_containers WHERE container_type = 'vm'").fetchone()[0],
-    }
+# Serialized /api/dashboard body of the current data version, per process
+dashboard_cache = {'etag': None, 'body': None}
+dashboard_lock = threading.Lock()
 
-    conn.close()
+@app.route('/api/dashboard')
+@conditional
+def get_dashboard():
+    """Hosts, stats and containers for the dashboard's first paint, as one consistent snapshot
 
-    return jsonify(stats)
+    The three lists are read in one read transaction, with the latest change
+    id (pass it to /api/events?last_event_id= to get every change after the
+    snapshot). The serialized body is reused until the data version changes.
+    """
+    etag, _ = data_version.current()
+    with dashboard_lock:
+        if dashboard_cache['etag'] == etag:
+            return app.response_class(dashboard_cache['body'], mimetype='application/json')
 
-@app.route('/api/topology')
-def get_topology():
-    """Get network topology information"""
     conn = get_db_connection()
+    conn.execute("BEGIN")
+    try:
+        snapshot = {
+            'change_id': conn.execute("SELECT COALESCE(MAX(id), 0) FROM infrastructure_changes").fetchone()[0],
+            'hosts': spec_rows(conn, HOST_LIST),
+            'stats': read_stats(conn),
+            'containers': spec_rows(conn, CONTAINER_LIST),
+        }
+    finally:
+        conn.rollback()
 
-    query = """
-        SELECT
-            n.network_name,
-            n.cidr,
-            n.vlan_id,
-            n.gateway,
-            n.security_zone,
-            h.hostname,
-            h.host_type,
-            ni.interface_name,
-            ip.ip_address
-        FROM networks n
-        LEFT JOIN ip_addresses ip ON ip.network_id = n.id
-        LEFT JOIN hosts h ON ip.host_id = h.id
-        LEFT JOIN network_interfaces ni ON ip.interface_id = ni.id
-        ORDER BY n.vlan_id, ip.ip_address
-    """
-
-    cursor = conn.execute(query)
-    topology = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
+    body = app.json.dumps(snapshot)
+    with dashboard_lock:
+        dashboard_cache.update(etag=etag, body=body)
+    return app.response_class(body, mimetype='application/json')
 
-    return jsonify(topology)
+@app.route('/api/topology')
+@conditional
+def get_topology():
+    """Get network topology information (?vlan_id=, ?host_type=, ?fields=, ?limit=/?cursor=)"""
+    conn = get_db_connection()
+    return list_response(*list_rows(conn, TOPOLOGY_LIST))
 
 @app.route('/api/host/<hostname>')
+@conditional
 def get_host_detail(hostname):
     """Get detailed information about a specific host"""
     conn = get_db_connection()
@@ -206,7 +756,6 @@ def get_host_detail(hostname):
     ).fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Host not found'}), 404
 
     host_data = row_to_dict(host)
@@ -214,9 +763,9 @@ def get_host_detail(hostname):
     # Get Docker containers for this host
     if host_data['host_type'] == 'docker_host' or host_data.get('container_id'):
         cursor = conn.execute(
-            """SELECT * FROM docker_containers
+            schema_sql(conn, """SELECT * FROM v_docker_containers
                WHERE docker_host_id = ?
-               ORDER BY container_name""",
+               ORDER BY container_name"""),
             (host_data['id'],)
         )
         host_data['docker_containers'] = [row_to_dict(row) for row in cursor.fetchall()]
@@ -241,59 +790,495 @@ def get_host_detail(hostname):
         if pc:
             host_data['proxmox'] = row_to_dict(pc)
 
-    conn.close()
-
     return jsonify(host_data)
 
+@app.route('/api/sync-runs')
+def get_sync_runs():
+    """Get recent sync runs (?limit=, ?mode=full|docker|proxmox|network)"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    mode = request.args.get('mode')
+
+    conn = get_db_connection()
+    query = "SELECT * FROM sync_runs"
+    params = []
+    if mode:
+        query += " WHERE mode = ?"
+        params.append(mode)
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+
+    runs = [row_to_dict(row) for row in conn.execute(query, params).fetchall()]
+
+    return jsonify(runs)
+
+@app.route('/api/sync-runs/<int:run_id>')
+def get_sync_run(run_id):
+    """Get one sync run with its source and per-host phases"""
+    conn = get_db_connection()
+
+    run = conn.execute("SELECT * FROM sync_runs WHERE id = ?", (run_id,)).fetchone()
+    if not run:
+        return jsonify({'error': 'Sync run not found'}), 404
+
+    cursor = conn.execute(
+        """SELECT * FROM sync_run_phases
+           WHERE sync_run_id = ?
+           ORDER BY source, target IS NOT NULL, duration_s DESC""",
+        (run_id,)
+    )
+    run_data = row_to_dict(run)
+    run_data['phases'] = [row_to_dict(row) for row in cursor.fetchall()]
+
+    return jsonify(run_data)
+
+@app.route('/api/sync-runs/trends')
+def get_sync_trends():
+    """Get daily sync duration trend and per-host timings (last 7 days)"""
+    conn = get_db_connection()
+    daily = [row_to_dict(row) for row in conn.execute("SELECT * FROM v_sync_daily LIMIT 60").fetchall()]
+    targets = [row_to_dict(row) for row in conn.execute("SELECT * FROM v_sync_target_timings").fetchall()]
+
+    return jsonify({'daily': daily, 'targets': targets})
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
     try:
         conn = get_db_connection()
         conn.execute("SELECT 1")
-        conn.close()
         return jsonify({'status': 'healthy', 'database': 'connected'})
     except Exception as e:
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
 
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus metrics (request counts/latency per route, database size)"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+class JobOutput:
+    """Captured output of a running job: the tail of the text and the progress parsed from it"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.lines = deque()
+        self.size = 0
+        self.step = None
+        self.items_done = 0
+        self._lock = threading.Lock()
+
+    def add(self, line):
+        line = ANSI_ESCAPE.sub('', line)
+        with self._lock:
+            self.lines.append(line)
+            self.size += len(line)
+            while self.size > self.max_bytes and len(self.lines) > 1:
+                self.size -= len(self.lines.popleft())
+            # scrape_pve2.sh: "[INFO] Scraping VMs...", "  → VM: name (VMID: ...)"
+            if line.startswith(('[INFO]', '[OK]', '[ERROR]')):
+                self.step = line.split(']', 1)[1].strip()
+            elif line.lstrip().startswith('→'):
+                self.items_done += 1
+
+    def snapshot(self):
+        with self._lock:
+            return self.step, self.items_done, ''.join(self.lines)
+
+class RefreshJobs:
+    """Refresh runs of scrape_pve2.sh, at most one at a time across all API processes
+
+    A job is a refresh_jobs row (migration 012). The unique index on running
+    rows makes concurrent requests, from any worker process, join the job
+    already running. The process that created the row runs the script in a
+    background thread and writes progress, output and a heartbeat every
+    second. A running job without a heartbeat for STALE_SECONDS belonged to a
+    process that died, and is failed by the next request.
+    """
+
+    FLUSH_SECONDS = 1.0
+    STALE_SECONDS = 60
+
+    def __init__(self, db_path, script, timeout=300, output_kb=64):
+        self.db_path = db_path
+        self.script = script
+        self.timeout = timeout
+        self.output_bytes = output_kb * 1024
+
+    def connect(self):
+        """A writable connection (pooled request connections are query_only)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self):
+        """(job id, coalesced): the running job, or a new one started in this process"""
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(
+                    """UPDATE refresh_jobs
+                       SET status = 'failed', error = 'API process stopped sending heartbeats',
+                           finished_at = CURRENT_TIMESTAMP
+                       WHERE status = 'running' AND heartbeat_at < datetime('now', ?)""",
+                    (f"-{self.STALE_SECONDS} seconds",)
+                )
+                try:
+                    job_id = conn.execute(
+                        "INSERT INTO refresh_jobs (status, command, pid) VALUES ('running', ?, ?)",
+                        (f"bash {self.script}", os.getpid())
+                    ).lastrowid
+                    coalesced = False
+                except sqlite3.IntegrityError:
+                    job_id = conn.execute("SELECT id FROM refresh_jobs WHERE status = 'running'").fetchone()[0]
+                    conn.execute("UPDATE refresh_jobs SET requests = requests + 1 WHERE id = ?", (job_id,))
+                    coalesced = True
+        finally:
+            conn.close()
+
+        if not coalesced:
+            threading.Thread(target=self._run, args=(job_id,), name=f"refresh-job-{job_id}", daemon=True).start()
+        return job_id, coalesced
+
+    def _run(self, job_id):
+        output = JobOutput(self.output_bytes)
+        started = time.monotonic()
+        status, exit_code, error = 'failed', None, None
+        try:
+            # Own process group, so a timeout also kills the script's ssh/sqlite3 children
+            proc = subprocess.Popen(['bash', self.script], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    text=True, errors='replace', start_new_session=True)
+            reader = threading.Thread(target=lambda: [output.add(line) for line in proc.stdout], daemon=True)
+            reader.start()
+            while exit_code is None:
+                try:
+                    exit_code = proc.wait(timeout=self.FLUSH_SECONDS)
+                except subprocess.TimeoutExpired:
+                    if time.monotonic() - started > self.timeout:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                        proc.wait()
+                        status, error = 'timeout', f"Refresh timed out after {self.timeout}s"
+                        break
+                    self._update(job_id, output, started)
+            reader.join(timeout=5)
+            if status != 'timeout':
+                status = 'success' if exit_code == 0 else 'failed'
+                error = None if exit_code == 0 else f"Scraper exited with status {exit_code}"
+        except Exception as e:
+            error = str(e)
+            app.logger.exception(f"Refresh job {job_id} failed")
+        finally:
+            REFRESH_JOBS.labels(status).inc()
+            self._update(job_id, output, started, status=status, exit_code=exit_code, error=error)
+
+    def _update(self, job_id, output, started, status='running', exit_code=None, error=None):
+        step, items_done, text = output.snapshot()
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(
+                    """UPDATE refresh_jobs
+                       SET status = ?, step = ?, items_done = ?, output = ?, exit_code = ?, error = ?,
+                           duration_s = ?, heartbeat_at = CURRENT_TIMESTAMP,
+                           finished_at = CASE WHEN ? = 'running' THEN NULL ELSE CURRENT_TIMESTAMP END
+                       WHERE id = ?""",
+                    (status, step, items_done, text, exit_code, error,
+                     round(time.monotonic() - started, 3), status, job_id)
+                )
+        except sqlite3.Error as e:
+            app.logger.warning(f"Could not record progress of refresh job {job_id}: {e}")
+        finally:
+            conn.close()
+
+refresh_jobs = RefreshJobs(
+    DB_PATH,
+    os.getenv('API_REFRESH_SCRIPT', os.path.join(os.path.dirname(__file__), '..', 'scrape_pve2.sh')),
+    timeout=int(os.getenv('API_REFRESH_TIMEOUT', '300')),
+    output_kb=int(os.getenv('API_REFRESH_OUTPUT_KB', '64')),
+)
+
 @app.route('/api/refresh', methods=['POST'])
 def refresh_data():
-    """Trigger infrastructure database refresh from PVE2"""
-    import subprocess
-    import os
+    """Start a refresh from PVE2, or join the one running; poll /api/jobs/<id> for the result"""
+    if not os.path.exists(refresh_jobs.script):
+        return jsonify({'error': 'Scraper script not found'}), 404
 
-    script_path = os.path.join(os.path.dirname(__file__), '..', 'scrape_pve2.sh')
+    job_id, coalesced = refresh_jobs.submit()
+    response = jsonify({
+        'job_id': job_id,
+        'status': 'running',
+        'coalesced': coalesced,
+        'url': f"/api/jobs/{job_id}",
+    })
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job_id}"
+    return response
 
-    if not os.path.exists(script_path):
-        return jsonify({'error': 'Scraper script not found'}), 404
+@app.route('/api/jobs')
+def get_jobs():
+    """Recent refresh jobs without their output (?limit=)"""
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    conn = get_db_connection()
+    jobs = [row_to_dict(row) for row in conn.execute(
+        """SELECT id, status, requests, step, items_done, exit_code, error,
+                  created_at, heartbeat_at, finished_at, duration_s
+           FROM refresh_jobs ORDER BY id DESC LIMIT ?""", (limit,)
+    ).fetchall()]
+
+    return jsonify(jobs)
+
+@app.route('/api/jobs/<int:job_id>')
+def get_job(job_id):
+    """Refresh job status, progress, timing and captured output"""
+    conn = get_db_connection()
+    job = conn.execute("SELECT * FROM refresh_jobs WHERE id = ?", (job_id,)).fetchone()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify(row_to_dict(job))
+
+class EventBroker:
+    """Inventory change events for /api/events, one database poll per API process
+
+    A single thread polls while clients are connected: PRAGMA data_version
+    each interval, and only after a commit, one read transaction for new
+    infrastructure_changes rows, sync runs and refresh jobs that finished,
+    and the summary counts. Events are put on every client's queue. A
+    client too slow to keep up gets a `reset` (reload everything) instead of
+    an unbounded backlog.
+    """
+
+    # Audited entity -> (list spec, event key); proxmox_container changes update their host's row
+    ENTITY_LISTS = {'host': (HOST_LIST, 'hosts'), 'docker_container': (CONTAINER_LIST, 'containers')}
+
+    def __init__(self, pool, interval=1.0, queue_size=100, replay_limit=500):
+        self.pool = pool
+        self.interval = interval
+        self.queue_size = queue_size
+        self.replay_limit = replay_limit
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._state = None
+
+    def subscribe(self):
+        """(queue, change id the client is current with): events after that id arrive on the queue"""
+        subscription = queue.Queue(self.queue_size)
+        with self._lock:
+            if self._thread is None:
+                # Fresh state on (re)start: changes made while nobody listened are not replayed
+                conn = self.pool.connect()
+                self._state = self._initial_state(conn)
+                self._thread = threading.Thread(target=self._run, args=(conn,), name='event-broker', daemon=True)
+                self._thread.start()
+            self._subscribers.add(subscription)
+            return subscription, self._state['change_id']
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscribers(self):
+        return len(self._subscribers)
 
+    def _initial_state(self, conn):
+        tables = existing_tables(conn)
+        return {
+            'change_id': conn.execute("SELECT COALESCE(MAX(id), 0) FROM infrastructure_changes").fetchone()[0],
+            'data_version': None,
+            'stats': None,
+            'sync_runs': self._unfinished(conn, 'sync_runs', tables),
+            'refresh_jobs': self._unfinished(conn, 'refresh_jobs', tables),
+        }
+
+    @staticmethod
+    def _unfinished(conn, table, tables):
+        """(max id, ids still running) of sync_runs / refresh_jobs; nothing if the table does not exist"""
+        if table not in tables:
+            return 0, set()
+        max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        running = {row[0] for row in conn.execute(f"SELECT id FROM {table} WHERE finished_at IS NULL")}
+        return max_id, running
+
+    def _run(self, conn):
+        try:
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        self._thread = None
+                        return
+                try:
+                    self._poll(conn)
+                except sqlite3.Error as e:
+                    app.logger.warning(f"Event poll failed: {e}")
+                time.sleep(self.interval)
+        finally:
+            conn.close()
+
+    def _poll(self, conn):
+        seen = conn.execute("PRAGMA data_version").fetchone()[0]
+        if seen == self._state['data_version']:
+            return
+
+        conn.execute("BEGIN")
+        try:
+            events = []
+            changes = conn.execute(
+                """SELECT id, change_type, entity_type, entity_id, description, change_timestamp
+                   FROM infrastructure_changes WHERE id > ? ORDER BY id LIMIT ?""",
+                (self._state['change_id'], self.replay_limit + 1)
+            ).fetchall()
+            if len(changes) > self.replay_limit:
+                change_id = conn.execute("SELECT MAX(id) FROM infrastructure_changes").fetchone()[0]
+                events.append(('reset', change_id, {'reason': 'too many changes'}))
+            elif changes:
+                change_id = changes[-1]['id']
+                events.append(('changes', change_id, self.change_event(conn, changes)))
+            else:
+                change_id = self._state['change_id']
+
+            # Re-read after every commit: the migrations may be applied while clients listen
+            tables = existing_tables(conn)
+            for table, event in (('sync_runs', 'sync'), ('refresh_jobs', 'refresh')):
+                if table in tables:
+                    finished, self._state[table] = self._finished(conn, table, *self._state[table])
+                    events.extend((event, None, row) for row in finished)
+
+            stats = stats_row(conn, tables)
+            if tuple(stats) != self._state['stats']:
+                if self._state['stats'] is not None:
+                    events.append(('stats', None, stats_from_row(stats)))
+                self._state['stats'] = tuple(stats)
+        finally:
+            conn.rollback()
+
+        with self._lock:
+            self._state['change_id'] = change_id
+            self._state['data_version'] = seen
+            for subscription in self._subscribers:
+                for event in events:
+                    self._put(subscription, event)
+
+    def _put(self, subscription, event):
+        try:
+            subscription.put_nowait(event)
+        except queue.Full:
+            # The client fell behind: drop its backlog, tell it to reload
+            while not subscription.empty():
+                try:
+                    subscription.get_nowait()
+                except queue.Empty:
+                    break
+            subscription.put_nowait(('reset', self._state['change_id'], {'reason': 'client too slow'}))
+
+    @staticmethod
+    def _finished(conn, table, max_id, running):
+        """Runs/jobs that finished since the last poll, and the new (max id, running ids)"""
+        ids = sorted(running)
+        rows = conn.execute(
+            f"SELECT * FROM {table} WHERE id > ? OR id IN ({', '.join('?' * len(ids))}) ORDER BY id",
+            [max_id] + ids
+        ).fetchall()
+        finished = []
+        for row in rows:
+            max_id = max(max_id, row['id'])
+            if row['finished_at'] is None:
+                running.add(row['id'])
+            else:
+                running.discard(row['id'])
+                finished.append({key: row[key] for key in row.keys() if key not in ('output', 'command', 'pid')})
+        return finished, (max_id, running)
+
+    def change_event(self, conn, changes):
+        """Payload of a `changes` event: the changes and the current list rows of what they touched
+
+        Ids that no longer match a list (deleted rows) are under `removed`.
+        """
+        ids = {'hosts': set(), 'containers': set()}
+        proxmox_ids = set()
+        for change in changes:
+            if change['entity_type'] in self.ENTITY_LISTS:
+                ids[self.ENTITY_LISTS[change['entity_type']][1]].add(change['entity_id'])
+            elif change['entity_type'] == 'proxmox_container':
+                proxmox_ids.add(change['entity_id'])
+        if proxmox_ids:
+            ids['hosts'].update(row[0] for row in conn.execute(
+                f"SELECT host_id FROM proxmox_containers WHERE id IN ({', '.join('?' * len(proxmox_ids))})",
+                list(proxmox_ids)
+            ) if row[0] is not None)
+
+        event = {'changes': [dict(change) for change in changes], 'removed': {}}
+        for spec, key in self.ENTITY_LISTS.values():
+            rows = spec_rows(conn, spec, ids[key]) if ids[key] else []
+            event[key] = rows
+            event['removed'][key] = sorted(ids[key] - {row['id'] for row in rows})
+        return event
+
+    def replay(self, conn, after, until):
+        """Events for a reconnecting client: changes after its Last-Event-ID up to `until`"""
+        changes = conn.execute(
+            """SELECT id, change_type, entity_type, entity_id, description, change_timestamp
+               FROM infrastructure_changes WHERE id > ? AND id <= ? ORDER BY id LIMIT ?""",
+            (after, until, self.replay_limit + 1)
+        ).fetchall()
+        if len(changes) > self.replay_limit:
+            return [('reset', until, {'reason': 'too many changes'})]
+        return [('changes', changes[-1]['id'], self.change_event(conn, changes))] if changes else []
+
+event_broker = EventBroker(
+    db_pool,
+    interval=float(os.getenv('API_EVENTS_POLL_SECONDS', '1')),
+    queue_size=int(os.getenv('API_EVENTS_QUEUE', '100')),
+    replay_limit=int(os.getenv('API_EVENTS_REPLAY', '500')),
+)
+metrics.Gauge('infra_api_event_clients', 'Clients connected to /api/events in this API process',
+              callback=event_broker.subscribers)
+
+EVENTS_KEEPALIVE_SECONDS = 15
+
+def format_event(event, event_id, data):
+    """One Server-Sent Events message"""
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"data: {app.json.dumps(data)}\n\n"
+
+@app.route('/api/events')
+def stream_events():
+    """Server-Sent Events: changes, sync, refresh, stats and reset events
+
+    Reconnecting clients send Last-Event-ID (EventSource does) and first get
+    the changes they missed.
+    """
+    subscription, change_id = event_broker.subscribe()
     try:
-        # Run the scraper script
-        result = subprocess.run(
-            ['bash', script_path],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
+        last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id', ''))
+        backlog = []
+        if last_event_id.isdigit() and int(last_event_id) < change_id:
+            backlog = event_broker.replay(get_db_connection(), int(last_event_id), change_id)
+    except Exception:
+        event_broker.unsubscribe(subscription)
+        raise
 
-        if result.returncode == 0:
-            return jsonify({
-                'status': 'success',
-                'message': 'Infrastructure database updated successfully',
-                'stdout': result.stdout
-            })
-        else:
-            return jsonify({
-                'status': 'error',
-                'message': 'Scraper script failed',
-                'stderr': result.stderr,
-                'stdout': result.stdout
-            }), 500
-
-    except subprocess.TimeoutExpired:
-        return jsonify({'status': 'error', 'message': 'Refresh timed out after 5 minutes'}), 504
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    def generate():
+        try:
+            yield "retry: 3000\n" + format_event('ready', change_id, {'change_id': change_id})
+            for event in backlog:
+                yield format_event(*event)
+            while True:
+                try:
+                    event = subscription.get(timeout=EVENTS_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(*event)
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.errorhandler(BadQuery)
+def bad_query(e):
+    return jsonify({'error': str(e)}), 400
 
 @app.errorhandler(404)
 def not_found(e):
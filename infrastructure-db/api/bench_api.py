@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+API Payload Benchmark
+Compares response size and serialization time of the list endpoints before
+(JSON columns as escaped text, stdlib json) and after (decoded columns,
+orjson when installed, gzip/brotli) against the local database
+
+Run it on a migrated database (schema.sql plus migrations/, as
+db_utils.create_database builds): on one without them, such as the
+committed infrastructure.db, /api/containers has no usage columns and its
+payload is not what production sends.
+
+Usage:
+    python bench_api.py                  # rows as stored
+    python bench_api.py --scale 20       # each endpoint's rows repeated 20x
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+
+import app as api
+
+ENDPOINTS = ('/api/hosts', '/api/containers', '/api/topology')
+
+
+def best_of(func, repeat: int) -> float:
+    """Best wall time of `repeat` calls, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def text_columns(rows):
+    """Rows as the API sent them before: JSON columns re-encoded as text"""
+    return [{key: json.dumps(value) if key in api.JSON_COLUMNS and value is not None else value
+             for key, value in row.items()} for row in rows]
+
+
+def benchmark(scale: int, repeat: int):
+    client = api.app.test_client()
+    serializer = 'orjson' if api.orjson is not None else 'json'
+    encodings = ['gzip'] + (['br'] if api.brotli is not None else [])
+
+    header = (f"{'endpoint':<16} {'rows':>6} {'before_B':>9} {'before_ms':>9} "
+              f"{'after_B':>9} {f'{serializer}_ms':>10}" + ''.join(f"{f'{enc}_B':>9}{f'{enc}_ms':>8}" for enc in encodings))
+    print(header)
+    print('-' * len(header))
+
+    for endpoint in ENDPOINTS:
+        response = client.get(endpoint)
+        if response.status_code != 200:
+            sys.exit(f"{endpoint}: HTTP {response.status_code}: {response.get_data(as_text=True)}")
+        rows = response.get_json() * scale
+        before = text_columns(rows)
+
+        # Before: Flask's default provider (stdlib json, sorted keys) on text columns
+        before_body = json.dumps(before, separators=(',', ':'), sort_keys=True).encode()
+        before_ms = best_of(lambda: json.dumps(before, separators=(',', ':'), sort_keys=True), repeat)
+
+        after_body = api.app.json.dumps(rows).encode()
+        with api.app.app_context():
+            after_ms = best_of(lambda: api.app.json.dumps(rows), repeat)
+
+        row = (f"{endpoint:<16} {len(rows):>6} {len(before_body):>9} {before_ms:>9.2f} "
+               f"{len(after_body):>9} {after_ms:>10.2f}")
+        for encoding in encodings:
+            if encoding == 'br':
+                compress = lambda: api.brotli.compress(after_body, quality=4)
+            else:
+                compress = lambda: gzip.compress(after_body, compresslevel=6)
+            row += f"{len(compress()):>9}{best_of(compress, repeat):>8.2f}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API payload size and serialization time')
+    parser.add_argument('--scale', type=int, default=1, help='Repeat each endpoint\'s rows N times')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per measurement (best is kept)')
+    args = parser.parse_args()
+    benchmark(max(1, args.scale), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -51,6 +51,7 @@ log_success "Directory created"
 log_info "Copying API files to npm-pve2..."
 scp /Users/jm/Codebase/internet-control/infrastructure-db/api/app.py root@192.168.1.121:$API_DIR/app.py
 scp /Users/jm/Codebase/internet-control/infrastructure-db/api/requirements.txt root@192.168.1.121:$API_DIR/requirements.txt
+scp /Users/jm/Codebase/internet-control/infrastructure-db/discovery/metrics.py root@192.168.1.121:$API_DIR/metrics.py
 cp /Users/jm/Codebase/internet-control/infrastructure-db/api/static/index.html /Users/jm/Codebase/internet-control/infrastructure-db/api/static/index.html
 scp /Users/jm/Codebase/internet-control/infrastructure-db/api/static/index.html root@192.168.1.121:$API_DIR/static/index.html
 log_success "Files copied"
@@ -135,6 +136,7 @@ echo "  • GET /api/containers - All Docker containers"
 echo "  • GET /api/stats - Summary statistics"
 echo "  • GET /api/topology - Network topology"
 echo "  • GET /api/host/<hostname> - Host details"
+echo "  • GET /metrics - Prometheus metrics"
 echo ""
 echo "Management:"
 echo "  • Stop: ssh root@192.168.1.121 systemctl stop $SERVICE_NAME"
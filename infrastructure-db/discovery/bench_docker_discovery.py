@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Docker Discovery Benchmark
+Runs DockerDiscovery.sync_docker_host() against the local stand-in host
+(synthetic or recorded) and reports wall time, remote exec count and DB writes
+
+Usage:
+    python bench_docker_discovery.py                         # 10, 100, 1000 containers
+    python bench_docker_discovery.py --sizes 50 --latency 0.02
+    python bench_docker_discovery.py --record root@192.168.1.20 --output omv.json
+    python bench_docker_discovery.py --replay omv.json
+    python bench_docker_discovery.py --replay omv.json --profile   # where the time goes, offline
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+from db_utils import InfrastructureDB, create_database
+from discover_docker import DockerDiscovery
+from docker_standin import FakeDockerHost, RecordingSSHClient
+from profiling import profile_run
+
+logger = logging.getLogger(__name__)
+
+STANDIN_IP = '127.0.0.42'
+
+
+def scratch_database(directory: str, host_ip: str = STANDIN_IP) -> InfrastructureDB:
+    """Create a migrated scratch database with one Docker host record"""
+    db_path = create_database(os.path.join(directory, 'bench.db'))
+    db = InfrastructureDB(db_path)
+    db.execute_update(
+        "INSERT INTO hosts (hostname, host_type, management_ip) VALUES (?, 'docker_host', ?)",
+        ('bench-docker', host_ip)
+    )
+    return db
+
+
+def run_sync(db: InfrastructureDB, docker_host: FakeDockerHost, host_ip: str = STANDIN_IP) -> Dict:
+    """Run one sync_docker_host() and return its measurements"""
+    discovery = DockerDiscovery(db, client_factory=docker_host.connect)
+    execs_before = docker_host.exec_count
+    connects_before = docker_host.connect_count
+    rows_before = db.rows_written
+    transactions_before = db.transactions
+
+    start = time.perf_counter()
+    discovery.sync_docker_host(host_ip)
+    wall = time.perf_counter() - start
+
+    return {
+        'wall_s': wall,
+        'remote_execs': docker_host.exec_count - execs_before,
+        'connections': docker_host.connect_count - connects_before,
+        'rows_written': db.rows_written - rows_before,
+        'transactions': db.transactions - transactions_before,
+    }
+
+
+def benchmark(sizes, latency: float, connect_latency: float, replay: Optional[str] = None):
+    """Benchmark cold (empty DB) and warm (unchanged re-sync) runs per host size"""
+    header = f"{'containers':>10} {'run':>5} {'wall_s':>8} {'execs':>6} {'conns':>6} {'rows':>7} {'txns':>6}"
+    print(header)
+    print('-' * len(header))
+
+    for size in sizes:
+        if replay:
+            docker_host = FakeDockerHost.from_recording(replay, latency, connect_latency)
+            label = os.path.basename(replay)
+        else:
+            docker_host = FakeDockerHost(size, latency, connect_latency)
+            label = str(size)
+
+        with tempfile.TemporaryDirectory() as directory:
+            db = scratch_database(directory)
+            for run in ('cold', 'warm'):
+                result = run_sync(db, docker_host)
+                print(f"{label:>10} {run:>5} {result['wall_s']:>8.3f} {result['remote_execs']:>6} "
+                      f"{result['connections']:>6} {result['rows_written']:>7} {result['transactions']:>6}")
+
+        if replay:
+            break
+
+
+def record(host_spec: str, key_path: Optional[str], output: str):
+    """Run a real sync against a scratch DB and record every command's output"""
+    username, host = host_spec.split('@') if '@' in host_spec else ('root', host_spec)
+    real = DockerDiscovery(None)
+    recorders = []
+
+    def factory(host, username, key_path):
+        client = RecordingSSHClient(real.connect_ssh(host, username, key_path))
+        recorders.append(client)
+        return client
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = scratch_database(directory, host_ip=host)
+        DockerDiscovery(db, client_factory=factory).sync_docker_host(host, username, key_path)
+
+    merged = RecordingSSHClient(None)
+    for recorder in recorders:
+        merged.commands.update(recorder.commands)
+    merged.save(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Docker discovery against a local stand-in host')
+    parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated container counts')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds per remote command')
+    parser.add_argument('--connect-latency', type=float, default=0.05, help='Seconds per SSH connection')
+    parser.add_argument('--replay', help='Serve a recording instead of synthetic data')
+    parser.add_argument('--record', metavar='USER@HOST', help='Record a real host for later replay')
+    parser.add_argument('--output', default='docker-recording.json', help='Recording output path')
+    parser.add_argument('--key', default=os.path.expanduser('~/.ssh/id_rsa'), help='SSH key for --record')
+    parser.add_argument('--profile', action='store_true',
+                        help='Sample the benchmark and write a profile report to the current directory')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger('profiling').setLevel(logging.INFO)
+
+    if args.record:
+        record(args.record, args.key, args.output)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    with profile_run('bench_profile', enabled=args.profile):
+        benchmark(sizes, args.latency, args.connect_latency, args.replay)
+
+
+if __name__ == '__main__':
+    main()
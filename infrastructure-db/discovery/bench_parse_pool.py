@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Parse Pool Benchmark
+Times decoding and normalizing a Docker collector stream inline and in
+ParsePool worker processes, per host size, and reports the crossover: the
+smallest stream where the pool beats parsing inline (set
+DOCKER_PARSE_THRESHOLD near it, DOCKER_PARSE_WORKERS to the winning size)
+
+Usage:
+    python bench_parse_pool.py                          # 100 .. 10000 containers, 1/2/4 workers
+    python bench_parse_pool.py --sizes 500,5000 --workers 2,8
+    python bench_parse_pool.py --replay omv.json         # a recorded host's stream
+"""
+
+import argparse
+import os
+import shlex
+import time
+from typing import List, Optional
+
+from discover_docker import load_collector_script, parse_collector_line
+from docker_standin import COLLECTOR_MARKER, FakeDockerHost
+from parse_pool import ParsePool, json_decoder
+
+
+def collector_lines(size: int, replay: Optional[str] = None) -> List[str]:
+    """The collector NDJSON a stand-in host of `size` containers streams"""
+    if replay:
+        recording = FakeDockerHost.from_recording(replay).recording
+        stdout = next((result.get('stdout', '') for command, result in recording.items()
+                       if COLLECTOR_MARKER in command), None)
+        if stdout is None:
+            raise RuntimeError(f"{replay} has no collector run")
+    else:
+        exit_status, stdout, stderr = FakeDockerHost(size).run(f"sh -c {shlex.quote(load_collector_script())}")
+        if exit_status != 0:
+            raise RuntimeError(f"Stand-in collector failed: {stderr}")
+    return stdout.splitlines(keepends=True)
+
+
+def timed(pool: ParsePool, lines: List[str], repeat: int) -> float:
+    """Best wall time of `repeat` full parses"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in pool.map(lines):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(sizes: List[int], workers: List[int], repeat: int, replay: Optional[str] = None):
+    print(f"Decoder: {json_decoder().__module__}, CPUs: {os.cpu_count()}")
+    header = f"{'containers':>10} {'lines':>7} {'inline_ms':>10}" + ''.join(
+        f"{f'{count}w_cold':>10}{f'{count}w_ms':>9}" for count in workers)
+    print(header)
+    print('-' * len(header))
+
+    inline = ParsePool(parse_collector_line)
+    crossover = None
+    for size in sizes:
+        lines = collector_lines(size, replay)
+        label = os.path.basename(replay) if replay else str(size)
+        inline_s = timed(inline, lines, repeat)
+        row = f"{label:>10} {len(lines):>7} {inline_s * 1000:>10.1f}"
+
+        for count in workers:
+            # Cold includes starting the worker processes; warm reuses them
+            pool = ParsePool(parse_collector_line, workers=count, threshold=0)
+            try:
+                cold_s = timed(pool, lines, 1)
+                warm_s = timed(pool, lines, repeat)
+            finally:
+                pool.close()
+            row += f"{cold_s * 1000:>10.1f}{warm_s * 1000:>9.1f}"
+            if crossover is None and warm_s < inline_s:
+                crossover = (len(lines), count)
+        print(row)
+
+        if replay:
+            break
+
+    print()
+    if crossover is None:
+        print("Crossover: none measured, parse inline (DOCKER_PARSE_WORKERS=0)")
+    else:
+        print(f"Crossover: {crossover[0]} lines with {crossover[1]} workers "
+              f"(DOCKER_PARSE_WORKERS={crossover[1]}, DOCKER_PARSE_THRESHOLD~{crossover[0]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Docker collector parse stage')
+    parser.add_argument('--sizes', default='100,1000,5000,10000', help='Comma-separated container counts')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated parse pool sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    parser.add_argument('--replay', help='Parse a recording instead of synthetic data')
+    args = parser.parse_args()
+
+    benchmark([int(size) for size in args.sizes.split(',') if size.strip()],
+              [int(count) for count in args.workers.split(',') if count.strip()],
+              args.repeat, args.replay)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Discovery Startup Benchmark
+Measures what each kind of run imports before it starts working, using
+`python -X importtime`, and fails when a run pulls in a heavy dependency it
+does not need or its import time exceeds the budget. Wall time (interpreter
+startup included) is reported, not checked: on a loaded machine it varies
+by more than the imports themselves take.
+
+Usage:
+    python bench_startup.py                 # all scenarios, exit 1 on a violation
+    python bench_startup.py --runs 10       # best of 10 per scenario
+    python bench_startup.py --scale 1.5     # loosen budgets on a slow machine
+"""
+
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+DISCOVERY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Heavy third-party/stdlib packages loaded lazily by the sources that need them
+HEAVY_MODULES = ('rich', 'paramiko', 'proxmoxer', 'requests', 'asyncio')
+
+# name -> (code run in a fresh interpreter, modules it may load, budget in ms)
+# Budgets are import time after interpreter startup (best of --runs), ~30%
+# over the slowest of repeated best-of-5 measurements: cli 44, docker 56,
+# proxmox 46, network 103, report 107 ms.
+SCENARIOS = {
+    # CLI start: argument parsing and configuration, before any source runs
+    'cli': (
+        "import sync_infrastructure; sync_infrastructure.load_config()",
+        (), 60,
+    ),
+    # Docker-only run (daemon docker job, `--source docker`) up to the SSH
+    # connect; paramiko loads with the first real connection
+    'docker': (
+        "import sync_infrastructure, discover_docker, circuit_breaker, concurrent.futures; "
+        "sync_infrastructure.load_config(); discover_docker.load_collector_script()",
+        (), 75,
+    ),
+    # Proxmox run up to the login; proxmoxer loads in ProxmoxDiscovery()
+    'proxmox': (
+        "import sync_infrastructure, discover_proxmox; sync_infrastructure.load_config()",
+        (), 60,
+    ),
+    # Network sweep: asyncio is the sweep itself
+    'network': (
+        "import sync_infrastructure, discover_network; sync_infrastructure.load_config()",
+        ('asyncio',), 135,
+    ),
+    # --report prints rich tables
+    'report': (
+        "import sync_infrastructure; from rich.table import Table; sync_infrastructure.console.get()",
+        ('rich',), 140,
+    ),
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[str]]:
+    """Total import time (ms, top-level imports after interpreter startup) and module names"""
+    total_us = 0
+    modules = []
+    started = False
+    for line in stderr.splitlines():
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        cumulative_us = int(fields[1])
+        name = fields[2][1:].rstrip()       # nested imports are indented by two spaces per level
+        modules.append(name.strip())
+        if name.startswith(' '):
+            continue
+        # Everything up to and including site is interpreter startup
+        if started:
+            total_us += cumulative_us
+        started = started or name == 'site'
+    return total_us / 1000, modules
+
+
+def run_scenario(code: str, runs: int) -> Dict:
+    """Best-of-N import time and wall time of code in a fresh interpreter
+
+    Wall time comes from separate runs without -X importtime, whose
+    reporting slows the imports down.
+    """
+    best_import = best_wall = float('inf')
+    modules: List[str] = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=DISCOVERY_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Scenario failed: {code}\n{result.stderr[-2000:]}")
+        import_ms, modules = parse_importtime(result.stderr)
+        best_import = min(best_import, import_ms)
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=DISCOVERY_DIR, check=True)
+        best_wall = min(best_wall, (time.perf_counter() - start) * 1000)
+    return {'import_ms': best_import, 'wall_ms': best_wall, 'modules': set(modules)}
+
+
+def interpreter_baseline(runs: int) -> float:
+    """Best-of-N wall time of an empty interpreter run (ms)"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check discovery startup import time against budgets')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per scenario (best is kept)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget (slow machines)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenario names')
+    args = parser.parse_args()
+
+    # Measure warm starts: byte-compile first (PYTHONDONTWRITEBYTECODE would
+    # otherwise make every run recompile the sources)
+    compileall.compile_dir(DISCOVERY_DIR, maxlevels=0, quiet=1)
+
+    baseline = interpreter_baseline(args.runs)
+    header = f"{'scenario':<10} {'import_ms':>10} {'budget_ms':>10} {'wall_ms':>8}  heavy modules"
+    print(header)
+    print('-' * len(header))
+
+    failures = []
+    for name in args.scenarios.split(','):
+        code, allowed, budget = SCENARIOS[name]
+        budget *= args.scale
+        result = run_scenario(code, args.runs)
+        heavy = sorted(module for module in HEAVY_MODULES
+                       if module in result['modules'] and module not in allowed)
+        loaded = sorted(module for module in HEAVY_MODULES if module in result['modules'])
+        print(f"{name:<10} {result['import_ms']:>10.1f} {budget:>10.0f} {result['wall_ms']:>8.1f}  "
+              f"{', '.join(loaded) or '-'}")
+
+        if heavy:
+            failures.append(f"{name}: imports {', '.join(heavy)}")
+        if result['import_ms'] > budget:
+            failures.append(f"{name}: {result['import_ms']:.1f}ms import time exceeds {budget:.0f}ms budget")
+
+    print(f"\nInterpreter baseline (python -c pass): {baseline:.1f}ms")
+    if failures:
+        print("\nBudget violations:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Discovery Target Circuit Breaker
+Tracks consecutive failures per target (e.g. Docker host) and skips targets
+that keep failing, with exponential backoff and a cheap TCP probe before
+they are tried again. State is persisted in target_health (migration 008).
+"""
+
+import logging
+import random
+import socket
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from db_utils import InfrastructureDB
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _format(moment: Optional[datetime]) -> Optional[str]:
+    return moment.strftime(TIMESTAMP_FORMAT) if moment else None
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+class CircuitOpenError(Exception):
+    """Raised by CircuitBreaker.check() for a target that is backed off"""
+
+
+def tcp_probe(host: str, port: int = 22, timeout: float = 1.0) -> Optional[str]:
+    """Try a TCP connect to host:port; returns None when reachable, else the error"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return None
+    except OSError as e:
+        return str(e) or e.__class__.__name__
+
+
+class CircuitBreaker:
+    """Per-target circuit breaker for one discovery source
+
+    A target is synced normally (closed) until it fails `threshold` times in
+    a row; the circuit then opens and the target is skipped without any
+    network I/O for a backoff that doubles with every further failure (from
+    `base_backoff` up to `max_backoff` seconds, ±10% jitter). Once the backoff
+    has passed, a TCP connect to `probe_port` decides whether the target is
+    synced again (half-open) or backed off further. One success closes the
+    circuit.
+    """
+
+    def __init__(self, db: InfrastructureDB, source: str, threshold: int = 3,
+                 base_backoff: float = 60, max_backoff: float = 3600,
+                 probe_port: int = 22, probe_timeout: float = 1.0):
+        self.db = db
+        self.source = source
+        self.threshold = max(1, threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.probe_port = probe_port
+        self.probe_timeout = probe_timeout
+        self.probe = tcp_probe
+
+        self._health: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+
+    def state(self, target: str) -> Dict:
+        """Current health record of a target (loaded from the database once)"""
+        with self._lock:
+            if self._health is None:
+                try:
+                    self._health = self.db.get_target_health(self.source)
+                except sqlite3.Error as e:
+                    logger.warning(f"Target health not loaded, starting with all circuits closed: {e}")
+                    self._health = {}
+            if target not in self._health:
+                self._health[target] = {
+                    'source': self.source, 'target': target, 'state': 'closed',
+                    'consecutive_failures': 0,
+                }
+            return self._health[target]
+
+    def check(self, target: str):
+        """Raise CircuitOpenError unless the target should be synced now
+
+        Open circuits within their backoff fail immediately; once it has
+        passed the target is probed, and a failed probe counts as a failure.
+        """
+        health = self.state(target)
+        if health['state'] != 'open':
+            return
+
+        next_attempt = _parse(health.get('next_attempt_at'))
+        now = _now()
+        if next_attempt is not None and now < next_attempt:
+            wait = int((next_attempt - now).total_seconds())
+            raise CircuitOpenError(f"circuit open after {health['consecutive_failures']} failures, "
+                                   f"next attempt in {wait}s")
+
+        error = self.probe(target, self.probe_port, self.probe_timeout)
+        if error is not None:
+            self.record_failure(target, f"probe of port {self.probe_port} failed: {error}")
+            raise CircuitOpenError(f"circuit open, probe failed: {error}")
+
+        logger.info(f"{self.source} target {target} answered the probe, trying a sync")
+        health['state'] = 'half_open'
+        self._save(health)
+
+    def record_success(self, target: str):
+        """Close the circuit of a target after a successful sync"""
+        health = self.state(target)
+        if health['state'] != 'closed':
+            logger.info(f"{self.source} target {target} recovered after "
+                        f"{health['consecutive_failures']} failures")
+        health.update(state='closed', consecutive_failures=0, last_error=None,
+                      last_success_at=_format(_now()), opened_at=None, next_attempt_at=None)
+        self._save(health)
+
+    def record_failure(self, target: str, error: str):
+        """Count a failure; opens (or extends) the circuit at the threshold"""
+        health = self.state(target)
+        now = _now()
+        failures = health['consecutive_failures'] + 1
+        health.update(consecutive_failures=failures, last_error=error, last_failure_at=_format(now))
+
+        if failures >= self.threshold:
+            doublings = min(failures - self.threshold, 32)
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** doublings)
+            backoff *= random.uniform(0.9, 1.1)
+            if not health.get('opened_at'):
+                health['opened_at'] = _format(now)
+                logger.warning(f"{self.source} target {target} failed {failures} times in a row, "
+                               f"backing off for {backoff:.0f}s")
+            health.update(state='open', next_attempt_at=_format(now + timedelta(seconds=backoff)))
+        self._save(health)
+
+    def _save(self, health: Dict):
+        try:
+            self.db.save_target_health(health)
+        except sqlite3.Error as e:
+            logger.warning(f"Target health for {health['target']} not saved: {e}")
@@ -5,14 +5,117 @@ Provides common database operations and change tracking
 """
 
 import sqlite3
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from contextlib import contextmanager
 
+import metrics
+
 logger = logging.getLogger(__name__)
 
+# Process-wide database metrics (exported by the sync daemon's /metrics)
+DB_TRANSACTIONS = metrics.Counter('infra_db_transactions_total',
+                                  'SQLite transactions by outcome', ['outcome'])
+DB_TRANSACTION_SECONDS = metrics.Histogram('infra_db_transaction_seconds',
+                                           'Wall time of a SQLite transaction, connect to commit',
+                                           buckets=metrics.FAST_BUCKETS)
+DB_STATEMENTS = metrics.Counter('infra_db_statements_total', 'SQL statements executed')
+DB_ROWS_WRITTEN = metrics.Counter('infra_db_rows_written_total', 'Rows changed by committed transactions')
+_DB_COMMITS = DB_TRANSACTIONS.labels('commit')
+_DB_ROLLBACKS = DB_TRANSACTIONS.labels('rollback')
+
+# Samples kept per container in docker_container_stats (24h of 5-minute syncs)
+STATS_RING_SIZE = 288
+
+# Mark-and-sweep configuration:
+# table -> (entity_type, scope column, key column, snapshot, description)
+# Rows whose last_seen_generation is older than the current sync are deleted
+SWEEP_TABLES = {
+    'docker_containers': (
+        'docker_container', 'docker_host_id', 'container_name',
+        "json_object('container_name', container_name, 'image', image, 'status', status)",
+        "'Container ' || container_name || ' no longer present'",
+    ),
+    'docker_volumes': (
+        'docker_volume', 'docker_host_id', 'volume_name',
+        "json_object('volume_name', volume_name, 'driver', driver)",
+        "'Volume ' || volume_name || ' no longer present'",
+    ),
+    'docker_networks': (
+        'docker_network', 'docker_host_id', 'network_name',
+        "json_object('network_name', network_name, 'driver', driver, 'subnet', subnet)",
+        "'Network ' || network_name || ' no longer present'",
+    ),
+    'docker_images': (
+        'docker_image', 'docker_host_id', 'image_id',
+        "json_object('image_id', image_id, 'repository', repository, 'tag', tag, 'size_bytes', size_bytes)",
+        "'Image ' || COALESCE(repository || ':' || tag, image_id) || ' no longer present'",
+    ),
+    'proxmox_containers': (
+        'proxmox_container', 'proxmox_host_id', 'vmid',
+        "json_object('vmid', vmid, 'container_type', container_type, 'host_id', host_id)",
+        "'Proxmox ' || container_type || ' ' || vmid || ' no longer present'",
+    ),
+}
+
+
+# Container columns stored in content_blobs: inline column -> hash column
+BLOB_COLUMNS = {
+    'environment_vars': 'environment_hash',
+    'labels': 'labels_hash',
+    'ports': 'ports_hash',
+    'networks': 'networks_hash',
+    'command': 'command_hash',
+}
+
+
+# Row outcome counters of the current thread, see InfrastructureDB.tally()
+_tally = threading.local()
+
+# Columns that change on every sync and do not count as an update
+BOOKKEEPING_COLUMNS = ('last_seen_generation',)
+
+
+def blob_hash(content: str) -> str:
+    """Content address of a blob (sha256 hex digest)"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def new_generation() -> int:
+    """Return a sync generation stamp (monotonic across runs, microsecond resolution)"""
+    return time.time_ns() // 1000
+
+
+def create_database(db_path: str) -> str:
+    """Create a new database from schema.sql and every migration, in order
+
+    Used for scratch databases (stand-in runs, benchmarks); the production
+    database is migrated by hand as described in each migration header.
+    """
+    import glob
+
+    base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    migrations = sorted(glob.glob(os.path.join(base_dir, 'migrations', '*.sql')))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with open(os.path.join(base_dir, 'schema.sql')) as f:
+            conn.executescript(f.read())
+        for migration in migrations:
+            with open(migration) as f:
+                conn.executescript(f.read())
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+
+    return db_path
+
 
 class InfrastructureDB:
     """SQLite database wrapper for infrastructure management"""
@@ -21,9 +124,13 @@ class InfrastructureDB:
         self.db_path = db_path
         self._ensure_database_exists()
 
+        # Write accounting (rows changed by committed transactions)
+        self.rows_written = 0
+        self.transactions = 0
+        self._stats_lock = threading.Lock()
+
     def _ensure_database_exists(self):
         """Ensure database file exists"""
-        import os
         if not os.path.exists(self.db_path):
             raise FileNotFoundError(
                 f"Database not found at {self.db_path}. "
@@ -33,20 +140,71 @@ class InfrastructureDB:
     @contextmanager
     def get_connection(self):
         """Context manager for database connections"""
+        start = time.perf_counter()
         conn = sqlite3.connect(self.db_path, timeout=30.0)  # 30 second timeout
         conn.row_factory = sqlite3.Row  # Enable column access by name
         conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign keys
         conn.execute("PRAGMA journal_mode = WAL")  # Enable WAL mode for better concurrency
         conn.execute("PRAGMA busy_timeout = 30000")  # 30 second busy timeout
+
+        statements = 0
+
+        def count_statement(sql):
+            nonlocal statements
+            statements += 1
+
+        conn.set_trace_callback(count_statement)
         try:
             yield conn
             conn.commit()
+            with self._stats_lock:
+                self.rows_written += conn.total_changes
+                self.transactions += 1
+            _DB_COMMITS.inc()
+            DB_ROWS_WRITTEN.inc(conn.total_changes)
         except Exception as e:
             conn.rollback()
+            _DB_ROLLBACKS.inc()
             logger.error(f"Database error: {e}")
             raise
         finally:
             conn.close()
+            DB_STATEMENTS.inc(statements)
+            DB_TRANSACTION_SECONDS.observe(time.perf_counter() - start)
+
+    @contextmanager
+    def tally(self):
+        """Count row outcomes (created/updated/unchanged/deleted) of upserts,
+        mount syncs and sweeps made by the current thread inside the block
+
+        Counters are per thread, so concurrent host syncs each get their own.
+        """
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+        previous = getattr(_tally, 'counts', None)
+        _tally.counts = counts
+        try:
+            yield counts
+        finally:
+            _tally.counts = previous
+            # Nested tallies roll up into the enclosing one
+            if previous is not None:
+                for outcome, count in counts.items():
+                    previous[outcome] += count
+
+    def _count(self, outcome: str, count: int = 1):
+        counts = getattr(_tally, 'counts', None)
+        if counts is not None:
+            counts[outcome] += count
+
+    def _count_upsert(self, existing: Optional[Dict], data: Dict, key_columns: Tuple[str, ...]):
+        """Record whether an upsert created, changed or merely re-confirmed a row"""
+        if existing is None:
+            self._count('created')
+        elif any(existing.get(key) != value for key, value in data.items()
+                 if key in existing and key not in key_columns and key not in BOOKKEEPING_COLUMNS):
+            self._count('updated')
+        else:
+            self._count('unchanged')
 
     def execute_query(self, query: str, params: Optional[Tuple] = None) -> List[Dict]:
         """Execute a SELECT query and return results as list of dicts"""
@@ -90,6 +248,7 @@ class InfrastructureDB:
     def upsert_host(self, host_data: Dict, changed_by: str = 'system') -> int:
         """Insert or update host record with change tracking"""
         existing = self.get_host_by_hostname(host_data['hostname'])
+        self._count_upsert(existing, host_data, ('hostname',))
 
         if existing:
             # Update existing host
@@ -134,57 +293,92 @@ class InfrastructureDB:
                     entity_id=host_id,
                     old_values=None,
                     new_values=host_data,
-                    changed_by=changed_by
+                    changed_by=changed_by,
+                    conn=conn
                 )
 
                 return host_id
 
-    def upsert_docker_container(self, container_data: Dict, changed_by: str = 'system') -> int:
-        """Insert or update Docker container with change tracking"""
+    def get_scope_rows(self, table: str, scope_id: int) -> Dict[Any, Dict]:
+        """Rows of a swept table within one scope (docker host / Proxmox node),
+        keyed by their key column, read in one query
+
+        Passed as known to the upserts of a host sync so each record is
+        compared in memory instead of costing its own SELECT.
+        """
+        _, scope_column, key_column, _, _ = SWEEP_TABLES[table]
+        rows = self.execute_query(f"SELECT * FROM {table} WHERE {scope_column} = ?", (scope_id,))
+        return {row[key_column]: row for row in rows}
+
+    def upsert_docker_container(self, container_data: Dict, changed_by: str = 'system',
+                                known: Optional[Dict[str, Dict]] = None) -> int:
+        """Insert or update Docker container with change tracking
+
+        Blob columns (env, labels, ports, networks, command) are stored in
+        content_blobs and referenced by hash, and only columns whose value
+        differs from the stored row are written, so an unchanged blob costs a
+        hash compare instead of a write. last_seen_generation is only written
+        on insert; existing rows are stamped by stamp_generation. known is the
+        host's rows from get_scope_rows; without it the row is looked up.
+        """
+        record, blobs = self._content_address(container_data)
+
         # Check if container exists
-        existing = self.execute_query(
-            "SELECT * FROM docker_containers WHERE docker_host_id = ? AND container_name = ?",
-            (container_data['docker_host_id'], container_data['container_name'])
-        )
-        existing = existing[0] if existing else None
+        if known is not None:
+            existing = known.get(record['container_name'])
+        else:
+            existing = self.execute_query(
+                "SELECT * FROM docker_containers WHERE docker_host_id = ? AND container_name = ?",
+                (record['docker_host_id'], record['container_name'])
+            )
+            existing = existing[0] if existing else None
+        self._count_upsert(existing, record, ('docker_host_id', 'container_name'))
 
         if existing:
-            # Update
-            update_fields = []
-            params = []
-            for key, value in container_data.items():
-                if key not in ['docker_host_id', 'container_name']:
-                    update_fields.append(f"{key} = ?")
-                    params.append(value)
-
-            if update_fields:
-                query = f"""UPDATE docker_containers SET {', '.join(update_fields)}
+            # Update only what changed
+            changed = {
+                key: value for key, value in record.items()
+                if key not in ['docker_host_id', 'container_name'] and key not in BOOKKEEPING_COLUMNS
+                and existing.get(key) != value
+            }
+
+            if changed:
+                known_hashes = {existing.get(column) for column in BLOB_COLUMNS.values()}
+                new_blobs = {h: c for h, c in blobs.items() if h not in known_hashes}
+
+                query = f"""UPDATE docker_containers SET {', '.join(f'{key} = ?' for key in changed)}
                            WHERE docker_host_id = ? AND container_name = ?"""
-                params.extend([container_data['docker_host_id'], container_data['container_name']])
-                self.execute_update(query, tuple(params))
+                params = list(changed.values())
+                params.extend([record['docker_host_id'], record['container_name']])
 
-                # Log change if status or health changed
-                if (existing['status'] != container_data.get('status') or
-                    existing['health_status'] != container_data.get('health_status')):
-                    self.log_change(
-                        change_type='update',
-                        entity_type='docker_container',
-                        entity_id=existing['id'],
-                        old_values=existing,
-                        new_values=container_data,
-                        changed_by=changed_by
-                    )
+                with self.get_connection() as conn:
+                    self._store_blobs(conn, new_blobs)
+                    conn.execute(query, tuple(params))
+
+                    # Log change if status or health changed
+                    if (existing['status'] != record.get('status') or
+                        existing['health_status'] != record.get('health_status')):
+                        self.log_change(
+                            change_type='update',
+                            entity_type='docker_container',
+                            entity_id=existing['id'],
+                            old_values=existing,
+                            new_values=record,
+                            changed_by=changed_by,
+                            conn=conn
+                        )
 
             return existing['id']
         else:
             # Insert
-            columns = list(container_data.keys())
+            columns = list(record.keys())
             placeholders = ','.join(['?' for _ in columns])
             query = f"INSERT INTO docker_containers ({','.join(columns)}) VALUES ({placeholders})"
 
             with self.get_connection() as conn:
+                self._store_blobs(conn, blobs)
                 cursor = conn.cursor()
-                cursor.execute(query, tuple(container_data.values()))
+                cursor.execute(query, tuple(record.values()))
                 container_id = cursor.lastrowid
 
                 self.log_change(
@@ -192,33 +386,84 @@ class InfrastructureDB:
                     entity_type='docker_container',
                     entity_id=container_id,
                     old_values=None,
-                    new_values=container_data,
-                    changed_by=changed_by
+                    new_values=record,
+                    changed_by=changed_by,
+                    conn=conn
                 )
 
                 return container_id
 
-    def upsert_docker_volume(self, volume_data: Dict, changed_by: str = 'system') -> int:
-        """Insert or update Docker volume with change tracking"""
-        # Check if volume exists
-        existing = self.execute_query(
-            "SELECT * FROM docker_volumes WHERE docker_host_id = ? AND volume_name = ?",
-            (volume_data['docker_host_id'], volume_data['volume_name'])
+    def _content_address(self, container_data: Dict) -> Tuple[Dict, Dict[str, str]]:
+        """Replace inline blob columns with content hashes
+
+        Returns the record to write (inline blob columns cleared, *_hash
+        columns set) and a mapping of hash -> content for the blobs it uses.
+        """
+        record = dict(container_data)
+        blobs = {}
+        for column, hash_column in BLOB_COLUMNS.items():
+            if column not in record:
+                continue
+            content = record[column]
+            record[column] = None
+            if content is None:
+                record[hash_column] = None
+                continue
+            digest = blob_hash(content)
+            record[hash_column] = digest
+            blobs[digest] = content
+        return record, blobs
+
+    def _store_blobs(self, conn: sqlite3.Connection, blobs: Dict[str, str]):
+        """Insert content blobs not yet stored (shared blobs are written once)"""
+        if blobs:
+            conn.executemany(
+                "INSERT OR IGNORE INTO content_blobs (blob_hash, content) VALUES (?, ?)",
+                list(blobs.items())
+            )
+
+    def gc_content_blobs(self) -> int:
+        """Delete content blobs no longer referenced by any container"""
+        references = ' UNION '.join(
+            f"SELECT {hash_column} FROM docker_containers WHERE {hash_column} IS NOT NULL"
+            for hash_column in BLOB_COLUMNS.values()
         )
-        existing = existing[0] if existing else None
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM content_blobs WHERE blob_hash NOT IN ({references})"
+            )
+            return cursor.rowcount
 
-        if existing:
-            # Update
-            update_fields = []
-            params = []
-            for key, value in volume_data.items():
-                if key not in ['docker_host_id', 'volume_name']:
-                    update_fields.append(f"{key} = ?")
-                    params.append(value)
+    def upsert_docker_volume(self, volume_data: Dict, changed_by: str = 'system',
+                             known: Optional[Dict[str, Dict]] = None) -> int:
+        """Insert or update Docker volume with change tracking
 
-            if update_fields:
-                query = f"""UPDATE docker_volumes SET {', '.join(update_fields)}
+        known is the host's rows from get_scope_rows; without it the row is
+        looked up.
+        """
+        # Check if volume exists
+        if known is not None:
+            existing = known.get(volume_data['volume_name'])
+        else:
+            existing = self.execute_query(
+                "SELECT * FROM docker_volumes WHERE docker_host_id = ? AND volume_name = ?",
+                (volume_data['docker_host_id'], volume_data['volume_name'])
+            )
+            existing = existing[0] if existing else None
+        self._count_upsert(existing, volume_data, ('docker_host_id', 'volume_name'))
+
+        if existing:
+            # Update only what changed (the generation is stamped separately)
+            changed = {
+                key: value for key, value in volume_data.items()
+                if key not in ['docker_host_id', 'volume_name'] and key not in BOOKKEEPING_COLUMNS
+                and existing.get(key) != value
+            }
+
+            if changed:
+                query = f"""UPDATE docker_volumes SET {', '.join(f'{key} = ?' for key in changed)}
                            WHERE docker_host_id = ? AND volume_name = ?"""
+                params = list(changed.values())
                 params.extend([volume_data['docker_host_id'], volume_data['volume_name']])
                 self.execute_update(query, tuple(params))
 
@@ -240,32 +485,42 @@ class InfrastructureDB:
                     entity_id=volume_id,
                     old_values=None,
                     new_values=volume_data,
-                    changed_by=changed_by
+                    changed_by=changed_by,
+                    conn=conn
                 )
 
                 return volume_id
 
-    def upsert_docker_network(self, network_data: Dict, changed_by: str = 'system') -> int:
-        """Insert or update Docker network with change tracking"""
+    def upsert_docker_network(self, network_data: Dict, changed_by: str = 'system',
+                             known: Optional[Dict[str, Dict]] = None) -> int:
+        """Insert or update Docker network with change tracking
+
+        known is the host's rows from get_scope_rows; without it the row is
+        looked up.
+        """
         # Check if network exists
-        existing = self.execute_query(
-            "SELECT * FROM docker_networks WHERE docker_host_id = ? AND network_name = ?",
-            (network_data['docker_host_id'], network_data['network_name'])
-        )
-        existing = existing[0] if existing else None
+        if known is not None:
+            existing = known.get(network_data['network_name'])
+        else:
+            existing = self.execute_query(
+                "SELECT * FROM docker_networks WHERE docker_host_id = ? AND network_name = ?",
+                (network_data['docker_host_id'], network_data['network_name'])
+            )
+            existing = existing[0] if existing else None
+        self._count_upsert(existing, network_data, ('docker_host_id', 'network_name'))
 
         if existing:
-            # Update
-            update_fields = []
-            params = []
-            for key, value in network_data.items():
-                if key not in ['docker_host_id', 'network_name']:
-                    update_fields.append(f"{key} = ?")
-                    params.append(value)
-
-            if update_fields:
-                query = f"""UPDATE docker_networks SET {', '.join(update_fields)}
+            # Update only what changed (the generation is stamped separately)
+            changed = {
+                key: value for key, value in network_data.items()
+                if key not in ['docker_host_id', 'network_name'] and key not in BOOKKEEPING_COLUMNS
+                and existing.get(key) != value
+            }
+
+            if changed:
+                query = f"""UPDATE docker_networks SET {', '.join(f'{key} = ?' for key in changed)}
                            WHERE docker_host_id = ? AND network_name = ?"""
+                params = list(changed.values())
                 params.extend([network_data['docker_host_id'], network_data['network_name']])
                 self.execute_update(query, tuple(params))
 
@@ -287,15 +542,528 @@ class InfrastructureDB:
                     entity_id=network_id,
                     old_values=None,
                     new_values=network_data,
-                    changed_by=changed_by
+                    changed_by=changed_by,
+                    conn=conn
                 )
 
                 return network_id
 
+    def sync_container_mounts(self, docker_host_id: int,
+                              mounts_by_container: Dict[str, List[Dict]]) -> Dict[str, int]:
+        """Reconcile docker_container_volumes for the given containers of a host
+
+        mounts_by_container maps container_name to the mounts reported by
+        `docker inspect` (container_path, volume_name, host_path, read_only).
+        Existing links are loaded in one query and only the set difference is
+        written: missing links are inserted, changed links updated and links
+        that disappeared deleted. Containers not in the mapping are untouched.
+        """
+        counts = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+        with self.get_connection() as conn:
+            container_ids = {
+                row['container_name']: row['id']
+                for row in conn.execute(
+                    "SELECT id, container_name FROM docker_containers WHERE docker_host_id = ?",
+                    (docker_host_id,)
+                )
+            }
+            volume_ids = {
+                row['volume_name']: row['id']
+                for row in conn.execute(
+                    "SELECT id, volume_name FROM docker_volumes WHERE docker_host_id = ?",
+                    (docker_host_id,)
+                )
+            }
+
+            desired = {}
+            for container_name, mounts in mounts_by_container.items():
+                container_id = container_ids.get(container_name)
+                if container_id is None:
+                    continue
+                for mount in mounts:
+                    desired[(container_id, mount['container_path'])] = (
+                        volume_ids.get(mount.get('volume_name')),
+                        mount.get('host_path'),
+                        1 if mount.get('read_only') else 0,
+                    )
+
+            scope = {container_ids[name] for name in mounts_by_container if name in container_ids}
+            if not scope:
+                return counts
+
+            existing = {
+                (row['docker_container_id'], row['container_path']):
+                    (row['docker_volume_id'], row['host_path'], row['read_only'])
+                for row in conn.execute(
+                    """SELECT dcv.docker_container_id, dcv.container_path, dcv.docker_volume_id,
+                              dcv.host_path, dcv.read_only
+                       FROM docker_container_volumes dcv
+                       JOIN docker_containers dc ON dcv.docker_container_id = dc.id
+                       WHERE dc.docker_host_id = ?""",
+                    (docker_host_id,)
+                )
+                if row['docker_container_id'] in scope
+            }
+
+            to_insert = [key + value for key, value in desired.items() if key not in existing]
+            to_update = [value + key for key, value in desired.items()
+                         if key in existing and existing[key] != value]
+            to_delete = [key for key in existing if key not in desired]
+
+            if to_insert:
+                conn.executemany("""
+                    INSERT INTO docker_container_volumes
+                    (docker_container_id, container_path, docker_volume_id, host_path, read_only)
+                    VALUES (?, ?, ?, ?, ?)
+                """, to_insert)
+            if to_update:
+                conn.executemany("""
+                    UPDATE docker_container_volumes
+                    SET docker_volume_id = ?, host_path = ?, read_only = ?
+                    WHERE docker_container_id = ? AND container_path = ?
+                """, to_update)
+            if to_delete:
+                conn.executemany("""
+                    DELETE FROM docker_container_volumes
+                    WHERE docker_container_id = ? AND container_path = ?
+                """, to_delete)
+
+        counts['created'] = len(to_insert)
+        counts['updated'] = len(to_update)
+        counts['deleted'] = len(to_delete)
+        counts['unchanged'] = len(desired) - len(to_insert) - len(to_update)
+        for outcome, count in counts.items():
+            self._count(outcome, count)
+        logger.info(
+            f"Synced container mounts for host {docker_host_id}: "
+            f"{counts['created']} created, {counts['updated']} updated, {counts['deleted']} deleted"
+        )
+        return counts
+
+    def get_containers_using_volume(self, docker_volume_id: int) -> List[Dict]:
+        """Get all containers that mount a Docker volume"""
+        return self.execute_query("""
+            SELECT dc.container_name, dc.status, h.hostname as docker_host,
+                   dcv.container_path, dcv.read_only
+            FROM docker_container_volumes dcv
+            JOIN docker_containers dc ON dcv.docker_container_id = dc.id
+            JOIN hosts h ON dc.docker_host_id = h.id
+            WHERE dcv.docker_volume_id = ?
+            ORDER BY h.hostname, dc.container_name
+        """, (docker_volume_id,))
+
+    def sync_docker_images(self, docker_host_id: int, images: List[Dict],
+                           changed_by: str = 'system') -> Dict[str, int]:
+        """Bulk upsert the image inventory of a Docker host
+
+        All images are written in one transaction with INSERT ... ON CONFLICT;
+        existing rows are only rewritten when a column changed (updated_at
+        only when tags, digest or sizes did) and are stamped with the
+        generation by one stamp_generation UPDATE. Image creation is logged
+        to infrastructure_changes, removal is left to the generation sweep.
+        Returns {'created', 'updated', 'unchanged'} counts.
+        """
+        rows = [dict(image, docker_host_id=docker_host_id) for image in images]
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+        if not rows:
+            return counts
+
+        with self.get_connection() as conn:
+            known = {
+                row['image_id']: tuple(row)[1:]
+                for row in conn.execute(
+                    """SELECT image_id, repo_tags, digest, size_bytes, unique_size_bytes
+                       FROM docker_images WHERE docker_host_id = ?""",
+                    (docker_host_id,)
+                )
+            }
+
+            conn.executemany("""
+                INSERT INTO docker_images
+                (docker_host_id, image_id, repository, tag, repo_tags, repo_digests, digest,
+                 size_bytes, shared_size_bytes, unique_size_bytes, architecture, os,
+                 image_created_at, last_seen_generation)
+                VALUES (:docker_host_id, :image_id, :repository, :tag, :repo_tags, :repo_digests,
+                        :digest, :size_bytes, :shared_size_bytes, :unique_size_bytes,
+                        :architecture, :os, :image_created_at, :last_seen_generation)
+                ON CONFLICT(docker_host_id, image_id) DO UPDATE SET
+                    updated_at = CASE WHEN
+                        repo_tags IS NOT excluded.repo_tags OR
+                        digest IS NOT excluded.digest OR
+                        size_bytes IS NOT excluded.size_bytes OR
+                        unique_size_bytes IS NOT excluded.unique_size_bytes
+                        THEN CURRENT_TIMESTAMP ELSE updated_at END,
+                    repository = excluded.repository,
+                    tag = excluded.tag,
+                    repo_tags = excluded.repo_tags,
+                    repo_digests = excluded.repo_digests,
+                    digest = excluded.digest,
+                    size_bytes = excluded.size_bytes,
+                    shared_size_bytes = excluded.shared_size_bytes,
+                    unique_size_bytes = excluded.unique_size_bytes,
+                    architecture = excluded.architecture,
+                    os = excluded.os,
+                    image_created_at = excluded.image_created_at
+                WHERE repository IS NOT excluded.repository OR
+                      tag IS NOT excluded.tag OR
+                      repo_tags IS NOT excluded.repo_tags OR
+                      repo_digests IS NOT excluded.repo_digests OR
+                      digest IS NOT excluded.digest OR
+                      size_bytes IS NOT excluded.size_bytes OR
+                      shared_size_bytes IS NOT excluded.shared_size_bytes OR
+                      unique_size_bytes IS NOT excluded.unique_size_bytes OR
+                      architecture IS NOT excluded.architecture OR
+                      os IS NOT excluded.os OR
+                      image_created_at IS NOT excluded.image_created_at
+            """, rows)
+
+            generation = rows[0].get('last_seen_generation')
+            if generation is not None:
+                self.stamp_generation('docker_images', docker_host_id,
+                                      [row['image_id'] for row in rows], generation, conn=conn)
+
+            created = [row for row in rows if row['image_id'] not in known]
+            counts['created'] = len(created)
+            counts['updated'] = sum(
+                1 for row in rows if row['image_id'] in known and known[row['image_id']] != (
+                    row['repo_tags'], row['digest'], row['size_bytes'], row['unique_size_bytes'])
+            )
+            counts['unchanged'] = len(rows) - counts['created'] - counts['updated']
+            conn.executemany("""
+                INSERT INTO infrastructure_changes
+                (change_type, entity_type, entity_id, changed_by, change_source,
+                 old_values, new_values, description)
+                SELECT 'create', 'docker_image', id, ?, 'automation', NULL,
+                       json_object('image_id', image_id, 'repository', repository, 'tag', tag,
+                                   'size_bytes', size_bytes), NULL
+                FROM docker_images
+                WHERE docker_host_id = ? AND image_id = ?
+            """, [(changed_by, docker_host_id, row['image_id']) for row in created])
+
+        for outcome, count in counts.items():
+            self._count(outcome, count)
+        return counts
+
+    def record_container_stats(self, docker_host_id: int, samples: List[Dict],
+                               ring_size: int = STATS_RING_SIZE) -> int:
+        """Store a batch of container resource samples in the ring buffer
+
+        Samples are matched to containers by name, written in one transaction
+        and the per-container rollups in docker_container_usage are refreshed
+        for the host. Returns the number of samples stored.
+        """
+        with self.get_connection() as conn:
+            container_ids = {
+                row['container_name']: row['id']
+                for row in conn.execute(
+                    "SELECT id, container_name FROM docker_containers WHERE docker_host_id = ?",
+                    (docker_host_id,)
+                )
+            }
+
+            rows = []
+            for sample in samples:
+                container_id = container_ids.get(sample['container_name'])
+                if container_id is None:
+                    continue
+                row = dict(sample)
+                row['docker_container_id'] = container_id
+                row['ring_size'] = ring_size
+                rows.append(row)
+
+            if not rows:
+                return 0
+
+            # Next sequence number is derived from the ring itself; the slot
+            # wraps so each container never holds more than ring_size rows
+            conn.executemany("""
+                INSERT OR REPLACE INTO docker_container_stats
+                (docker_container_id, slot, sample_seq, cpu_percent, mem_usage_mb,
+                 mem_limit_mb, mem_percent, net_rx_bytes, net_tx_bytes,
+                 block_read_bytes, block_write_bytes, pids)
+                SELECT :docker_container_id, seq % :ring_size, seq, :cpu_percent, :mem_usage_mb,
+                       :mem_limit_mb, :mem_percent, :net_rx_bytes, :net_tx_bytes,
+                       :block_read_bytes, :block_write_bytes, :pids
+                FROM (SELECT COALESCE(MAX(sample_seq), 0) + 1 AS seq
+                      FROM docker_container_stats
+                      WHERE docker_container_id = :docker_container_id)
+            """, rows)
+
+            # Drop slots left over from a larger ring size
+            conn.execute("""
+                DELETE FROM docker_container_stats
+                WHERE slot >= ? AND docker_container_id IN
+                    (SELECT id FROM docker_containers WHERE docker_host_id = ?)
+            """, (ring_size, docker_host_id))
+
+            conn.execute("""
+                INSERT OR REPLACE INTO docker_container_usage
+                (docker_container_id, sampled_at, cpu_percent, mem_usage_mb, mem_limit_mb,
+                 mem_percent, net_rx_bytes, net_tx_bytes, block_read_bytes,
+                 block_write_bytes, pids, sample_count, cpu_avg, cpu_max,
+                 mem_avg_mb, mem_max_mb)
+                SELECT
+                    cur.docker_container_id, cur.sampled_at, cur.cpu_percent, cur.mem_usage_mb,
+                    cur.mem_limit_mb, cur.mem_percent, cur.net_rx_bytes, cur.net_tx_bytes,
+                    cur.block_read_bytes, cur.block_write_bytes, cur.pids,
+                    agg.sample_count, agg.cpu_avg, agg.cpu_max, agg.mem_avg_mb, agg.mem_max_mb
+                FROM docker_container_stats cur
+                JOIN (
+                    SELECT
+                        docker_container_id,
+                        MAX(sample_seq) as last_seq,
+                        COUNT(*) as sample_count,
+                        ROUND(AVG(cpu_percent), 2) as cpu_avg,
+                        MAX(cpu_percent) as cpu_max,
+                        ROUND(AVG(mem_usage_mb), 1) as mem_avg_mb,
+                        MAX(mem_usage_mb) as mem_max_mb
+                    FROM docker_container_stats
+                    WHERE docker_container_id IN
+                        (SELECT id FROM docker_containers WHERE docker_host_id = ?)
+                    GROUP BY docker_container_id
+                ) agg ON agg.docker_container_id = cur.docker_container_id
+                     AND agg.last_seq = cur.sample_seq
+            """, (docker_host_id,))
+
+            logger.info(f"Recorded {len(rows)} container stats samples for host {docker_host_id}")
+            return len(rows)
+
+    def get_container_stats_history(self, docker_container_id: int) -> List[Dict]:
+        """Get the samples currently held in a container's ring buffer, oldest first"""
+        return self.execute_query("""
+            SELECT * FROM docker_container_stats
+            WHERE docker_container_id = ?
+            ORDER BY sample_seq
+        """, (docker_container_id,))
+
+    def stamp_generation(self, table: str, scope_id: int, keys: Iterable, generation: int,
+                         conn: Optional[sqlite3.Connection] = None) -> int:
+        """Stamp the rows of a swept table seen by a sync with its generation
+
+        keys are key column values (container_name, vmid, ...) within the
+        scope; they are stamped by one UPDATE (keys passed as a JSON array),
+        skipping rows that already carry the generation. Pass conn to stamp
+        inside the caller's write transaction. Returns the rows stamped.
+        """
+        _, scope_column, key_column, _, _ = SWEEP_TABLES[table]
+        query = f"""
+            UPDATE {table} SET last_seen_generation = ?
+            WHERE {scope_column} = ? AND {key_column} IN (SELECT value FROM json_each(?))
+              AND last_seen_generation IS NOT ?
+        """
+        params = (generation, scope_id, json.dumps(list(keys)), generation)
+        if conn is not None:
+            return conn.execute(query, params).rowcount
+        return self.execute_update(query, params)
+
+    def sweep_unseen(self, table: str, scope_id: int, generation: int,
+                     changed_by: str = 'system', seen: Optional[Iterable] = None) -> int:
+        """Delete rows of a swept table not stamped by the current sync generation
+
+        Deleted rows are logged to infrastructure_changes with one INSERT ...
+        SELECT before a single DELETE, both in the same transaction; the keys
+        in seen, if given, are stamped first in that transaction too. Only
+        call this after discovery of the scope (docker host / Proxmox node)
+        has completed successfully. Returns the number of rows removed.
+        """
+        entity_type, scope_column, _, snapshot, description = SWEEP_TABLES[table]
+        unseen = f"{scope_column} = ? AND COALESCE(last_seen_generation, 0) < ?"
+
+        with self.get_connection() as conn:
+            if seen is not None:
+                self.stamp_generation(table, scope_id, seen, generation, conn=conn)
+            conn.execute(f"""
+                INSERT INTO infrastructure_changes
+                (change_type, entity_type, entity_id, changed_by, change_source,
+                 old_values, new_values, description)
+                SELECT 'delete', ?, id, ?, 'automation', {snapshot}, NULL, {description}
+                FROM {table}
+                WHERE {unseen}
+            """, (entity_type, changed_by, scope_id, generation))
+
+            cursor = conn.execute(f"DELETE FROM {table} WHERE {unseen}", (scope_id, generation))
+            deleted = cursor.rowcount
+
+        self._count('deleted', deleted)
+        if deleted:
+            logger.info(f"Swept {deleted} vanished {entity_type} rows ({scope_column}={scope_id})")
+        return deleted
+
+    def sweep_docker_host(self, docker_host_id: int, generation: int,
+                          changed_by: str = 'system', images: bool = True,
+                          seen: Optional[Dict[str, Iterable]] = None) -> Dict[str, int]:
+        """Remove containers, volumes, networks and images no longer present on a Docker host
+
+        seen maps a table to the keys discovered in this sync; they are
+        stamped in the table's sweep transaction. images=False (light state
+        syncs, which do not stamp images) leaves docker_images and the content
+        blob GC to the next full sync.
+        """
+        tables = ('docker_containers', 'docker_volumes', 'docker_networks')
+        if images:
+            tables += ('docker_images',)
+        swept = {
+            table: self.sweep_unseen(table, docker_host_id, generation, changed_by,
+                                     seen=(seen or {}).get(table))
+            for table in tables
+        }
+        if images:
+            swept['content_blobs'] = self.gc_content_blobs()
+        return swept
+
+    def start_sync_run(self, mode: str, generation: int) -> int:
+        """Open a sync_runs row for a run; returns its id"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO sync_runs (mode, generation) VALUES (?, ?)",
+                (mode, generation)
+            )
+            return cursor.lastrowid
+
+    def record_sync_phase(self, sync_run_id: int, phase: Dict):
+        """Store one source or host phase of a run
+
+        phase: source, target (host or None), status, started_at,
+        duration_s, remote_calls, error and a 'counts' dict from tally().
+        """
+        counts = phase.get('counts') or {}
+        self.execute_update("""
+            INSERT INTO sync_run_phases
+            (sync_run_id, source, target, status, started_at, duration_s, remote_calls,
+             rows_created, rows_updated, rows_unchanged, rows_deleted, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            sync_run_id, phase['source'], phase.get('target'), phase['status'],
+            phase.get('started_at'), phase.get('duration_s'), phase.get('remote_calls'),
+            counts.get('created'), counts.get('updated'), counts.get('unchanged'),
+            counts.get('deleted'), phase.get('error'),
+        ))
+
+    def finish_sync_run(self, sync_run_id: int, status: str, duration_s: float,
+                        error: Optional[str] = None):
+        """Close a run; totals are summed from its source-level phases"""
+        self.execute_update("""
+            UPDATE sync_runs SET
+                status = ?,
+                finished_at = CURRENT_TIMESTAMP,
+                duration_s = ?,
+                error = ?,
+                remote_calls = (SELECT SUM(remote_calls) FROM sync_run_phases
+                                WHERE sync_run_id = sync_runs.id AND target IS NULL),
+                rows_created = (SELECT SUM(rows_created) FROM sync_run_phases
+                                WHERE sync_run_id = sync_runs.id AND target IS NULL),
+                rows_updated = (SELECT SUM(rows_updated) FROM sync_run_phases
+                                WHERE sync_run_id = sync_runs.id AND target IS NULL),
+                rows_unchanged = (SELECT SUM(rows_unchanged) FROM sync_run_phases
+                                  WHERE sync_run_id = sync_runs.id AND target IS NULL),
+                rows_deleted = (SELECT SUM(rows_deleted) FROM sync_run_phases
+                                WHERE sync_run_id = sync_runs.id AND target IS NULL)
+            WHERE id = ?
+        """, (status, duration_s, error, sync_run_id))
+
+    def resume_sync_run(self, sync_run_id: int, mode: str,
+                        window_s: float) -> Tuple[Optional[int], Dict[str, Dict[str, int]]]:
+        """Carry over the checkpoints of the interrupted previous run of a mode
+
+        The previous run counts as interrupted when it did not succeed (or
+        never finished) and started within window_s seconds. Checkpoints of
+        its sources that did not complete successfully, and not older than
+        the window, are copied to sync_run_id. Checkpoints of older runs of
+        the mode are deleted. Returns (previous run id or None,
+        {source: {unit: generation}}).
+        """
+        window = f"-{int(window_s)} seconds"
+        carried: Dict[str, Dict[str, int]] = {}
+
+        with self.get_connection() as conn:
+            previous = conn.execute("""
+                SELECT id, status FROM sync_runs
+                WHERE mode = ? AND id < ?
+                ORDER BY id DESC LIMIT 1
+            """, (mode, sync_run_id)).fetchone()
+
+            if (previous is not None and previous['status'] != 'success'
+                    and conn.execute("SELECT 1 FROM sync_runs WHERE id = ? AND started_at >= datetime('now', ?)",
+                                     (previous['id'], window)).fetchone()):
+                conn.execute("""
+                    INSERT INTO sync_checkpoints (sync_run_id, source, unit, generation, completed_at)
+                    SELECT ?, c.source, c.unit, c.generation, c.completed_at
+                    FROM sync_checkpoints c
+                    WHERE c.sync_run_id = ? AND c.completed_at >= datetime('now', ?)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM sync_run_phases p
+                          WHERE p.sync_run_id = c.sync_run_id AND p.source = c.source
+                            AND p.target IS NULL AND p.status = 'success'
+                      )
+                """, (sync_run_id, previous['id'], window))
+                for row in conn.execute("SELECT source, unit, generation FROM sync_checkpoints WHERE sync_run_id = ?",
+                                        (sync_run_id,)):
+                    carried.setdefault(row['source'], {})[row['unit']] = row['generation']
+
+                if carried:
+                    conn.execute("UPDATE sync_runs SET resumed_from = ? WHERE id = ?", (previous['id'], sync_run_id))
+                    # A run still 'running' died without closing its row
+                    conn.execute("""
+                        UPDATE sync_runs SET status = 'failed', error = COALESCE(error, ?)
+                        WHERE id = ? AND status = 'running'
+                    """, (f"interrupted, resumed by run {sync_run_id}", previous['id']))
+
+            # Only the latest run of a mode is resumed
+            conn.execute("""
+                DELETE FROM sync_checkpoints
+                WHERE sync_run_id IN (SELECT id FROM sync_runs WHERE mode = ? AND id < ?)
+            """, (mode, sync_run_id))
+
+        return (previous['id'] if carried else None), carried
+
+    def record_checkpoint(self, sync_run_id: int, source: str, unit: str, generation: int):
+        """Mark a unit of work of a run as completed"""
+        self.execute_update("""
+            INSERT OR REPLACE INTO sync_checkpoints (sync_run_id, source, unit, generation)
+            VALUES (?, ?, ?, ?)
+        """, (sync_run_id, source, unit, generation))
+
+    def clear_checkpoints(self, sync_run_id: int) -> int:
+        """Delete the checkpoints of a run that completed successfully"""
+        return self.execute_update("DELETE FROM sync_checkpoints WHERE sync_run_id = ?", (sync_run_id,))
+
+    def get_target_health(self, source: str) -> Dict[str, Dict]:
+        """Circuit breaker state of every known target of a source, keyed by target"""
+        rows = self.execute_query("SELECT * FROM target_health WHERE source = ?", (source,))
+        return {row['target']: row for row in rows}
+
+    def save_target_health(self, health: Dict):
+        """Insert or replace the circuit breaker state of one target"""
+        self.execute_update("""
+            INSERT INTO target_health
+            (source, target, state, consecutive_failures, last_error, last_failure_at,
+             last_success_at, opened_at, next_attempt_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(source, target) DO UPDATE SET
+                state = excluded.state,
+                consecutive_failures = excluded.consecutive_failures,
+                last_error = excluded.last_error,
+                last_failure_at = excluded.last_failure_at,
+                last_success_at = excluded.last_success_at,
+                opened_at = excluded.opened_at,
+                next_attempt_at = excluded.next_attempt_at,
+                updated_at = CURRENT_TIMESTAMP
+        """, (
+            health['source'], health['target'], health['state'], health['consecutive_failures'],
+            health.get('last_error'), health.get('last_failure_at'), health.get('last_success_at'),
+            health.get('opened_at'), health.get('next_attempt_at'),
+        ))
+
     def log_change(self, change_type: str, entity_type: str, entity_id: int,
                    old_values: Optional[Dict], new_values: Dict,
-                   changed_by: str = 'system', description: str = None):
-        """Log infrastructure change to audit table"""
+                   changed_by: str = 'system', description: str = None,
+                   conn: Optional[sqlite3.Connection] = None):
+        """Log infrastructure change to audit table
+
+        Pass conn when the caller already holds a write transaction, otherwise
+        the audit insert would wait on that transaction's lock.
+        """
         try:
             query = """
                 INSERT INTO infrastructure_changes
@@ -303,8 +1071,7 @@ class InfrastructureDB:
                  old_values, new_values, description)
                 VALUES (?, ?, ?, ?, 'automation', ?, ?, ?)
             """
-
-            self.execute_update(query, (
+            params = (
                 change_type,
                 entity_type,
                 entity_id,
@@ -312,7 +1079,12 @@ class InfrastructureDB:
                 json.dumps(old_values) if old_values else None,
                 json.dumps(new_values, default=str),
                 description
-            ))
+            )
+
+            if conn is not None:
+                conn.execute(query, params)
+            else:
+                self.execute_update(query, params)
 
             logger.info(f"Logged {change_type} for {entity_type}:{entity_id}")
         except Exception as e:
@@ -400,6 +1172,9 @@ class InfrastructureDB:
                 - Plus type-specific fields (vm_type, os_type, os_template, etc.)
             changed_by: Identifier for who/what made the change
 
+        Only changed columns are written; last_seen_generation is only
+        written on insert, existing rows are stamped by stamp_generation.
+
         Returns:
             int: The container record ID, or None if upsert failed
         """
@@ -410,19 +1185,20 @@ class InfrastructureDB:
                 (container_data['proxmox_host_id'], container_data['vmid'])
             )
             existing = existing[0] if existing else None
+            self._count_upsert(existing, container_data, ('proxmox_host_id', 'vmid'))
 
             if existing:
-                # Update existing container
-                update_fields = []
-                params = []
-                for key, value in container_data.items():
-                    if key not in ['proxmox_host_id', 'vmid'] and key in existing:
-                        update_fields.append(f"{key} = ?")
-                        params.append(value)
-
-                if update_fields:
-                    query = f"""UPDATE proxmox_containers SET {', '.join(update_fields)}
+                # Update only what changed (the generation is stamped separately)
+                changed = {
+                    key: value for key, value in container_data.items()
+                    if key not in ['proxmox_host_id', 'vmid'] and key not in BOOKKEEPING_COLUMNS
+                    and key in existing and existing[key] != value
+                }
+
+                if changed:
+                    query = f"""UPDATE proxmox_containers SET {', '.join(f'{key} = ?' for key in changed)}
                                WHERE proxmox_host_id = ? AND vmid = ?"""
+                    params = list(changed.values())
                     params.extend([container_data['proxmox_host_id'], container_data['vmid']])
                     self.execute_update(query, tuple(params))
 
@@ -495,3 +1271,167 @@ class InfrastructureDB:
             LEFT JOIN network_interfaces ni ON ip.interface_id = ni.id
             ORDER BY n.vlan_id, ip.ip_address
         """)
+
+    def get_networks(self) -> List[Dict]:
+        """All networks (subnets) with their CIDR and DHCP range"""
+        return self.execute_query("SELECT * FROM networks ORDER BY id")
+
+    def sync_ip_addresses(self, network_id: int, addresses: List[Dict],
+                          changed_by: str = 'system') -> Dict[str, int]:
+        """Bulk upsert the live addresses of a network found by a sweep
+
+        addresses: ip_address, mac_address (or None), allocation_type,
+        last_seen_at, last_seen_generation. Everything runs in one
+        transaction: addresses are upserted (existing rows keep their
+        allocation, host and notes; updated_at only moves when the MAC or
+        host link changes), linked to the host whose management IP they are,
+        and to that host's interface with the same MAC - created as a
+        'mac-...' interface when the host has none. ip_address is unique
+        across networks: addresses already recorded under another network
+        are skipped and logged, not moved. Returns {'created', 'updated',
+        'unchanged', 'skipped'} counts over addresses; created interfaces
+        are added to the tally.
+        """
+        rows = [dict(address, network_id=network_id,
+                     mac_address=(address.get('mac_address') or '').lower() or None)
+                for address in addresses]
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        if not rows:
+            return counts
+
+        with self.get_connection() as conn:
+            known = {
+                row['ip_address']: (row['mac_address'], row['host_id'], row['network_id'])
+                for row in conn.execute(
+                    """SELECT ip_address, mac_address, host_id, network_id FROM ip_addresses
+                       WHERE ip_address IN (SELECT value FROM json_each(?))""",
+                    (json.dumps([row['ip_address'] for row in rows]),)
+                )
+            }
+
+            foreign = {ip for ip, (_, _, owner) in known.items() if owner != network_id}
+            if foreign:
+                counts['skipped'] = len(foreign)
+                listed = sorted(foreign)[:10]
+                logger.warning(
+                    f"Skipping {len(foreign)} addresses of network {network_id} recorded under "
+                    f"another network: {', '.join(listed)}{' ...' if len(foreign) > 10 else ''}"
+                )
+                rows = [row for row in rows if row['ip_address'] not in foreign]
+                if not rows:
+                    return counts
+            hosts = {
+                row['management_ip']: row['id']
+                for row in conn.execute("SELECT id, management_ip FROM hosts WHERE management_ip IS NOT NULL")
+            }
+            for row in rows:
+                row['host_id'] = hosts.get(row['ip_address'])
+
+            conn.executemany("""
+                INSERT INTO ip_addresses
+                (ip_address, network_id, host_id, allocation_type, mac_address,
+                 last_seen_at, last_seen_generation)
+                VALUES (:ip_address, :network_id, :host_id, :allocation_type, :mac_address,
+                        :last_seen_at, :last_seen_generation)
+                ON CONFLICT(ip_address) DO UPDATE SET
+                    updated_at = CASE WHEN
+                        (excluded.mac_address IS NOT NULL AND mac_address IS NOT excluded.mac_address) OR
+                        (host_id IS NULL AND excluded.host_id IS NOT NULL)
+                        THEN CURRENT_TIMESTAMP ELSE updated_at END,
+                    mac_address = COALESCE(excluded.mac_address, mac_address),
+                    host_id = COALESCE(host_id, excluded.host_id),
+                    last_seen_at = excluded.last_seen_at,
+                    last_seen_generation = excluded.last_seen_generation
+            """, rows)
+
+            created = [row for row in rows if row['ip_address'] not in known]
+            counts['created'] = len(created)
+            counts['updated'] = sum(
+                1 for row in rows if row['ip_address'] in known and (
+                    (row['mac_address'] and row['mac_address'] != known[row['ip_address']][0]) or
+                    (row['host_id'] and known[row['ip_address']][1] is None))
+            )
+            counts['unchanged'] = len(rows) - counts['created'] - counts['updated']
+
+            # Hosts seen with a MAC none of their interfaces carry get one
+            generation = rows[0]['last_seen_generation']
+            interfaces = conn.execute("""
+                INSERT OR IGNORE INTO network_interfaces
+                (host_id, interface_name, interface_type, mac_address, link_status, description)
+                SELECT ip.host_id, 'mac-' || replace(ip.mac_address, ':', ''),
+                       CASE h.host_type WHEN 'physical' THEN 'physical' ELSE 'virtual' END,
+                       ip.mac_address, 'up', 'Discovered from the gateway neighbor table'
+                FROM ip_addresses ip
+                JOIN hosts h ON h.id = ip.host_id
+                WHERE ip.network_id = ? AND ip.last_seen_generation = ?
+                  AND ip.mac_address IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM network_interfaces ni
+                      WHERE ni.host_id = ip.host_id AND lower(ni.mac_address) = ip.mac_address
+                  )
+            """, (network_id, generation)).rowcount
+
+            conn.execute("""
+                UPDATE ip_addresses SET interface_id = (
+                    SELECT ni.id FROM network_interfaces ni
+                    WHERE ni.host_id = ip_addresses.host_id
+                      AND lower(ni.mac_address) = ip_addresses.mac_address
+                )
+                WHERE network_id = ? AND last_seen_generation = ?
+                  AND interface_id IS NULL AND host_id IS NOT NULL AND mac_address IS NOT NULL
+            """, (network_id, generation))
+
+            conn.executemany("""
+                INSERT INTO infrastructure_changes
+                (change_type, entity_type, entity_id, changed_by, change_source,
+                 old_values, new_values, description)
+                SELECT 'create', 'ip_address', id, ?, 'automation', NULL,
+                       json_object('ip_address', ip_address, 'mac_address', mac_address,
+                                   'host_id', host_id), NULL
+                FROM ip_addresses
+                WHERE ip_address = ?
+            """, [(changed_by, row['ip_address']) for row in created])
+
+        for outcome in ('created', 'updated', 'unchanged'):
+            self._count(outcome, counts[outcome])
+        self._count('created', interfaces)
+        return counts
+
+
+class SyncCancelled(Exception):
+    """Raised by a source between units of work once its cancel event is set (deadline passed)"""
+
+
+class SyncCheckpoints:
+    """Units of work of one source completed by a sync run, for resuming it
+
+    carried holds the units (unit -> generation) completed by the interrupted
+    run this one resumes; done() is True for them and the caller skips them.
+    Without a run id (history unavailable, resume disabled) nothing is
+    recorded and nothing is skipped.
+    """
+
+    def __init__(self, db: InfrastructureDB, sync_run_id: Optional[int], source: str,
+                 generation: int, carried: Optional[Dict[str, int]] = None):
+        self.db = db
+        self.sync_run_id = sync_run_id
+        self.source = source
+        self.generation = generation
+        self.carried = carried or {}
+
+    def done(self, unit: str) -> bool:
+        """True if the unit was completed by the resumed run"""
+        return unit in self.carried
+
+    def carried_generation(self, unit: str) -> int:
+        """Generation a carried unit's rows were stamped with"""
+        return self.carried.get(unit, self.generation)
+
+    def complete(self, unit: str):
+        """Record a completed unit (best effort, like the rest of the run history)"""
+        if self.sync_run_id is None:
+            return
+        try:
+            self.db.record_checkpoint(self.sync_run_id, self.source, unit, self.generation)
+        except sqlite3.Error as e:
+            logger.warning(f"Checkpoint {self.source}:{unit} not recorded: {e}")
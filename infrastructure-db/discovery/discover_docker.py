@@ -4,35 +4,154 @@ Docker Infrastructure Discovery
 Connects to Docker hosts via SSH and inventories containers, volumes, and networks
 """
 
+from __future__ import annotations
+
 import json
 import logging
-import paramiko
-from typing import Dict, List, Optional
-from db_utils import InfrastructureDB
+import os
+import re
+import shlex
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+from db_utils import InfrastructureDB, new_generation
+from parse_pool import ParsePool, loads
+
+if TYPE_CHECKING:
+    import paramiko
 
 logger = logging.getLogger(__name__)
 
+# Unit multipliers for the human-readable sizes printed by `docker stats`
+# (memory uses binary units, network/block I/O use decimal units)
+SIZE_UNITS = {
+    'b': 1,
+    'kb': 1000, 'mb': 1000 ** 2, 'gb': 1000 ** 3, 'tb': 1000 ** 4,
+    'kib': 1024, 'mib': 1024 ** 2, 'gib': 1024 ** 3, 'tib': 1024 ** 4,
+}
+
+SIZE_PATTERN = re.compile(r'^\s*([0-9.]+)\s*([a-zA-Z]*)\s*$')
+
+# Remote collector script: one exec emits the whole inventory as NDJSON
+COLLECTOR_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'docker_collector.sh')
+
+# Collector steps whose failure only loses metrics, not inventory (no sweep skip)
+OPTIONAL_COLLECTOR_STEPS = ('stats', 'image_usage')
+
+
+@lru_cache(maxsize=1)
+def load_collector_script() -> str:
+    """Read the collector script shipped next to this module"""
+    with open(COLLECTOR_SCRIPT_PATH) as f:
+        return f.read()
+
+
+def split_image_reference(reference: str) -> Tuple[str, Optional[str]]:
+    """Split an image reference into (name, tag)
+
+    The tag separator is the last ':' after the last '/', so registry ports
+    ('registry.local:5000/app:1.2') stay in the name. Digest-pinned
+    references ('app@sha256:...') have no tag; untagged ones default to
+    'latest' like the docker CLI.
+    """
+    name, _, digest = reference.partition('@')
+    slash = name.rfind('/')
+    colon = name.rfind(':')
+    if colon > slash:
+        return name[:colon], name[colon + 1:]
+    return name, None if digest else 'latest'
+
 
 class DockerDiscovery:
     """Discover Docker infrastructure via SSH"""
 
-    def __init__(self, db: InfrastructureDB):
+    def __init__(self, db: InfrastructureDB,
+                 client_factory: Optional[Callable[..., paramiko.SSHClient]] = None,
+                 keep_alive: bool = False, connect_timeout: float = 10,
+                 command_timeout: float = 120,
+                 parse_pool: Optional[ParsePool] = None):
+        """
+        Args:
+            db: Database wrapper
+            client_factory: Optional callable (host, username, key_path) returning
+                a connected client with the paramiko exec_command/close interface,
+                e.g. docker_standin.FakeDockerHost.connect for offline runs
+            keep_alive: Keep SSH connections open between syncs (daemon mode);
+                call close() when done
+            connect_timeout: Seconds allowed for the TCP connect, SSH banner
+                and authentication each
+            command_timeout: Seconds a remote command may go without output
+                before the read fails
+            parse_pool: Parse stage for the collector stream (may be shared
+                between hosts); parses inline by default
+        """
         self.db = db
+        self.client_factory = client_factory
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.command_timeout = command_timeout
+        self.parse_pool = parse_pool or ParsePool(parse_collector_line)
+        self.remote_calls = 0
+        self.connections = 0
+        self._clients: Dict[Tuple[str, str], paramiko.SSHClient] = {}
+
+    def acquire_client(self, host: str, username: str = 'root',
+                       key_path: Optional[str] = None) -> paramiko.SSHClient:
+        """Return the kept-alive connection to a host, connecting if needed"""
+        client = self._clients.pop((host, username), None)
+        if client is not None:
+            transport = client.get_transport()
+            if transport is not None and transport.is_active():
+                return client
+            client.close()
+
+        client = self.connect_ssh(host, username, key_path)
+        if self.keep_alive and hasattr(client.get_transport(), 'set_keepalive'):
+            client.get_transport().set_keepalive(30)
+        return client
+
+    def release_client(self, host: str, username: str, client: paramiko.SSHClient,
+                       discard: bool = False):
+        """Keep a connection for the next sync, or close it (always on discard)"""
+        if self.keep_alive and not discard:
+            self._clients[(host, username)] = client
+        else:
+            client.close()
+
+    def close(self):
+        """Close all kept-alive connections"""
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
 
     def connect_ssh(self, host: str, username: str = 'root',
                    key_path: Optional[str] = None,
                    password: Optional[str] = None) -> paramiko.SSHClient:
         """Establish SSH connection to Docker host"""
+        self.connections += 1
+        if self.client_factory:
+            return self.client_factory(host, username, key_path)
+
+        # Imported on first real connection: stand-in runs and the other
+        # sources never pay for loading paramiko
+        import paramiko
+
         client = paramiko.SSHClient()
         client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
+        # Without these an unreachable host blocks for the OS TCP timeout
+        timeouts = {
+            'timeout': self.connect_timeout,
+            'banner_timeout': self.connect_timeout,
+            'auth_timeout': self.connect_timeout,
+        }
+
         try:
             if key_path:
-                client.connect(host, username=username, key_filename=key_path)
+                client.connect(host, username=username, key_filename=key_path, **timeouts)
             elif password:
-                client.connect(host, username=username, password=password)
+                client.connect(host, username=username, password=password, **timeouts)
             else:
-                client.connect(host, username=username)
+                client.connect(host, username=username, **timeouts)
 
             logger.info(f"Connected to {host} via SSH")
             return client
@@ -40,209 +159,378 @@ class DockerDiscovery:
             logger.error(f"Failed to connect to {host}: {e}")
             raise
 
-    def execute_command(self, client: paramiko.SSHClient, command: str) -> str:
-        """Execute command on remote host and return output"""
-        stdin, stdout, stderr = client.exec_command(command)
-        exit_status = stdout.channel.recv_exit_status()
+    def stream_inventory(self, client: paramiko.SSHClient,
+                         collect_stats: bool = True,
+                         collect_image_usage: bool = True) -> Iterator[Tuple[str, Dict]]:
+        """Run the collector script on the host and yield (kind, record) pairs
+
+        The whole inventory (volumes, networks, images, containers with their
+        mounts, stats) arrives as NDJSON over a single exec channel. Lines are
+        decoded and normalized by the parse pool (parse_collector_line) as
+        they arrive, so memory stays flat regardless of the container count.
+        Raises RuntimeError once the stream is drained if the collector
+        reported a failed inventory step or did not finish; objects removed
+        while it ran are not a failure.
+        collect_image_usage=False skips the collector's `docker system df -v`.
+        """
+        command = (f"COLLECT_STATS={1 if collect_stats else 0} "
+                   f"COLLECT_IMAGE_USAGE={1 if collect_image_usage else 0} "
+                   f"sh -c {shlex.quote(load_collector_script())}")
+        self.remote_calls += 1
+        stdin, stdout, stderr = client.exec_command(command, timeout=self.command_timeout)
+
+        completed = False
+        failed_steps = []
+        for kind, data in self.parse_pool.map(stdout):
+            if kind == 'end':
+                completed = True
+            elif kind == 'error':
+                step = data['step']
+                if step in OPTIONAL_COLLECTOR_STEPS:
+                    logger.warning(f"Collector step {step} failed (exit {data['exit_status']})")
+                else:
+                    failed_steps.append(step)
+            elif kind == 'vanished':
+                # Removed between the collector's ls and inspect: not seen, so swept
+                logger.info(f"Collector: {data['step']} {data['id'][:12]} removed during the inventory")
+            else:
+                yield kind, data
 
-        if exit_status != 0:
-            error = stderr.read().decode()
-            raise RuntimeError(f"Command failed with exit code {exit_status}: {error}")
+        exit_status = stdout.channel.recv_exit_status()
+        if failed_steps or not completed:
+            error = stderr.read().decode().strip()
+            raise RuntimeError(
+                f"Collector failed (exit code {exit_status}, failed steps: "
+                f"{', '.join(failed_steps) or 'incomplete stream'}): {error}"
+            )
 
-        return stdout.read().decode()
+    def sync_docker_host(self, host_ip: str, username: str = 'root',
+                        key_path: Optional[str] = None,
+                        generation: Optional[int] = None,
+                        collect_stats: bool = True,
+                        light: bool = False):
+        """Synchronize all Docker data for a host to database
+
+        The host is inventoried with one collector run over one SSH connection;
+        records are written as they are parsed from the stream. Once the
+        stream completes successfully, every discovered row is stamped with
+        the sync generation (one UPDATE per table) and rows not seen in this
+        generation are swept.
+
+        light=True is the frequent state sync: containers, volumes, networks,
+        mounts and stats only. Image sizes (`docker system df -v`), the image
+        upsert and sweep, and the content blob GC are left to a full sync.
+        """
+        logger.info(f"Starting Docker discovery for {host_ip}")
+        generation = generation or new_generation()
 
-    def discover_containers(self, host: str, username: str = 'root',
-                           key_path: Optional[str] = None) -> List[Dict]:
-        """Discover all Docker containers on a host"""
-        client = self.connect_ssh(host, username, key_path)
+        # Get or create host record
+        host = self.db.get_host_by_ip(host_ip)
+        if not host:
+            logger.error(f"Host {host_ip} not found in database")
+            return
 
+        docker_host_id = host['id']
+        counts = {'container': 0, 'volume': 0, 'network': 0}
+        seen = {'docker_containers': [], 'docker_volumes': [], 'docker_networks': []}
+        mounts_by_container = {}
+        samples = []
+        images = {}
+        image_usage = []
+
+        # Stored rows, read once per table and compared in memory by the upserts
+        known = {table: self.db.get_scope_rows(table, docker_host_id) for table in seen}
+
+        client = self.acquire_client(host_ip, username, key_path)
+        failed = True
         try:
-            # Get container list with detailed info
-            cmd = """docker ps -a --format '{{json .}}' """
-            output = self.execute_command(client, cmd)
-
-            containers = []
-            for line in output.strip().split('\n'):
-                if not line:
+            # Records arrive normalized by the parse stage
+            for kind, record in self.stream_inventory(client, collect_stats,
+                                                      collect_image_usage=not light):
+                if kind == 'container':
+                    # Mounts are linked once all volumes are known
+                    mounts_by_container[record['container_name']] = record.pop('mounts')
+                    record['docker_host_id'] = docker_host_id
+                    record['last_seen_generation'] = generation
+                    self.db.upsert_docker_container(record, changed_by='discovery',
+                                                    known=known['docker_containers'])
+                    seen['docker_containers'].append(record['container_name'])
+                elif kind == 'volume':
+                    record['docker_host_id'] = docker_host_id
+                    record['last_seen_generation'] = generation
+                    self.db.upsert_docker_volume(record, changed_by='discovery',
+                                                 known=known['docker_volumes'])
+                    seen['docker_volumes'].append(record['volume_name'])
+                elif kind == 'network':
+                    record['docker_host_id'] = docker_host_id
+                    record['last_seen_generation'] = generation
+                    self.db.upsert_docker_network(record, changed_by='discovery',
+                                                  known=known['docker_networks'])
+                    seen['docker_networks'].append(record['network_name'])
+                elif kind == 'image':
+                    if light:
+                        continue
+                    # Images are written in bulk once df sizes are known
+                    record['last_seen_generation'] = generation
+                    images[record['image_id']] = record
                     continue
-
-                container_info = json.loads(line)
-
-                # Get detailed inspect data
-                container_id = container_info['ID']
-                inspect_cmd = f"docker inspect {container_id}"
-                inspect_output = self.execute_command(client, inspect_cmd)
-                inspect_data = json.loads(inspect_output)[0]
-
-                # Extract container details
-                container = {
-                    'container_id': container_id[:12],
-                    'container_name': inspect_data['Name'].lstrip('/'),
-                    'image': inspect_data['Config']['Image'].split(':')[0],
-                    'image_tag': inspect_data['Config']['Image'].split(':')[1] if ':' in inspect_data['Config']['Image'] else 'latest',
-                    'status': 'running' if inspect_data['State']['Running'] else 'exited',
-                    'restart_policy': inspect_data['HostConfig']['RestartPolicy']['Name'],
-                    'network_mode': inspect_data['HostConfig']['NetworkMode'],
-                    'networks': json.dumps(list(inspect_data['NetworkSettings']['Networks'].keys())),
-                    'ports': json.dumps(self._extract_ports(inspect_data)),
-                    'environment_vars': json.dumps(inspect_data['Config']['Env']),
-                    'cpu_limit': None,  # Would need to parse HostConfig.CpuQuota
-                    'memory_limit_mb': inspect_data['HostConfig']['Memory'] // 1024 // 1024 if inspect_data['HostConfig']['Memory'] else None,
-                    'health_status': self._get_health_status(inspect_data),
-                    'labels': json.dumps(inspect_data['Config']['Labels']),
-                    'command': ' '.join(inspect_data['Config']['Cmd']) if inspect_data['Config']['Cmd'] else None,
-                }
-
-                containers.append(container)
-
-            logger.info(f"Discovered {len(containers)} containers on {host}")
-            return containers
-
-        finally:
-            client.close()
-
-    def _extract_ports(self, inspect_data: Dict) -> List[str]:
-        """Extract port mappings from inspect data"""
-        ports = []
-        port_bindings = inspect_data.get('HostConfig', {}).get('PortBindings', {})
-
-        for container_port, host_bindings in port_bindings.items():
-            if host_bindings:
-                for binding in host_bindings:
-                    host_port = binding.get('HostPort', '')
-                    if host_port:
-                        ports.append(f"{host_port}:{container_port}")
-
-        return ports
-
-    def _get_health_status(self, inspect_data: Dict) -> str:
-        """Determine container health status"""
-        if 'Health' in inspect_data['State']:
-            health = inspect_data['State']['Health']
-            return health['Status']
-        return 'none'
-
-    def discover_volumes(self, host: str, username: str = 'root',
-                        key_path: Optional[str] = None) -> List[Dict]:
-        """Discover Docker volumes on a host"""
-        client = self.connect_ssh(host, username, key_path)
-
-        try:
-            cmd = "docker volume ls --format '{{json .}}'"
-            output = self.execute_command(client, cmd)
-
-            volumes = []
-            for line in output.strip().split('\n'):
-                if not line:
+                elif kind == 'image_usage':
+                    image_usage.extend(record or [])
                     continue
-
-                volume_info = json.loads(line)
-
-                # Get detailed inspect data
-                volume_name = volume_info['Name']
-                inspect_cmd = f"docker volume inspect {volume_name}"
-                inspect_output = self.execute_command(client, inspect_cmd)
-                inspect_data = json.loads(inspect_output)[0]
-
-                volume = {
-                    'volume_name': volume_name,
-                    'driver': inspect_data['Driver'],
-                    'mount_point': inspect_data['Mountpoint'],
-                    'options': json.dumps(inspect_data.get('Options', {})),
-                    'labels': json.dumps(inspect_data.get('Labels', {})),
-                }
-
-                volumes.append(volume)
-
-            logger.info(f"Discovered {len(volumes)} volumes on {host}")
-            return volumes
-
+                elif kind == 'stats':
+                    samples.append(record)
+                    continue
+                else:
+                    logger.debug(f"Ignoring collector record of kind {kind}")
+                    continue
+                counts[kind] += 1
+            failed = False
         finally:
-            client.close()
-
-    def discover_networks(self, host: str, username: str = 'root',
-                         key_path: Optional[str] = None) -> List[Dict]:
-        """Discover Docker networks on a host"""
-        client = self.connect_ssh(host, username, key_path)
-
-        try:
-            cmd = "docker network ls --format '{{json .}}'"
-            output = self.execute_command(client, cmd)
+            self.release_client(host_ip, username, client, discard=failed)
 
-            networks = []
-            for line in output.strip().split('\n'):
-                if not line:
-                    continue
+        logger.info(
+            f"Discovered {counts['container']} containers, {counts['volume']} volumes, "
+            f"{counts['network']} networks, {len(images)} images on {host_ip}"
+        )
 
-                network_info = json.loads(line)
+        if not light:
+            # `docker image ls -aq` repeats IDs with several tags, hence keyed by ID
+            image_records = list(images.values())
+            apply_image_usage(image_records, image_usage)
+            self.db.sync_docker_images(docker_host_id, image_records, changed_by='discovery')
 
-                # Get detailed inspect data
-                network_name = network_info['Name']
-                inspect_cmd = f"docker network inspect {network_name}"
-                inspect_output = self.execute_command(client, inspect_cmd)
-                inspect_data = json.loads(inspect_output)[0]
+        # Link containers to their volumes and bind mounts
+        self.db.sync_container_mounts(docker_host_id, mounts_by_container)
 
-                # Extract IPAM config
-                ipam = inspect_data.get('IPAM', {})
-                config = ipam.get('Config', [{}])[0]
+        # Store resource usage samples
+        if samples:
+            self.db.record_container_stats(docker_host_id, samples)
 
-                network = {
-                    'network_name': network_name,
-                    'network_id': inspect_data['Id'][:12],
-                    'driver': inspect_data['Driver'],
-                    'subnet': config.get('Subnet'),
-                    'gateway': config.get('Gateway'),
-                    'internal': inspect_data.get('Internal', False),
-                    'attachable': inspect_data.get('Attachable', False),
-                    'labels': json.dumps(inspect_data.get('Labels', {})),
-                }
+        # Stamp what was seen and remove objects that vanished since the last sync
+        self.db.sweep_docker_host(docker_host_id, generation, changed_by='discovery',
+                                  images=not light, seen=seen)
 
-                networks.append(network)
+        logger.info(f"Completed Docker discovery for {host_ip}")
 
-            logger.info(f"Discovered {len(networks)} networks on {host}")
-            return networks
 
-        finally:
-            client.close()
+# Record parsers: plain functions of the collector data, run in the parse stage
+
+def parse_container(inspect_data: Dict) -> Dict:
+    """Convert `docker inspect` data into a container record (with its mounts)"""
+    image, image_tag = split_image_reference(inspect_data['Config']['Image'])
+    return {
+        'container_id': inspect_data['Id'][:12],
+        'container_name': inspect_data['Name'].lstrip('/'),
+        'image': image,
+        'image_tag': image_tag,
+        'image_id': inspect_data.get('Image'),
+        'status': 'running' if inspect_data['State']['Running'] else 'exited',
+        'restart_policy': inspect_data['HostConfig']['RestartPolicy']['Name'],
+        'network_mode': inspect_data['HostConfig']['NetworkMode'],
+        'networks': json.dumps(list(inspect_data['NetworkSettings']['Networks'].keys())),
+        'ports': json.dumps(extract_ports(inspect_data)),
+        'environment_vars': json.dumps(inspect_data['Config']['Env']),
+        'cpu_limit': None,  # Would need to parse HostConfig.CpuQuota
+        'memory_limit_mb': inspect_data['HostConfig']['Memory'] // 1024 // 1024 if inspect_data['HostConfig']['Memory'] else None,
+        'health_status': get_health_status(inspect_data),
+        'labels': json.dumps(inspect_data['Config']['Labels']),
+        'command': ' '.join(inspect_data['Config']['Cmd']) if inspect_data['Config']['Cmd'] else None,
+        'mounts': extract_mounts(inspect_data),
+    }
+
+
+def parse_image(inspect_data: Dict) -> Dict:
+    """Convert `docker image inspect` data into an image record"""
+    repo_tags = inspect_data.get('RepoTags') or []
+    repo_digests = inspect_data.get('RepoDigests') or []
+    repository, tag = split_image_reference(repo_tags[0]) if repo_tags else (None, None)
+
+    return {
+        'image_id': inspect_data['Id'],
+        'repository': repository,
+        'tag': tag,
+        'repo_tags': json.dumps(repo_tags),
+        'repo_digests': json.dumps(repo_digests),
+        'digest': repo_digests[0].split('@', 1)[1] if repo_digests and '@' in repo_digests[0] else None,
+        'size_bytes': inspect_data.get('Size'),
+        'shared_size_bytes': None,
+        'unique_size_bytes': None,
+        'architecture': inspect_data.get('Architecture'),
+        'os': inspect_data.get('Os'),
+        'image_created_at': inspect_data.get('Created'),
+    }
+
+
+def apply_image_usage(images: List[Dict], usage: List[Dict]):
+    """Fill shared/unique sizes from `docker system df -v` image rows
+
+    df reports truncated IDs and human-readable sizes; entries whose size
+    is unknown ('N/A', -1) leave the columns NULL.
+    """
+    by_short_id = {image['image_id'].split(':')[-1][:12]: image for image in images}
+    for entry in usage:
+        image = by_short_id.get(str(entry.get('ID', '')).split(':')[-1][:12])
+        if image is None:
+            continue
+        for key, column in (('SharedSize', 'shared_size_bytes'), ('UniqueSize', 'unique_size_bytes')):
+            value = entry.get(key)
+            size = value if isinstance(value, int) else parse_size(value)
+            image[column] = size if size is not None and size >= 0 else None
 
-    def sync_docker_host(self, host_ip: str, username: str = 'root',
-                        key_path: Optional[str] = None):
-        """Synchronize all Docker data for a host to database"""
-        logger.info(f"Starting Docker discovery for {host_ip}")
 
-        # Get or create host record
-        host = self.db.get_host_by_ip(host_ip)
-        if not host:
-            logger.error(f"Host {host_ip} not found in database")
-            return
+def extract_ports(inspect_data: Dict) -> List[str]:
+    """Extract port mappings from inspect data"""
+    ports = []
+    port_bindings = inspect_data.get('HostConfig', {}).get('PortBindings', {})
 
-        docker_host_id = host['id']
+    for container_port, host_bindings in port_bindings.items():
+        if host_bindings:
+            for binding in host_bindings:
+                host_port = binding.get('HostPort', '')
+                if host_port:
+                    ports.append(f"{host_port}:{container_port}")
 
-        # Discover containers
-        containers = self.discover_containers(host_ip, username, key_path)
-        for container in containers:
-            container['docker_host_id'] = docker_host_id
-            self.db.upsert_docker_container(container, changed_by='discovery')
+    return ports
 
-        # Discover volumes
-        volumes = self.discover_volumes(host_ip, username, key_path)
-        for volume in volumes:
-            volume['docker_host_id'] = docker_host_id
-            self.db.upsert_docker_volume(volume, changed_by='discovery')
 
-        # Discover networks
-        networks = self.discover_networks(host_ip, username, key_path)
-        for network in networks:
-            network['docker_host_id'] = docker_host_id
-            self.db.upsert_docker_network(network, changed_by='discovery')
+def extract_mounts(inspect_data: Dict) -> List[Dict]:
+    """Extract volume and bind mounts from inspect data"""
+    mounts = []
+    for mount in inspect_data.get('Mounts') or []:
+        if not mount.get('Destination'):
+            continue
 
-        logger.info(f"Completed Docker discovery for {host_ip}")
+        mounts.append({
+            'container_path': mount['Destination'],
+            'volume_name': mount.get('Name') if mount.get('Type') == 'volume' else None,
+            'host_path': mount.get('Source') or None,
+            'read_only': not mount.get('RW', True),
+        })
+
+    return mounts
+
+
+def get_health_status(inspect_data: Dict) -> str:
+    """Determine container health status"""
+    if 'Health' in inspect_data['State']:
+        health = inspect_data['State']['Health']
+        return health['Status']
+    return 'none'
+
+
+def parse_volume(inspect_data: Dict) -> Dict:
+    """Convert `docker volume inspect` data into a volume record"""
+    return {
+        'volume_name': inspect_data['Name'],
+        'driver': inspect_data['Driver'],
+        'mount_point': inspect_data['Mountpoint'],
+        'options': json.dumps(inspect_data.get('Options', {})),
+        'labels': json.dumps(inspect_data.get('Labels', {})),
+    }
+
+
+def parse_network(inspect_data: Dict) -> Dict:
+    """Convert `docker network inspect` data into a network record"""
+    # Extract IPAM config
+    ipam = inspect_data.get('IPAM') or {}
+    config = (ipam.get('Config') or [{}])[0]
+
+    return {
+        'network_name': inspect_data['Name'],
+        'network_id': inspect_data['Id'][:12],
+        'driver': inspect_data['Driver'],
+        'subnet': config.get('Subnet'),
+        'gateway': config.get('Gateway'),
+        'internal': inspect_data.get('Internal', False),
+        'attachable': inspect_data.get('Attachable', False),
+        'labels': json.dumps(inspect_data.get('Labels', {})),
+    }
+
+
+def parse_stats(stats: Dict) -> Dict:
+    """Convert one `docker stats` JSON line into a stats sample"""
+    mem_usage, mem_limit = split_size_pair(stats.get('MemUsage'))
+    net_rx, net_tx = split_size_pair(stats.get('NetIO'))
+    block_read, block_write = split_size_pair(stats.get('BlockIO'))
+    pids = stats.get('PIDs')
+
+    return {
+        'container_name': stats['Name'].lstrip('/'),
+        'cpu_percent': parse_percent(stats.get('CPUPerc')),
+        'mem_usage_mb': round(mem_usage / 1024 / 1024, 1) if mem_usage is not None else None,
+        'mem_limit_mb': round(mem_limit / 1024 / 1024, 1) if mem_limit is not None else None,
+        'mem_percent': parse_percent(stats.get('MemPerc')),
+        'net_rx_bytes': net_rx,
+        'net_tx_bytes': net_tx,
+        'block_read_bytes': block_read,
+        'block_write_bytes': block_write,
+        'pids': int(pids) if pids and pids.isdigit() else None,
+    }
+
+
+def split_size_pair(value: Optional[str]):
+    """Parse an 'a / b' size pair such as '12.5MiB / 7.6GiB' into bytes"""
+    if not value or '/' not in value:
+        return None, None
+    left, right = value.split('/', 1)
+    return parse_size(left), parse_size(right)
+
+
+def parse_size(value: str) -> Optional[int]:
+    """Parse a human-readable size ('1.2GiB', '648B', '3.4kB') into bytes"""
+    match = SIZE_PATTERN.match(value or '')
+    if not match:
+        return None
+    number, unit = match.groups()
+    multiplier = SIZE_UNITS.get(unit.lower() or 'b')
+    if multiplier is None:
+        return None
+    return int(float(number) * multiplier)
+
+
+def parse_percent(value: Optional[str]) -> Optional[float]:
+    """Parse a percentage such as '0.07%' (stopped containers report '--')"""
+    try:
+        return float(value.rstrip('%'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_collector_line(line: str) -> Optional[Tuple[str, Dict]]:
+    """Decode one collector NDJSON line into (kind, record); None for blank lines
+
+    Runs in the parse pool's workers when it has any, so it must stay a
+    module-level function.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    record = loads(line)
+    kind = record.get('kind')
+    parse = RECORD_PARSERS.get(kind)
+    data = record.get('data')
+    return kind, parse(data) if parse is not None else data
+
+
+# Collector record kinds normalized in the parse stage (others pass through)
+RECORD_PARSERS = {
+    'container': parse_container,
+    'volume': parse_volume,
+    'network': parse_network,
+    'image': parse_image,
+    'stats': parse_stats,
+}
 
 
 def main():
     """Main entry point for Docker discovery"""
-    import os
+    import argparse
     from dotenv import load_dotenv
+    from profiling import profile_run
+
+    parser = argparse.ArgumentParser(description='Inventory Docker hosts over SSH (DOCKER_HOSTS)')
+    parser.add_argument('--profile', action='store_true', help='Sample the run and write a profile report')
+    args = parser.parse_args()
 
     # Setup logging
     logging.basicConfig(
@@ -262,22 +550,23 @@ def main():
     discovery = DockerDiscovery(db)
 
     # Discover each Docker host
-    for host_spec in docker_hosts:
-        if not host_spec.strip():
-            continue
-
-        # Parse host specification (user@host or just host)
-        if '@' in host_spec:
-            username, host = host_spec.split('@')
-        else:
-            username = 'root'
-            host = host_spec
-
-        try:
-            discovery.sync_docker_host(host, username, ssh_key_path)
-        except Exception as e:
-            logger.error(f"Failed to discover {host}: {e}")
-            continue
+    with profile_run('docker_profile', enabled=args.profile):
+        for host_spec in docker_hosts:
+            if not host_spec.strip():
+                continue
+
+            # Parse host specification (user@host or just host)
+            if '@' in host_spec:
+                username, host = host_spec.split('@')
+            else:
+                username = 'root'
+                host = host_spec
+
+            try:
+                discovery.sync_docker_host(host, username, ssh_key_path)
+            except Exception as e:
+                logger.error(f"Failed to discover {host}: {e}")
+                continue
 
 
 if __name__ == '__main__':
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Network Discovery
+Sweeps the subnets in the networks table for live addresses (concurrent TCP
+connect or ICMP probes) and reads the gateway's neighbor (ARP) table for
+their MAC addresses
+"""
+
+import asyncio
+import ipaddress
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db_utils import InfrastructureDB, SyncCancelled, new_generation
+
+logger = logging.getLogger(__name__)
+
+# Ports tried by the TCP sweep; a refused connection also proves the host is up
+DEFAULT_SWEEP_PORTS = (22, 80, 443)
+
+# Networks with more usable addresses than this are not swept (e.g. the
+# tailscale 100.64.0.0/10 range)
+DEFAULT_MAX_HOSTS = 1024
+
+# Neighbor table command: Linux (`ip neigh`), with BSD `arp -an` (OPNsense) as fallback
+NEIGHBOR_COMMAND = 'ip neigh show 2>/dev/null || arp -an'
+
+MAC_PATTERN = r'([0-9a-fA-F]{1,2}(?::[0-9a-fA-F]{1,2}){5})'
+
+# `ip neigh`:     192.168.1.5 dev vmbr0 lladdr bc:24:11:aa:bb:cc REACHABLE
+IP_NEIGH_LINE = re.compile(rf'^(\S+) dev (\S+) lladdr {MAC_PATTERN}(?: \S+)* (\S+)$')
+# `arp -an`:      ? (192.168.1.5) at bc:24:11:aa:bb:cc on igb0 expires in 1187 seconds [ethernet]
+ARP_LINE = re.compile(rf'^\S+ \(([^)]+)\) at {MAC_PATTERN} on (\S+)')
+# /proc/net/arp:  192.168.1.5  0x1  0x2  bc:24:11:aa:bb:cc  *  vmbr0
+PROC_ARP_LINE = re.compile(rf'^(\d+\.\d+\.\d+\.\d+)\s+0x\S+\s+(0x\S+)\s+{MAC_PATTERN}\s+\S+\s+(\S+)$')
+
+# Neighbor states that do not hold a usable MAC
+STALE_NEIGHBOR_STATES = ('FAILED', 'INCOMPLETE')
+
+
+def normalize_mac(mac: str) -> str:
+    """Lowercase, zero-padded MAC ('0:1b:2:...' from BSD arp becomes '00:1b:02:...')"""
+    return ':'.join(part.zfill(2) for part in mac.lower().split(':'))
+
+
+def parse_neighbors(text: str) -> List[Dict]:
+    """Parse `ip neigh`, BSD `arp -an` or /proc/net/arp output
+
+    Returns dicts with ip_address, mac_address and interface; incomplete
+    entries and the all-zero MAC are left out.
+    """
+    neighbors = []
+    for line in text.splitlines():
+        line = line.strip()
+        match = IP_NEIGH_LINE.match(line)
+        if match:
+            ip, interface, mac, state = match.groups()
+            if state in STALE_NEIGHBOR_STATES:
+                continue
+        elif ARP_LINE.match(line):
+            ip, mac, interface = ARP_LINE.match(line).groups()
+        elif PROC_ARP_LINE.match(line):
+            ip, flags, mac, interface = PROC_ARP_LINE.match(line).groups()
+            if flags == '0x0':
+                continue
+        else:
+            continue
+
+        mac = normalize_mac(mac)
+        if mac == '00:00:00:00:00:00':
+            continue
+        neighbors.append({'ip_address': ip, 'mac_address': mac, 'interface': interface})
+    return neighbors
+
+
+class FileNeighborSource:
+    """Neighbor table read from a file (saved `ip neigh`/`arp -an` output,
+    or /proc/net/arp when discovery runs on the gateway itself)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.remote_calls = 0
+
+    def __str__(self):
+        return self.path
+
+    def neighbors(self) -> List[Dict]:
+        with open(self.path) as f:
+            return parse_neighbors(f.read())
+
+
+class SSHNeighborSource:
+    """Neighbor table of a gateway/router read over SSH"""
+
+    def __init__(self, host: str, username: str = 'root', key_path: Optional[str] = None,
+                 command: str = NEIGHBOR_COMMAND, connect_timeout: float = 10):
+        self.host = host
+        self.username = username
+        self.key_path = key_path
+        self.command = command
+        self.connect_timeout = connect_timeout
+        self.remote_calls = 0
+
+    def __str__(self):
+        return f"{self.username}@{self.host}"
+
+    def neighbors(self) -> List[Dict]:
+        import paramiko
+
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(self.host, username=self.username, key_filename=self.key_path,
+                           timeout=self.connect_timeout, banner_timeout=self.connect_timeout,
+                           auth_timeout=self.connect_timeout)
+            self.remote_calls += 1
+            stdin, stdout, stderr = client.exec_command(self.command, timeout=self.connect_timeout)
+            output = stdout.read().decode()
+            exit_status = stdout.channel.recv_exit_status()
+            if exit_status != 0:
+                raise RuntimeError(f"Neighbor command failed with exit code {exit_status}: "
+                                   f"{stderr.read().decode().strip()}")
+            return parse_neighbors(output)
+        finally:
+            client.close()
+
+
+def neighbor_source(spec: str, key_path: Optional[str] = None):
+    """Neighbor source from a config value: a file path, or '[user@]host' for SSH"""
+    if spec.startswith(('/', '.', '~')):
+        return FileNeighborSource(os.path.expanduser(spec))
+    username, _, host = spec.rpartition('@')
+    return SSHNeighborSource(host, username or 'root', key_path)
+
+
+class RateLimiter:
+    """Spaces probe starts at least 1/rate seconds apart (rate 0: unlimited)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class NetworkSweeper:
+    """Concurrent liveness sweep of IP ranges
+
+    method 'tcp' connects to each port in `ports` (an accepted or refused
+    connection means the address is up; the first answer cancels the other
+    ports), 'icmp' runs one `ping` per address. At most `concurrency` probes
+    are in flight and at most `rate` start per second.
+    """
+
+    def __init__(self, method: str = 'tcp', ports: Iterable[int] = DEFAULT_SWEEP_PORTS,
+                 timeout: float = 1.0, concurrency: int = 512, rate: float = 2000):
+        if method == 'icmp' and not shutil.which('ping'):
+            logger.warning("ping not found, sweeping with TCP connects instead")
+            method = 'tcp'
+        if method not in ('tcp', 'icmp'):
+            raise ValueError(f"Unknown sweep method {method!r} (expected 'tcp' or 'icmp')")
+        self.method = method
+        self.ports = tuple(ports)
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.rate = rate
+        self.probes = 0
+
+    def sweep(self, addresses: List[str]) -> Dict[str, float]:
+        """Probe the addresses; returns {address: response time in seconds} for live ones"""
+        self.probes = 0
+        return asyncio.run(self._sweep(addresses))
+
+    async def _sweep(self, addresses: List[str]) -> Dict[str, float]:
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._limiter = RateLimiter(self.rate)
+        results = await asyncio.gather(*(self._probe_address(address) for address in addresses))
+        return {address: rtt for address, rtt in zip(addresses, results) if rtt is not None}
+
+    async def _probe_address(self, address: str) -> Optional[float]:
+        start = time.monotonic()
+        if self.method == 'icmp':
+            alive = await self._ping(address)
+        else:
+            tasks = [asyncio.ensure_future(self._connect(address, port)) for port in self.ports]
+            alive = False
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    if await next_done:
+                        alive = True
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return time.monotonic() - start if alive else None
+
+    async def _connect(self, address: str, port: int) -> bool:
+        await self._limiter.wait()
+        async with self._semaphore:
+            self.probes += 1
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(address, port), self.timeout)
+            except ConnectionRefusedError:
+                return True
+            except (OSError, asyncio.TimeoutError):
+                return False
+            writer.close()
+            return True
+
+    async def _ping(self, address: str) -> bool:
+        await self._limiter.wait()
+        async with self._semaphore:
+            self.probes += 1
+            process = await asyncio.create_subprocess_exec(
+                'ping', '-n', '-c', '1', '-W', str(max(1, round(self.timeout))), address,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            return await process.wait() == 0
+
+
+class NetworkDiscovery:
+    """Discover live addresses on the known networks"""
+
+    def __init__(self, db: InfrastructureDB, sweeper: Optional[NetworkSweeper] = None,
+                 neighbors=None, max_hosts: int = DEFAULT_MAX_HOSTS):
+        """
+        Args:
+            db: Database wrapper
+            sweeper: Liveness sweep (default: TCP connects with default limits)
+            neighbors: Optional neighbor table source (FileNeighborSource,
+                SSHNeighborSource or anything with neighbors() -> list of
+                {ip_address, mac_address}); read after the sweep, which
+                fills the gateway's ARP cache
+            max_hosts: Skip networks with more usable addresses than this
+        """
+        self.db = db
+        self.sweeper = sweeper or NetworkSweeper()
+        self.neighbors = neighbors
+        self.max_hosts = max_hosts
+
+    @property
+    def remote_calls(self) -> int:
+        return getattr(self.neighbors, 'remote_calls', 0)
+
+    def sweep_targets(self) -> List[Tuple[Dict, ipaddress.IPv4Network]]:
+        """Networks to sweep, with their parsed CIDR (oversized and IPv6 ones skipped)"""
+        targets = []
+        for network in self.db.get_networks():
+            try:
+                cidr = ipaddress.ip_network(network['cidr'], strict=False)
+            except ValueError:
+                logger.warning(f"Skipping network {network['network_name']}: invalid CIDR {network['cidr']}")
+                continue
+            if cidr.version != 4 or cidr.num_addresses - 2 > self.max_hosts:
+                logger.info(f"Skipping network {network['network_name']} ({cidr}): "
+                            f"more than {self.max_hosts} addresses")
+                continue
+            targets.append((network, cidr))
+        return targets
+
+    @staticmethod
+    def is_host_address(cidr: ipaddress.IPv4Network, address: str) -> bool:
+        """Whether an address is a usable host address of the network"""
+        ip = ipaddress.ip_address(address)
+        if ip.version != cidr.version or ip not in cidr:
+            return False
+        return cidr.prefixlen >= 31 or ip not in (cidr.network_address, cidr.broadcast_address)
+
+    def allocation_type(self, network: Dict, address: str) -> str:
+        """'dhcp' for addresses inside the network's DHCP range, else 'static'"""
+        if network.get('dhcp_enabled') and network.get('dhcp_range_start') and network.get('dhcp_range_end'):
+            try:
+                ip = ipaddress.ip_address(address)
+                if ipaddress.ip_address(network['dhcp_range_start']) <= ip <= ipaddress.ip_address(network['dhcp_range_end']):
+                    return 'dhcp'
+            except ValueError:
+                pass
+        return 'static'
+
+    def sync_networks(self, generation: Optional[int] = None,
+                      cancel: Optional[threading.Event] = None) -> Dict[str, int]:
+        """Sweep every network, merge the neighbor table and write the results
+
+        All networks are swept together in one event loop. Addresses found
+        only in the neighbor table (hosts that drop the probes) count as live.
+        Returns {'networks', 'addresses', 'live', 'neighbors'}. cancel is
+        checked before the sweep and before each network is written; once
+        set, SyncCancelled is raised.
+        """
+        generation = generation or new_generation()
+        targets = self.sweep_targets()
+        addresses = [str(ip) for _, cidr in targets for ip in cidr.hosts()]
+
+        if cancel is not None and cancel.is_set():
+            raise SyncCancelled("cancelled before the sweep")
+        start = time.monotonic()
+        live = self.sweeper.sweep(addresses)
+        logger.info(f"Swept {len(addresses)} addresses in {len(targets)} networks in "
+                    f"{time.monotonic() - start:.1f}s: {len(live)} live ({self.sweeper.probes} probes)")
+
+        macs = {}
+        if self.neighbors is not None:
+            for neighbor in self.neighbors.neighbors():
+                macs[neighbor['ip_address']] = neighbor['mac_address']
+            logger.info(f"Read {len(macs)} neighbor entries from {self.neighbors}")
+
+        seen_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        for network, cidr in targets:
+            if cancel is not None and cancel.is_set():
+                raise SyncCancelled(f"cancelled before writing {network['network_name']}")
+            found = sorted(
+                {ip for ip in live if ipaddress.ip_address(ip) in cidr} |
+                {ip for ip in macs if self.is_host_address(cidr, ip)},
+                key=ipaddress.ip_address
+            )
+            self.db.sync_ip_addresses(network['id'], [{
+                'ip_address': ip,
+                'mac_address': macs.get(ip),
+                'allocation_type': self.allocation_type(network, ip),
+                'last_seen_at': seen_at,
+                'last_seen_generation': generation,
+            } for ip in found], changed_by='network_discovery')
+            logger.info(f"Network {network['network_name']} ({cidr}): {len(found)} live addresses")
+
+        return {'networks': len(targets), 'addresses': len(addresses),
+                'live': len(live), 'neighbors': len(macs)}
+
+
+def main():
+    """Main entry point for network discovery"""
+    import argparse
+    from dotenv import load_dotenv
+    from profiling import profile_run
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Sweep known networks for live addresses')
+    parser.add_argument('--method', choices=('tcp', 'icmp'), default=os.getenv('NETWORK_SWEEP_METHOD', 'tcp'))
+    parser.add_argument('--neighbors', default=os.getenv('NETWORK_NEIGHBORS'),
+                        help="Neighbor table source: file path or [user@]gateway for SSH")
+    parser.add_argument('--profile', action='store_true', help='Sample the run and write a profile report')
+    args = parser.parse_args()
+
+    db = InfrastructureDB(os.getenv('DB_PATH', '../infrastructure.db'))
+    sweeper = NetworkSweeper(
+        method=args.method,
+        ports=[int(port) for port in os.getenv('NETWORK_SWEEP_PORTS', '22,80,443').split(',')],
+        timeout=float(os.getenv('NETWORK_SWEEP_TIMEOUT', '1.0')),
+        concurrency=int(os.getenv('NETWORK_SWEEP_CONCURRENCY', '512')),
+        rate=float(os.getenv('NETWORK_SWEEP_RATE', '2000')),
+    )
+    neighbors = None
+    if args.neighbors:
+        neighbors = neighbor_source(args.neighbors, os.path.expanduser(os.getenv('SSH_KEY_PATH', '~/.ssh/id_rsa')))
+
+    discovery = NetworkDiscovery(db, sweeper, neighbors,
+                                 max_hosts=int(os.getenv('NETWORK_MAX_HOSTS', DEFAULT_MAX_HOSTS)))
+    with profile_run('network_profile', enabled=args.profile):
+        print(discovery.sync_networks())
+
+
+if __name__ == '__main__':
+    main()
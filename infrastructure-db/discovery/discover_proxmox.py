@@ -6,9 +6,9 @@ Connects to Proxmox API and inventories VMs, containers, and resource allocation
 
 import json
 import logging
-from typing import Dict, List
-from proxmoxer import ProxmoxAPI
-from db_utils import InfrastructureDB
+import threading
+from typing import Dict, List, Optional
+from db_utils import InfrastructureDB, SyncCancelled, SyncCheckpoints, new_generation
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +16,26 @@ logger = logging.getLogger(__name__)
 class ProxmoxDiscovery:
     """Discover Proxmox VMs and containers via API"""
 
-    def __init__(self, db: InfrastructureDB, host: str, user: str, password: str, verify_ssl: bool = False):
+    def __init__(self, db: InfrastructureDB, host: str, user: str, password: str, verify_ssl: bool = False,
+                 guest_batch: int = 20):
         self.db = db
         self.host = host
+        # Guests discovered (and checkpointed) together, see sync_proxmox_infrastructure()
+        self.guest_batch = max(1, guest_batch)
+
+        from proxmoxer import ProxmoxAPI
         self.proxmox = ProxmoxAPI(host, user=user, password=password, verify_ssl=verify_ssl)
         logger.info(f"Connected to Proxmox at {host}")
 
+        # Count API requests through the session's response hook
+        self.api_calls = 0
+        session = getattr(self.proxmox, '_store', {}).get('session')
+        if session is not None and hasattr(session, 'hooks'):
+            session.hooks['response'].append(self._count_api_call)
+
+    def _count_api_call(self, response, *args, **kwargs):
+        self.api_calls += 1
+
     def discover_nodes(self) -> List[Dict]:
         """Discover Proxmox cluster nodes"""
         nodes = []
@@ -42,12 +56,12 @@ class ProxmoxDiscovery:
         logger.info(f"Discovered {len(nodes)} Proxmox nodes")
         return nodes
 
-    def discover_vms(self, node_name: str) -> List[Dict]:
-        """Discover VMs on a Proxmox node"""
+    def discover_vms(self, node_name: str, guests: Optional[List[Dict]] = None) -> List[Dict]:
+        """Discover VMs on a Proxmox node (or only the given entries of its VM list)"""
         vms = []
         node = self.proxmox.nodes(node_name)
 
-        for vm in node.qemu.get():
+        for vm in guests if guests is not None else node.qemu.get():
             # Get detailed config
             vmid = vm['vmid']
             config = node.qemu(vmid).config.get()
@@ -89,12 +103,12 @@ class ProxmoxDiscovery:
 
         return networks
 
-    def discover_containers(self, node_name: str) -> List[Dict]:
-        """Discover LXC containers on a Proxmox node"""
+    def discover_containers(self, node_name: str, guests: Optional[List[Dict]] = None) -> List[Dict]:
+        """Discover LXC containers on a Proxmox node (or only the given entries of its container list)"""
         containers = []
         node = self.proxmox.nodes(node_name)
 
-        for ct in node.lxc.get():
+        for ct in guests if guests is not None else node.lxc.get():
             # Get detailed config
             vmid = ct['vmid']
             config = node.lxc(vmid).config.get()
@@ -146,89 +160,164 @@ class ProxmoxDiscovery:
 
         return networks
 
-    def sync_proxmox_infrastructure(self):
-        """Synchronize all Proxmox infrastructure to database"""
+    def store_vm(self, vm_data: Dict, host_id: int, generation: int) -> Optional[int]:
+        """Upsert the host and proxmox_containers records of a discovered VM"""
+        # Create host record for VM
+        vm_host_data = {
+            'hostname': vm_data['name'],
+            'host_type': 'vm',
+            'status': vm_data['status'],
+            'cpu_cores': vm_data['cpu_cores'],
+            'total_ram_mb': vm_data['total_ram_mb'],
+            'parent_host_id': host_id,
+            'vmid': vm_data['vmid'],
+            'criticality': 'high',  # Default, can be updated manually
+        }
+
+        vm_host_id = self.db.upsert_host(vm_host_data, changed_by='proxmox_discovery')
+
+        # Create Proxmox container record (VM)
+        vm_record = {
+            'host_id': vm_host_id,
+            'proxmox_host_id': host_id,
+            'vmid': vm_data['vmid'],
+            'container_type': 'vm',
+            'vm_type': vm_data.get('vm_type'),
+            'os_type': vm_data.get('os_type'),
+            'network_interfaces': vm_data.get('network_interfaces'),
+            'boot_disk': vm_data.get('boot_disk'),
+            'auto_start': vm_data.get('auto_start'),
+            'last_seen_generation': generation,
+        }
+
+        return self.db.upsert_proxmox_container(vm_record, changed_by='proxmox_discovery')
+
+    def store_container(self, ct_data: Dict, host_id: int, generation: int) -> Optional[int]:
+        """Upsert the host and proxmox_containers records of a discovered LXC container"""
+        # Create host record for container
+        ct_host_data = {
+            'hostname': ct_data['name'],
+            'host_type': 'lxc',
+            'management_ip': ct_data.get('management_ip'),
+            'status': ct_data['status'],
+            'cpu_cores': ct_data['cpu_cores'],
+            'total_ram_mb': ct_data['total_ram_mb'],
+            'parent_host_id': host_id,
+            'vmid': ct_data['vmid'],
+            'criticality': 'medium',  # Default
+        }
+
+        ct_host_id = self.db.upsert_host(ct_host_data, changed_by='proxmox_discovery')
+
+        # Create Proxmox container record (LXC)
+        lxc_record = {
+            'host_id': ct_host_id,
+            'proxmox_host_id': host_id,
+            'vmid': ct_data['vmid'],
+            'container_type': 'lxc',
+            'os_template': ct_data.get('os_template'),
+            'unprivileged': ct_data.get('unprivileged'),
+            'rootfs_storage': ct_data.get('rootfs_storage'),
+            'network_config': ct_data.get('network_config'),
+            'nesting': ct_data.get('nesting'),
+            'auto_start': ct_data.get('auto_start'),
+            'last_seen_generation': generation,
+        }
+
+        return self.db.upsert_proxmox_container(lxc_record, changed_by='proxmox_discovery')
+
+    def sync_proxmox_infrastructure(self, generation: Optional[int] = None,
+                                    checkpoints: Optional[SyncCheckpoints] = None,
+                                    cancel: Optional[threading.Event] = None):
+        """Synchronize all Proxmox infrastructure to database
+
+        Guest records are stamped with the sync generation (one UPDATE per
+        batch); after a node's VMs and containers are discovered, guests not
+        seen on it are swept.
+
+        With checkpoints, every batch of guest_batch guests (unit
+        'node/qemu/vmid,...') and every finished node (unit 'node') is
+        recorded, and units completed by an interrupted run are skipped. The
+        node's sweep then keeps rows stamped by those skipped batches.
+
+        cancel is checked before every node and batch; once set, SyncCancelled
+        is raised (the node being synced is not swept).
+        """
         logger.info("Starting Proxmox infrastructure discovery")
+        generation = generation or new_generation()
+        checkpoints = checkpoints or SyncCheckpoints(self.db, None, 'proxmox', generation)
 
         # Discover and sync nodes
         nodes = self.discover_nodes()
         for node_data in nodes:
-            host_id = self.db.upsert_host(node_data, changed_by='proxmox_discovery')
             node_name = node_data['hostname']
+            if cancel is not None and cancel.is_set():
+                raise SyncCancelled(f"cancelled before node {node_name}")
+            if checkpoints.done(node_name):
+                logger.info(f"Skipping node {node_name}: completed by the interrupted run")
+                continue
 
-            # Discover VMs on this node
-            vms = self.discover_vms(node_name)
-            for vm_data in vms:
-                # Create host record for VM
-                vm_host_data = {
-                    'hostname': vm_data['name'],
-                    'host_type': 'vm',
-                    'status': vm_data['status'],
-                    'cpu_cores': vm_data['cpu_cores'],
-                    'total_ram_mb': vm_data['total_ram_mb'],
-                    'parent_host_id': host_id,
-                    'vmid': vm_data['vmid'],
-                    'criticality': 'high',  # Default, can be updated manually
-                }
-
-                vm_host_id = self.db.upsert_host(vm_host_data, changed_by='proxmox_discovery')
-
-                # Create Proxmox container record (VM)
-                vm_record = {
-                    'host_id': vm_host_id,
-                    'proxmox_host_id': host_id,
-                    'vmid': vm_data['vmid'],
-                    'container_type': 'vm',
-                    'vm_type': vm_data.get('vm_type'),
-                    'os_type': vm_data.get('os_type'),
-                    'network_interfaces': vm_data.get('network_interfaces'),
-                    'boot_disk': vm_data.get('boot_disk'),
-                    'auto_start': vm_data.get('auto_start'),
-                }
-
-                self.db.upsert_proxmox_container(vm_record, changed_by='proxmox_discovery')
-
-            # Discover containers on this node
-            containers = self.discover_containers(node_name)
-            for ct_data in containers:
-                # Create host record for container
-                ct_host_data = {
-                    'hostname': ct_data['name'],
-                    'host_type': 'lxc',
-                    'management_ip': ct_data.get('management_ip'),
-                    'status': ct_data['status'],
-                    'cpu_cores': ct_data['cpu_cores'],
-                    'total_ram_mb': ct_data['total_ram_mb'],
-                    'parent_host_id': host_id,
-                    'vmid': ct_data['vmid'],
-                    'criticality': 'medium',  # Default
-                }
-
-                ct_host_id = self.db.upsert_host(ct_host_data, changed_by='proxmox_discovery')
-
-                # Create Proxmox container record (LXC)
-                lxc_record = {
-                    'host_id': ct_host_id,
-                    'proxmox_host_id': host_id,
-                    'vmid': ct_data['vmid'],
-                    'container_type': 'lxc',
-                    'os_template': ct_data.get('os_template'),
-                    'unprivileged': ct_data.get('unprivileged'),
-                    'rootfs_storage': ct_data.get('rootfs_storage'),
-                    'network_config': ct_data.get('network_config'),
-                    'nesting': ct_data.get('nesting'),
-                    'auto_start': ct_data.get('auto_start'),
-                }
-
-                self.db.upsert_proxmox_container(lxc_record, changed_by='proxmox_discovery')
+            host_id = self.db.upsert_host(node_data, changed_by='proxmox_discovery')
+            node = self.proxmox.nodes(node_name)
+
+            upsert_failed = False
+            sweep_generation = generation
+
+            # Discover VMs, then containers, on this node in batches
+            guest_types = (
+                ('qemu', node.qemu, self.discover_vms, self.store_vm),
+                ('lxc', node.lxc, self.discover_containers, self.store_container),
+            )
+            for guest_type, listing, discover, store in guest_types:
+                guests = sorted(listing.get(), key=lambda guest: int(guest['vmid']))
+                for i in range(0, len(guests), self.guest_batch):
+                    batch = guests[i:i + self.guest_batch]
+                    unit = f"{node_name}/{guest_type}/" + ','.join(str(guest['vmid']) for guest in batch)
+                    if checkpoints.done(unit):
+                        sweep_generation = min(sweep_generation, checkpoints.carried_generation(unit))
+                        continue
+                    if cancel is not None and cancel.is_set():
+                        raise SyncCancelled(f"cancelled before {unit}")
+
+                    batch_failed = False
+                    stored = []
+                    for guest_data in discover(node_name, batch):
+                        if store(guest_data, host_id, generation) is None:
+                            batch_failed = True
+                        else:
+                            stored.append(guest_data['vmid'])
+
+                    # Stamped per batch, before its checkpoint, so a resumed
+                    # run's sweep finds the batch's rows carrying its generation
+                    self.db.stamp_generation('proxmox_containers', host_id, stored, generation)
+
+                    if batch_failed:
+                        upsert_failed = True
+                    else:
+                        checkpoints.complete(unit)
+
+            # Remove guests that no longer exist on this node (a failed upsert
+            # leaves its row unstamped, so skip the sweep rather than delete it)
+            if upsert_failed:
+                logger.warning(f"Skipping guest sweep on {node_name}: some upserts failed")
+            else:
+                self.db.sweep_unseen('proxmox_containers', host_id, sweep_generation,
+                                     changed_by='proxmox_discovery')
+                checkpoints.complete(node_name)
 
         logger.info("Completed Proxmox infrastructure discovery")
 
 
 def main():
     """Main entry point for Proxmox discovery"""
+    import argparse
     import os
     from dotenv import load_dotenv
+    from profiling import profile_run
+
+    parser = argparse.ArgumentParser(description='Inventory Proxmox nodes, VMs and containers')
+    parser.add_argument('--profile', action='store_true', help='Sample the run and write a profile report')
+    args = parser.parse_args()
 
     # Setup logging
     logging.basicConfig(
@@ -244,6 +333,7 @@ def main():
     proxmox_user = os.getenv('PROXMOX_USER', 'root@pam')
     proxmox_password = os.getenv('PROXMOX_PASSWORD')
     verify_ssl = os.getenv('PROXMOX_VERIFY_SSL', 'false').lower() == 'true'
+    guest_batch = int(os.getenv('PROXMOX_GUEST_BATCH', '20'))
 
     if not proxmox_password:
         logger.error("PROXMOX_PASSWORD not set in environment")
@@ -253,8 +343,10 @@ def main():
     db = InfrastructureDB(db_path)
 
     # Run discovery
-    discovery = ProxmoxDiscovery(db, proxmox_host, proxmox_user, proxmox_password, verify_ssl)
-    discovery.sync_proxmox_infrastructure()
+    with profile_run('proxmox_profile', enabled=args.profile):
+        discovery = ProxmoxDiscovery(db, proxmox_host, proxmox_user, proxmox_password, verify_ssl,
+                                     guest_batch=guest_batch)
+        discovery.sync_proxmox_infrastructure()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,109 @@
+#!/bin/sh
+#
+# docker_collector.sh (docker-inventory-collector v1)
+# Emits the complete Docker inventory of this host as one NDJSON stream.
+# Run remotely by DockerDiscovery in a single SSH exec (`sh -c`); needs only
+# the docker CLI and POSIX sh.
+#
+# Output: one JSON object per line, {"kind": ..., "data": ...} where kind is
+#   volume | network | image | container   inventory records
+#   stats                                   `docker stats` samples
+#   image_usage                             `docker system df -v` image rows
+#   vanished                                {"step": ..., "id": ...} listed, but
+#                                           removed before it was inspected
+#   error                                   {"step": ..., "exit_status": ...}
+#   end                                     stream completed
+#
+# Environment:
+#   COLLECT_STATS=1|0         sample `docker stats` (default 1)
+#   COLLECT_IMAGE_USAGE=1|0   shared/unique image sizes via `docker system df -v`
+#                             (default 1; also sizes volumes, so can be slow)
+#
+
+COLLECT_STATS="${COLLECT_STATS:-1}"
+COLLECT_IMAGE_USAGE="${COLLECT_IMAGE_USAGE:-1}"
+
+fail() {
+    printf '{"kind":"error","data":{"step":"%s","exit_status":%d}}\n' "$1" "$2"
+}
+
+# inspect_listed STEP IDS COMMAND...: run COMMAND with the IDs listed for STEP.
+# An object removed between the ls and the inspect makes docker print the
+# others and exit non-zero; when every error line is such a missing object,
+# the IDs named are reported as vanished and the step still succeeds. Any
+# other failure fails the step, its errors passed on to stderr.
+inspect_listed() {
+    step=$1
+    ids=$2
+    shift 2
+    [ -n "$ids" ] || return 0
+    err_file=$(mktemp 2>/dev/null || echo "/tmp/docker-collector-err.$$")
+    # shellcheck disable=SC2086
+    "$@" $ids 2> "$err_file"
+    status=$?
+    if [ "$status" -ne 0 ]; then
+        if [ -s "$err_file" ] && ! grep -viqE 'no such|not found' "$err_file"; then
+            for id in $ids; do
+                if grep -qF -- "$id" "$err_file"; then
+                    printf '{"kind":"vanished","data":{"step":"%s","id":"%s"}}\n' "$step" "$id"
+                fi
+            done
+        else
+            cat "$err_file" >&2
+            fail "$step" "$status"
+        fi
+    fi
+    rm -f "$err_file"
+}
+
+# docker stats --no-stream needs ~1-2s to take its sample; start it first so
+# it overlaps with the inspect calls below
+stats_file=""
+if [ "$COLLECT_STATS" = "1" ]; then
+    stats_file=$(mktemp 2>/dev/null || echo "/tmp/docker-collector.$$")
+    docker stats --all --no-stream --no-trunc \
+        --format '{"kind":"stats","data":{{json .}}}' > "$stats_file" 2>/dev/null &
+    stats_pid=$!
+fi
+
+# system df walks every layer and volume; run it alongside the inspects too
+df_file=""
+if [ "$COLLECT_IMAGE_USAGE" = "1" ]; then
+    df_file=$(mktemp 2>/dev/null || echo "/tmp/docker-collector-df.$$")
+    docker system df -v \
+        --format '{"kind":"image_usage","data":{{json .Images}}}' > "$df_file" 2>/dev/null &
+    df_pid=$!
+fi
+
+# Only a failed ls fails a step outright; see inspect_listed() for the inspects
+volumes=$(docker volume ls -q) || fail volumes $?
+inspect_listed volumes "$volumes" docker volume inspect --format '{"kind":"volume","data":{{json .}}}'
+
+networks=$(docker network ls -q) || fail networks $?
+inspect_listed networks "$networks" docker network inspect --format '{"kind":"network","data":{{json .}}}'
+
+images=$(docker image ls -aq --no-trunc) || fail images $?
+inspect_listed images "$images" docker image inspect --format '{"kind":"image","data":{{json .}}}'
+
+containers=$(docker ps -aq --no-trunc) || fail containers $?
+inspect_listed containers "$containers" docker inspect --type container --format '{"kind":"container","data":{{json .}}}'
+
+if [ -n "$stats_file" ]; then
+    if wait "$stats_pid"; then
+        cat "$stats_file"
+    else
+        fail stats $?
+    fi
+    rm -f "$stats_file"
+fi
+
+if [ -n "$df_file" ]; then
+    if wait "$df_pid"; then
+        cat "$df_file"
+    else
+        fail image_usage $?
+    fi
+    rm -f "$df_file"
+fi
+
+echo '{"kind":"end"}'
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Local Docker Host Stand-In
+Serves synthetic or recorded `docker` CLI output through a paramiko-like
+client so DockerDiscovery can run offline (benchmarks, profiling, debugging)
+"""
+
+import hashlib
+import io
+import json
+import logging
+import random
+import shlex
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Header tag identifying docker_collector.sh in an exec'd command
+COLLECTOR_MARKER = 'docker-inventory-collector'
+
+# Services used to build synthetic compose stacks (name, image, port)
+STACK_SERVICES = [
+    ('db', 'postgres:15.4', '5432/tcp'),
+    ('cache', 'redis:7-alpine', '6379/tcp'),
+    ('api', 'ghcr.io/example/api:1.8.2', '8080/tcp'),
+    ('web', 'nginx:1.25', '80/tcp'),
+    ('worker', 'registry.local:5000/example/worker:2024.05', None),
+]
+
+
+class _StandInChannel:
+    """Minimal paramiko Channel: exit status of the executed command"""
+
+    def __init__(self, exit_status: int):
+        self.exit_status = exit_status
+
+    def recv_exit_status(self) -> int:
+        return self.exit_status
+
+    def shutdown_write(self):
+        pass
+
+    def settimeout(self, timeout: Optional[float]):
+        pass
+
+
+class _StandInFile(io.BytesIO):
+    """Minimal paramiko ChannelFile: read() returns bytes, iteration yields str lines"""
+
+    def __init__(self, data: bytes, channel: _StandInChannel):
+        super().__init__(data)
+        self.channel = channel
+
+    def __iter__(self):
+        for line in iter(self.readline, b''):
+            yield line.decode()
+
+
+class StandInSSHClient:
+    """paramiko.SSHClient stand-in bound to a FakeDockerHost"""
+
+    def __init__(self, docker_host: 'FakeDockerHost'):
+        self.docker_host = docker_host
+        self.closed = False
+
+    def exec_command(self, command: str, timeout: Optional[float] = None):
+        exit_status, stdout, stderr = self.docker_host.run(command)
+        channel = _StandInChannel(exit_status)
+        return (
+            _StandInFile(b'', channel),
+            _StandInFile(stdout.encode(), channel),
+            _StandInFile(stderr.encode(), channel),
+        )
+
+    def get_transport(self):
+        return None if self.closed else self
+
+    def is_active(self) -> bool:
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDockerHost:
+    """Synthetic (or recorded) Docker host answering `docker` CLI commands
+
+    Containers are grouped into compose-like stacks that share environment,
+    labels and networks, so the data has the same duplication as real hosts.
+    """
+
+    def __init__(self, containers: int = 10, latency: float = 0.0,
+                 connect_latency: float = 0.0, seed: int = 0,
+                 recording: Optional[Dict[str, Dict]] = None):
+        """
+        Args:
+            containers: Number of synthetic containers to serve
+            latency: Seconds added to every remote command (round trip)
+            connect_latency: Seconds added to every connection (SSH handshake)
+            seed: Random seed for reproducible synthetic data
+            recording: Optional {command: {exit_status, stdout, stderr}} map
+                served verbatim instead of synthetic data
+        """
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.recording = recording
+        self.exec_count = 0
+        self.connect_count = 0
+        self._lock = threading.Lock()
+
+        self.containers: List[Dict] = []
+        self.volumes: List[Dict] = []
+        self.networks: List[Dict] = []
+        self.images: List[Dict] = []
+        if recording is None:
+            self._generate(containers, random.Random(seed))
+
+    @classmethod
+    def from_recording(cls, path: str, latency: float = 0.0,
+                       connect_latency: float = 0.0) -> 'FakeDockerHost':
+        """Load a recording written by RecordingSSHClient.save()"""
+        with open(path) as f:
+            recording = json.load(f)
+        return cls(latency=latency, connect_latency=connect_latency,
+                   recording=recording['commands'])
+
+    def connect(self, host: str = None, username: str = None,
+                key_path: Optional[str] = None) -> StandInSSHClient:
+        """Client factory compatible with DockerDiscovery(client_factory=...)"""
+        with self._lock:
+            self.connect_count += 1
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+        return StandInSSHClient(self)
+
+    def run(self, command: str) -> Tuple[int, str, str]:
+        """Execute a command against the fake host: (exit_status, stdout, stderr)"""
+        with self._lock:
+            self.exec_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.recording is not None:
+            result = self.recording.get(command)
+            if result is None:
+                return 127, '', f"no recording for command: {command}\n"
+            return result.get('exit_status', 0), result.get('stdout', ''), result.get('stderr', '')
+
+        return self._dispatch(command)
+
+    # ------------------------------------------------------------------
+    # Synthetic data
+    # ------------------------------------------------------------------
+
+    def _generate(self, count: int, rng: random.Random):
+        stacks = max(1, count // len(STACK_SERVICES))
+
+        for stack in range(stacks):
+            stack_name = f"stack{stack:03d}"
+            network_name = f"{stack_name}_default"
+            self.networks.append(self._network(network_name, stack))
+
+        self.networks.append(self._network('bridge', None))
+        volume_names = set()
+
+        # One image per service plus superseded and dangling ones (reclaimable)
+        image_ids = {}
+        for _, image, _ in STACK_SERVICES:
+            image_ids[image] = self._image(image, rng)['Id']
+        self._image('postgres:14.9', rng)
+        self._image('ghcr.io/example/api:1.7.0', rng)
+        self._image(None, rng)
+
+        for index in range(count):
+            stack = index % stacks
+            stack_name = f"stack{stack:03d}"
+            service, image, port = STACK_SERVICES[(index // stacks) % len(STACK_SERVICES)]
+            name = f"{stack_name}-{service}-{index // (stacks * len(STACK_SERVICES)) + 1}"
+            container_id = f"{rng.getrandbits(256):064x}"
+            running = rng.random() > 0.1
+
+            volume_name = f"{stack_name}_{service}_data"
+            if service in ('db', 'cache') and volume_name not in volume_names:
+                volume_names.add(volume_name)
+                self.volumes.append({
+                    'Name': volume_name,
+                    'Driver': 'local',
+                    'Mountpoint': f"/var/lib/docker/volumes/{volume_name}/_data",
+                    'Options': None,
+                    'Labels': {'com.docker.compose.project': stack_name},
+                })
+
+            mounts = [{
+                'Type': 'bind',
+                'Source': f"/srv/{stack_name}/config",
+                'Destination': '/config',
+                'RW': False,
+            }]
+            if service in ('db', 'cache'):
+                mounts.append({
+                    'Type': 'volume',
+                    'Name': volume_name,
+                    'Source': f"/var/lib/docker/volumes/{volume_name}/_data",
+                    'Destination': '/data',
+                    'RW': True,
+                })
+
+            self.containers.append({
+                'Id': container_id,
+                'Name': f"/{name}",
+                'Image': image_ids[image],
+                'State': {
+                    'Running': running,
+                    'Status': 'running' if running else 'exited',
+                    **({'Health': {'Status': 'healthy'}} if service == 'api' else {}),
+                },
+                'Config': {
+                    'Image': image,
+                    # Shared per stack, like compose env files
+                    'Env': [
+                        f"STACK={stack_name}",
+                        'TZ=Europe/Brussels',
+                        f"DATABASE_URL=postgres://app@{stack_name}-db-1:5432/app",
+                    ],
+                    'Labels': {
+                        'com.docker.compose.project': stack_name,
+                        'com.docker.compose.service': service,
+                    },
+                    'Cmd': ['run', service],
+                },
+                'HostConfig': {
+                    'RestartPolicy': {'Name': 'unless-stopped'},
+                    'NetworkMode': f"{stack_name}_default",
+                    'Memory': 512 * 1024 * 1024 if service == 'db' else 0,
+                    'PortBindings': (
+                        {port: [{'HostIp': '', 'HostPort': str(10000 + index)}]} if port else {}
+                    ),
+                },
+                'NetworkSettings': {'Networks': {f"{stack_name}_default": {}}},
+                'Mounts': mounts,
+                '_stats': {
+                    'cpu': round(rng.uniform(0, 40), 2) if running else 0.0,
+                    'mem_mib': round(rng.uniform(20, 900), 1) if running else 0.0,
+                },
+            })
+
+    def _network(self, name: str, stack: Optional[int]) -> Dict:
+        subnet = f"172.{18 + (stack or 0) // 256}.{(stack or 0) % 256}.0/24" if stack is not None else '172.17.0.0/16'
+        gateway = subnet.rsplit('.', 1)[0] + '.1' if stack is not None else '172.17.0.1'
+        return {
+            'Name': name,
+            'Id': hashlib.sha256(name.encode()).hexdigest(),
+            'Driver': 'bridge',
+            'Internal': False,
+            'Attachable': False,
+            'IPAM': {'Config': [{'Subnet': subnet, 'Gateway': gateway}]},
+            'Labels': {},
+        }
+
+    def _image(self, reference: Optional[str], rng: random.Random) -> Dict:
+        name = reference.rsplit(':', 1)[0] if reference else None
+        image = {
+            'Id': f"sha256:{hashlib.sha256((reference or str(len(self.images))).encode()).hexdigest()}",
+            'RepoTags': [reference] if reference else [],
+            'RepoDigests': [f"{name}@sha256:{rng.getrandbits(256):064x}"] if name else [],
+            'Created': '2024-05-14T09:21:07.123456789Z',
+            'Size': rng.randrange(20, 900) * 1000 ** 2,
+            'Architecture': 'amd64',
+            'Os': 'linux',
+            '_shared': 7 * 1000 ** 2,  # Base layers shared by every image
+        }
+        self.images.append(image)
+        return image
+
+    def _image_usage(self) -> List[Dict]:
+        """`docker system df -v` image rows (truncated IDs, human-readable sizes)"""
+        rows = []
+        for image in self.images:
+            tags = image['RepoTags']
+            rows.append({
+                'Containers': str(sum(1 for c in self.containers if c['Image'] == image['Id'])),
+                'ID': image['Id'].split(':')[1][:12],
+                'Repository': tags[0].rsplit(':', 1)[0] if tags else '<none>',
+                'Tag': tags[0].rsplit(':', 1)[1] if tags else '<none>',
+                'SharedSize': f"{image['_shared'] / 1000 ** 2:.1f}MB",
+                'Size': f"{image['Size'] / 1000 ** 2:.0f}MB",
+                'UniqueSize': f"{(image['Size'] - image['_shared']) / 1000 ** 2:.0f}MB",
+            })
+        return rows
+
+    def _public(self, record: Dict) -> Dict:
+        return {k: v for k, v in record.items() if not k.startswith('_')}
+
+    def _dispatch(self, command: str) -> Tuple[int, str, str]:
+        if COLLECTOR_MARKER in command:
+            return self._collect(command)
+
+        args = shlex.split(command)
+        if not args or args[0] != 'docker':
+            return 127, '', f"sh: {args[0] if args else ''}: not found\n"
+
+        sub = args[1:]
+        if sub[:2] == ['ps', '-a']:
+            lines = [json.dumps({
+                'ID': c['Id'][:12],
+                'Names': c['Name'].lstrip('/'),
+                'Image': c['Config']['Image'],
+                'State': c['State']['Status'],
+            }) for c in self.containers]
+            return 0, '\n'.join(lines) + '\n', ''
+
+        if sub[:1] == ['inspect']:
+            found = [self._public(c) for c in self.containers
+                     if any(c['Id'].startswith(ref) or c['Name'].lstrip('/') == ref for ref in sub[1:])]
+            return self._inspect_result(found, sub[1:])
+
+        if sub[:2] == ['volume', 'ls']:
+            lines = [json.dumps({'Driver': v['Driver'], 'Name': v['Name']}) for v in self.volumes]
+            return 0, '\n'.join(lines) + ('\n' if lines else ''), ''
+
+        if sub[:2] == ['volume', 'inspect']:
+            found = [v for v in self.volumes if v['Name'] in sub[2:]]
+            return self._inspect_result(found, sub[2:])
+
+        if sub[:2] == ['network', 'ls']:
+            lines = [json.dumps({'Driver': n['Driver'], 'ID': n['Id'][:12], 'Name': n['Name']})
+                     for n in self.networks]
+            return 0, '\n'.join(lines) + '\n', ''
+
+        if sub[:2] == ['network', 'inspect']:
+            found = [n for n in self.networks if n['Name'] in sub[2:]]
+            return self._inspect_result(found, sub[2:])
+
+        if sub[:1] == ['stats']:
+            lines = [json.dumps(self._stats_line(c)) for c in self.containers]
+            return 0, '\n'.join(lines) + '\n', ''
+
+        return 1, '', f"docker: '{' '.join(sub[:2])}' is not a docker command.\n"
+
+    def _stats_line(self, container: Dict) -> Dict:
+        stats = container['_stats']
+        return {
+            'BlockIO': '12.3MB / 4.1MB',
+            'CPUPerc': f"{stats['cpu']:.2f}%",
+            'Container': container['Id'][:12],
+            'ID': container['Id'],
+            'MemPerc': f"{stats['mem_mib'] / 7782.4 * 100:.2f}%",
+            'MemUsage': f"{stats['mem_mib']}MiB / 7.6GiB",
+            'Name': container['Name'].lstrip('/'),
+            'NetIO': '1.2MB / 648kB',
+            'PIDs': '12' if container['State']['Running'] else '0',
+        }
+
+    def _collect(self, command: str) -> Tuple[int, str, str]:
+        """Answer docker_collector.sh with the NDJSON stream it would print"""
+        records = [('volume', v) for v in self.volumes]
+        records += [('network', n) for n in self.networks]
+        records += [('image', self._public(i)) for i in self.images]
+        records += [('container', self._public(c)) for c in self.containers]
+        if 'COLLECT_STATS=0' not in command:
+            records += [('stats', self._stats_line(c)) for c in self.containers]
+        if 'COLLECT_IMAGE_USAGE=0' not in command:
+            records.append(('image_usage', self._image_usage()))
+
+        lines = [json.dumps({'kind': kind, 'data': data}) for kind, data in records]
+        lines.append(json.dumps({'kind': 'end'}))
+        return 0, '\n'.join(lines) + '\n', ''
+
+    def _inspect_result(self, found: List[Dict], refs: List[str]) -> Tuple[int, str, str]:
+        if len(found) < len(refs):
+            return 1, '[]\n', 'Error: No such object\n'
+        return 0, json.dumps(found, indent=4) + '\n', ''
+
+
+class RecordingSSHClient:
+    """Wrap a real paramiko client and record command output for later replay"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands: Dict[str, Dict] = {}
+
+    def exec_command(self, command: str, timeout: Optional[float] = None):
+        stdin, stdout, stderr = self.client.exec_command(command)
+        exit_status = stdout.channel.recv_exit_status()
+        out = stdout.read().decode()
+        err = stderr.read().decode()
+        self.commands[command] = {'exit_status': exit_status, 'stdout': out, 'stderr': err}
+
+        channel = _StandInChannel(exit_status)
+        return _StandInFile(b'', channel), _StandInFile(out.encode(), channel), _StandInFile(err.encode(), channel)
+
+    def get_transport(self):
+        return self.client.get_transport()
+
+    def close(self):
+        self.client.close()
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'commands': self.commands}, f, indent=2)
+        logger.info(f"Saved {len(self.commands)} recorded commands to {path}")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics
+Counters, gauges and histograms rendered in the Prometheus text format,
+for the sync daemon (start_http_server) and the Flask API (/metrics).
+
+Standard library only. Every label combination is a child object created on
+first use and kept, and histograms have fixed buckets, so recording a value
+is a lock and a few integer updates. Nothing is built per observation.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers API requests (ms) up to full syncs (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# Seconds; SQLite transactions and single requests
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Registry:
+    """Metrics rendered together by one /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, 'Metric'] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: 'Metric') -> 'Metric':
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional['Metric']:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # A failing gauge callback must not break the whole scrape
+                logger.warning(f"Metric {metric.name} not rendered: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """A metric family; labels(...) returns the child for one label combination"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def labels(self, *values) -> object:
+        """Child for a label combination (created once, then reused)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use labels()")
+        return self._children[()]
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(Metric):
+    """Monotonic counter (name should end in _total)"""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self._unlabelled().inc(amount)
+
+    def samples(self) -> Iterable[str]:
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_label_text(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(Metric):
+    """Value that goes up and down, set directly or read from a callback at scrape time
+
+    callback returns a number, or for labelled gauges a dict of label tuple -> number.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY, callback: Optional[Callable] = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.callback = callback
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1):
+        self._unlabelled().inc(amount)
+
+    def samples(self) -> Iterable[str]:
+        if self.callback is not None:
+            value = self.callback()
+            values = value if isinstance(value, dict) else {(): value}
+        else:
+            values = {key: child.value for key, child in list(self._children.items())}
+        for key, value in values.items():
+            if value is not None:
+                yield f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}"
+
+
+class _HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum', 'lock')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(Metric):
+    """Distribution over fixed buckets (upper bounds in seconds by default)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabelled().observe(value)
+
+    def time(self, *labelvalues):
+        """Context manager observing the duration of its block"""
+        return _Timer(self.labels(*labelvalues))
+
+    def samples(self) -> Iterable[str]:
+        for key, child in list(self._children.items()):
+            with child.lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_label_text(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_label_text(self.labelnames, key)} {cumulative}"
+
+
+class _Timer:
+    __slots__ = ('child', 'start')
+
+    def __init__(self, child: _HistogramValue):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+
+
+def sqlite_size_bytes(db_path: str) -> int:
+    """Size of a SQLite database on disk, including its WAL"""
+    return sum(os.path.getsize(path) for path in (db_path, db_path + '-wal')
+               if os.path.exists(path))
+
+
+def start_http_server(port: int, addr: str = '0.0.0.0', registry: Registry = REGISTRY):
+    """Serve GET /metrics from a daemon thread; returns the server (call shutdown() to stop)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"metrics {self.address_string()} {format % args}")
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info(f"Serving metrics on http://{addr}:{server.server_address[1]}/metrics")
+    return server
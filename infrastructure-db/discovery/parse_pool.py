@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Parse Pool
+Decodes and normalizes streamed JSON records, inline or in worker processes.
+
+loads() is orjson's decoder when orjson is installed, else the stdlib one.
+ParsePool.map() takes the raw lines of a stream (e.g. the Docker collector's
+NDJSON) and yields parse_line(line) results in stream order. With workers > 0,
+the first `threshold` lines are still parsed inline. After that, chunks of
+lines go to a process pool and results stream back while the host keeps
+sending. Small hosts never pay for the IPC.
+
+Whether the pool pays off depends on the records per host, the CPUs and the
+decoder. bench_parse_pool.py measures the crossover. The default is inline
+(workers = 0).
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def json_decoder() -> Callable[[str], Any]:
+    """orjson.loads when orjson is installed, else json.loads
+
+    Resolved on first use rather than at import: loading orjson costs several
+    milliseconds of startup that runs without a Docker sync never need.
+    """
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        return json.loads
+
+
+def loads(data: str) -> Any:
+    """Decode JSON with the fastest available decoder"""
+    return json_decoder()(data)
+
+# Lines parsed inline before the pool is used (see bench_parse_pool.py)
+DEFAULT_THRESHOLD = 500
+
+# Lines per task sent to a worker
+DEFAULT_CHUNK = 100
+
+
+def _parse_chunk(parse_line: Callable[[str], Any], lines: List[str]) -> List[Any]:
+    """Worker side: parse a chunk of lines, dropping blanks (None results)"""
+    return [record for record in map(parse_line, lines) if record is not None]
+
+
+class ParsePool:
+    """Ordered, streaming parse stage
+
+    parse_line must be a module-level function (it is pickled by reference
+    to the workers) that returns None for lines to skip.
+    """
+
+    def __init__(self, parse_line: Callable[[str], Any], workers: int = 0,
+                 threshold: int = DEFAULT_THRESHOLD, chunk_size: int = DEFAULT_CHUNK):
+        self.parse_line = parse_line
+        self.workers = max(0, workers)
+        self.threshold = max(0, threshold)
+        self.chunk_size = max(1, chunk_size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        """Process pool, started on first use and kept until close()"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._start()
+            return self._executor
+
+    def _start(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawned rather than forked: callers run in thread pools, and
+        # forking a threaded process can copy locks held by other threads
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        logger.info(f"Started {self.workers} parse workers ({json_decoder().__module__} decoder)")
+        return executor
+
+    def map(self, lines: Iterable[str]) -> Iterator[Any]:
+        """Parse lines in order, yielding each non-None result as soon as it is ready"""
+        lines = iter(lines)
+        if not self.workers:
+            for line in lines:
+                record = self.parse_line(line)
+                if record is not None:
+                    yield record
+            return
+
+        for _, line in zip(range(self.threshold), lines):
+            record = self.parse_line(line)
+            if record is not None:
+                yield record
+
+        # At most two chunks in flight per worker; ready results are handed
+        # back between submissions so the writer keeps pace with the stream
+        pending = deque()
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) < self.chunk_size:
+                continue
+            pending.append(self.executor().submit(_parse_chunk, self.parse_line, chunk))
+            chunk = []
+            while pending and (len(pending) > 2 * self.workers or pending[0].done()):
+                yield from pending.popleft().result()
+
+        if chunk:
+            pending.append(self.executor().submit(_parse_chunk, self.parse_line, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+    def close(self):
+        """Stop the worker processes (a later map() starts new ones)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
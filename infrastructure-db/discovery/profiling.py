@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Sync Profiler
+Sampling profiler behind the --profile option of sync_infrastructure.py, the
+discovery scripts and bench_docker_discovery.py (stand-in / replay backends,
+for profiling offline).
+
+A background thread samples the stacks of all threads every few
+milliseconds. Each sample is attributed to a phase:
+
+    network  waiting on SSH, the Proxmox API, sockets, subprocesses
+             (and the stand-in host's simulated latency)
+    parse    JSON decoding and field extraction (json, _parse_*/_extract_*)
+    db       SQLite statements and db_utils
+    python   other Python work
+    idle     threads waiting for work (pool workers, joins, the scheduler)
+
+Two files are written: <name>-<timestamp>.collapsed (one "frame;frame;...
+count" line per stack, for flamegraph.pl or speedscope) and
+<name>-<timestamp>.txt (phase split per thread role, the top-N functions by
+self and inclusive time and the top-N lines).
+"""
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP = 25
+
+PHASES = ('network', 'parse', 'db', 'python', 'idle')
+
+# Module (first path component after site-packages / the stdlib, or the
+# discovery script name) -> phase; the innermost matching frame wins
+MODULE_PHASES = {
+    'paramiko': 'network', 'socket': 'network', 'ssl': 'network', 'asyncio': 'network',
+    'http': 'network', 'urllib3': 'network', 'requests': 'network', 'proxmoxer': 'network',
+    'subprocess': 'network', 'docker_standin': 'network',
+    'json': 'parse', 'orjson': 'parse',
+    'sqlite3': 'db', 'db_utils': 'db',
+    'concurrent': 'idle', 'socketserver': 'idle', 'scheduler': 'idle',
+}
+
+# Blocking primitives: a sample whose innermost frames are only these is
+# attributed to the caller, or counted as idle if no caller matches
+WAIT_MODULES = ('threading', 'queue', 'selectors')
+
+PARSE_FUNCTION = re.compile(r'^_?(parse|extract)_')
+
+# Threads that are part of a library, not the sync (paramiko's transport
+# reader is always blocked on its socket)
+IGNORED_THREAD_MODULES = ('paramiko',)
+
+_THREAD_SUFFIX = re.compile(r'[-_]\d+$|-\d+ \(.*\)$')
+
+
+def _module_of(filename: str) -> str:
+    """Top-level module name of a code file (json/decoder.py -> json)"""
+    path = filename.replace('\\', '/')
+    for marker in ('/site-packages/', '/dist-packages/'):
+        if marker in path:
+            return path.split(marker, 1)[1].split('/', 1)[0].split('.', 1)[0]
+    parent, base = os.path.split(path)
+    stdlib = os.path.dirname(os.__file__).replace('\\', '/')
+    if parent.startswith(stdlib) and parent != stdlib:
+        return parent[len(stdlib) + 1:].split('/', 1)[0]
+    return base.rsplit('.', 1)[0]
+
+
+def _thread_role(name: str) -> str:
+    """Thread name without its pool index (docker-sync_3 -> docker-sync)"""
+    return _THREAD_SUFFIX.sub('', name)
+
+
+class SamplingProfiler:
+    """Samples all threads' stacks from a background thread"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()        # (role, frame, ...) outermost first -> samples
+        self.phases: Dict[str, Counter] = defaultdict(Counter)   # role -> phase -> samples
+        self.lines: Counter = Counter()         # (code, line) of the innermost frame -> samples
+        self.ticks = 0
+        self.started = None
+        self.elapsed = 0.0
+
+        self._labels: Dict[object, Tuple[str, str]] = {}    # code -> (label, phase or '')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            threads = {thread.ident: thread for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                thread = threads.get(ident)
+                if ident == own or thread is None:
+                    continue
+                if type(thread).__module__.split('.', 1)[0] in IGNORED_THREAD_MODULES:
+                    continue
+                self._sample(_thread_role(thread.name), frame)
+            self.ticks += 1
+
+    def _label(self, code) -> Tuple[str, str]:
+        label = self._labels.get(code)
+        if label is None:
+            module = _module_of(code.co_filename)
+            if PARSE_FUNCTION.match(code.co_name):
+                phase = 'parse'
+            elif module in WAIT_MODULES:
+                phase = 'wait'
+            else:
+                phase = MODULE_PHASES.get(module, '')
+            label = (f"{module}:{code.co_name}", phase)
+            self._labels[code] = label
+        return label
+
+    def _sample(self, role: str, frame):
+        self.lines[(frame.f_code, frame.f_lineno)] += 1
+        frames: List[str] = []
+        phase = None
+        waiting = False
+        innermost = True
+        while frame is not None:
+            label, frame_phase = self._label(frame.f_code)
+            frames.append(label)
+            if phase is None:
+                if frame_phase == 'wait':
+                    waiting = waiting or innermost
+                elif frame_phase:
+                    phase = frame_phase
+            innermost = False
+            frame = frame.f_back
+
+        frames.append(role)
+        frames.reverse()
+        self.stacks[tuple(frames)] += 1
+        self.phases[role][phase or ('idle' if waiting else 'python')] += 1
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    @property
+    def tick_seconds(self) -> float:
+        """Measured time per sampling round (longer than interval under load)"""
+        return self.elapsed / self.ticks if self.ticks else self.interval
+
+    def collapsed(self) -> str:
+        """Folded stacks, one 'frame;frame;... count' line each"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, name: str, top: int = DEFAULT_TOP) -> str:
+        """Phase split per thread role and the top functions by self / inclusive samples"""
+        tick = self.tick_seconds
+        total = sum(self.stacks.values())
+        lines = [f"Profile of {name}: {self.elapsed:.2f}s wall, {self.ticks} sampling rounds "
+                 f"({tick * 1000:.1f}ms apart), {total} thread samples", ""]
+
+        lines.append("Thread-seconds by phase")
+        header = f"  {'thread':<18}" + ''.join(f"{phase:>10}" for phase in PHASES) + f"{'busy %net':>11}"
+        lines.append(header)
+        totals = Counter()
+        for role, phases in sorted(self.phases.items()):
+            totals.update(phases)
+            lines.append(self._phase_row(role, phases, tick))
+        lines.append(self._phase_row('all', totals, tick))
+        lines.append("")
+
+        self_samples, inclusive, by_line = Counter(), Counter(), Counter()
+        for stack, count in self.stacks.items():
+            self_samples[stack[-1]] += count
+            for label in set(stack[1:]):
+                inclusive[label] += count
+        for (code, line), count in self.lines.items():
+            by_line[f"{self._label(code)[0]}:{line}"] += count
+        for title, counter in (("functions by self", self_samples), ("functions by inclusive", inclusive),
+                               ("lines by self", by_line)):
+            lines.append(f"Top {top} {title} time")
+            for label, count in counter.most_common(top):
+                lines.append(f"  {count * tick:>8.2f}s {100 * count / max(total, 1):>5.1f}%  {label}")
+            lines.append("")
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _phase_row(role: str, phases: Counter, tick: float) -> str:
+        busy = sum(count for phase, count in phases.items() if phase != 'idle')
+        network = 100 * phases['network'] / busy if busy else 0.0
+        return (f"  {role:<18}" + ''.join(f"{phases[phase] * tick:>9.2f}s" for phase in PHASES)
+                + f"{network:>10.0f}%")
+
+    def write(self, name: str, directory: str = '.', top: int = DEFAULT_TOP) -> Tuple[str, str]:
+        """Write <name>-<timestamp>.collapsed and .txt; returns both paths"""
+        base = os.path.join(directory, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        with open(f"{base}.collapsed", 'w') as f:
+            f.write(self.collapsed())
+        with open(f"{base}.txt", 'w') as f:
+            f.write(self.summary(name, top))
+        return f"{base}.collapsed", f"{base}.txt"
+
+
+def log_directory() -> str:
+    """Directory of the first file handler of the root logger (where the run logs), else cwd"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.FileHandler):
+            return os.path.dirname(handler.baseFilename)
+    return os.getcwd()
+
+
+@contextmanager
+def profile_run(name: str, enabled: bool = True, interval: float = DEFAULT_INTERVAL,
+                directory: Optional[str] = None, top: int = DEFAULT_TOP) -> Iterator[Optional[SamplingProfiler]]:
+    """Profile the block (no-op unless enabled) and write the reports next to the log"""
+    if not enabled:
+        yield None
+        return
+
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        collapsed, summary = profiler.write(name, directory or log_directory(), top)
+        for line in profiler.summary(name, top).splitlines()[:len(profiler.phases) + 5]:
+            logger.info(line)
+        logger.info(f"Profile written to {summary} (flamegraph stacks: {collapsed})")
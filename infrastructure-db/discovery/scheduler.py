@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+In-Process Sync Scheduler
+Runs discovery jobs on per-job intervals with jitter, without overlapping
+jobs that touch the same source (used by `sync_infrastructure.py --daemon`)
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    """A named job with its interval, resources and run bookkeeping"""
+
+    def __init__(self, name: str, func: Callable[[], None], interval: float,
+                 resources: Iterable[str] = (), jitter: float = 0.1):
+        """
+        Args:
+            name: Job name (logs, status)
+            func: Callable run on each tick
+            interval: Seconds between run starts
+            resources: Sources the job touches; jobs sharing a resource never
+                run at the same time
+            jitter: Fraction of the interval added/removed at random per run
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.resources = tuple(resources) or (name,)
+        self.jitter = jitter
+
+        self.next_run = 0.0          # time.monotonic() deadline
+        self.running = False
+        self.deferred = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def schedule_next(self, after: float):
+        """Set the next run one interval (± jitter) after a start time"""
+        spread = self.interval * self.jitter
+        self.next_run = after + self.interval + random.uniform(-spread, spread)
+
+
+class Scheduler:
+    """Interval scheduler running jobs on a small thread pool
+
+    A job whose previous run is still going, or that shares a resource with a
+    running job, is not started; it is retried after `retry_delay` (or as
+    soon as a running job finishes) instead of queueing up behind the running
+    one. A deferred job reserves its resources so frequent short jobs cannot
+    starve a long one (the hourly reconcile behind 30s Docker syncs).
+    """
+
+    def __init__(self, max_workers: int = 4, retry_delay: float = 5.0):
+        self.jobs: List[ScheduledJob] = []
+        self.retry_delay = retry_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sync-job')
+        self._busy: Dict[str, str] = {}      # resource -> running job name
+        self._reserved: Dict[str, str] = {}  # resource -> deferred job name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+
+    def add_job(self, name: str, func: Callable[[], None], interval: float,
+                resources: Iterable[str] = (), jitter: float = 0.1,
+                first_run: Optional[float] = None) -> ScheduledJob:
+        """Register a job; first_run is a delay in seconds (default: random within jitter)"""
+        job = ScheduledJob(name, func, interval, resources, jitter)
+        delay = first_run if first_run is not None else random.uniform(0, interval * jitter)
+        job.next_run = time.monotonic() + delay
+        self.jobs.append(job)
+        self._wakeup.set()
+        return job
+
+    def run_forever(self):
+        """Dispatch due jobs until stop() is called, then wait for running jobs"""
+        logger.info(f"Scheduler started with jobs: "
+                    f"{', '.join(f'{job.name}/{job.interval:g}s' for job in self.jobs)}")
+
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.next_run <= now:
+                    self._dispatch(job, now)
+
+            next_due = min((job.next_run for job in self.jobs), default=now + 60)
+            self._wakeup.wait(timeout=max(0.0, next_due - time.monotonic()))
+            self._wakeup.clear()
+
+        logger.info("Scheduler stopping, waiting for running jobs")
+        self._executor.shutdown(wait=True)
+
+    def stop(self):
+        """Ask run_forever() to return (safe from signal handlers and other threads)"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def status(self) -> List[Dict]:
+        """Snapshot of every job's schedule and last result"""
+        now = time.monotonic()
+        return [{
+            'name': job.name,
+            'interval': job.interval,
+            'running': job.running,
+            'next_run_in': max(0.0, job.next_run - now),
+            'runs': job.runs,
+            'failures': job.failures,
+            'skipped': job.skipped,
+            'last_duration': job.last_duration,
+            'last_error': job.last_error,
+        } for job in self.jobs]
+
+    def _dispatch(self, job: ScheduledJob, now: float):
+        with self._lock:
+            blocker = job.name if job.running else next(
+                (self._busy.get(r) or self._reserved[r] for r in job.resources
+                 if r in self._busy or self._reserved.get(r, job.name) != job.name),
+                None
+            )
+            if blocker is None:
+                job.running = True
+                job.deferred = False
+                for resource in job.resources:
+                    self._busy[resource] = job.name
+                    if self._reserved.get(resource) == job.name:
+                        del self._reserved[resource]
+            elif not job.running and not any(r in self._reserved for r in job.resources):
+                # All-or-nothing so two deferred jobs never hold each other's resources
+                job.deferred = True
+                for resource in job.resources:
+                    self._reserved[resource] = job.name
+
+        if blocker is not None:
+            job.skipped += 1
+            job.next_run = now + min(self.retry_delay, job.interval)
+            logger.debug(f"Job {job.name} deferred: {blocker} still running")
+            return
+
+        job.last_started = now
+        job.schedule_next(now)
+        self._executor.submit(self._run, job)
+
+    def _run(self, job: ScheduledJob):
+        start = time.monotonic()
+        try:
+            job.func()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            job.runs += 1
+            job.last_duration = time.monotonic() - start
+            with self._lock:
+                job.running = False
+                for resource in job.resources:
+                    self._busy.pop(resource, None)
+                # Deferred jobs retry now rather than after retry_delay
+                finished = time.monotonic()
+                for other in self.jobs:
+                    if other.deferred:
+                        other.next_run = min(other.next_run, finished)
+
+            # An overrun job is due again right away; wake the loop so the
+            # next run is not left waiting on a stale timeout
+            self._wakeup.set()
+            logger.info(f"Job {job.name} finished in {job.last_duration:.1f}s")
@@ -2,141 +2,646 @@
 """
 Master Infrastructure Synchronization Script
 Orchestrates discovery from all sources: Proxmox, Docker hosts, network devices
+
+Only the standard library and db_utils load at startup. Each source imports
+its client (proxmoxer, paramiko, asyncio) when it runs and rich loads on the
+first console output, and .env is read without python-dotenv, so short
+single-source runs (`--source docker`) and `--report` start fast;
+bench_startup.py enforces the import-time budget.
 """
 
 import os
 import sys
 import logging
+import signal
+import sqlite3
+import threading
 import time
-from datetime import datetime
-from dotenv import load_dotenv
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
-from db_utils import InfrastructureDB
-from discover_proxmox import ProxmoxDiscovery
-from discover_docker import DockerDiscovery
+import metrics
+from db_utils import InfrastructureDB, SyncCheckpoints, new_generation
 
-console = Console()
 logger = logging.getLogger(__name__)
 
+# Sync metrics (served on SYNC_METRICS_PORT by the daemon)
+SYNC_RUNS = metrics.Counter('infra_sync_runs_total', 'Finished sync runs by mode and status',
+                            ['mode', 'status'])
+SYNC_RUN_SECONDS = metrics.Histogram('infra_sync_run_duration_seconds', 'Wall time of sync runs', ['mode'])
+SYNC_LAST_SUCCESS = metrics.Gauge('infra_sync_last_success_timestamp_seconds',
+                                  'Unix time of the last successful run', ['mode'])
+SYNC_SOURCE_SECONDS = metrics.Histogram('infra_sync_source_duration_seconds',
+                                        'Wall time of a discovery source within a run', ['source'])
+SYNC_TARGETS = metrics.Counter('infra_sync_targets_total', 'Per-host syncs by outcome',
+                               ['source', 'status'])
+SYNC_TARGET_SECONDS = metrics.Histogram('infra_sync_target_duration_seconds',
+                                        'Wall time of a per-host sync', ['source', 'target'])
+SYNC_REMOTE_CALLS = metrics.Counter('infra_sync_remote_calls_total',
+                                    'Remote calls (Proxmox API requests, SSH commands, probes)', ['source'])
+SYNC_ROWS = metrics.Counter('infra_sync_rows_total', 'Discovered rows by outcome', ['source', 'outcome'])
+DB_SIZE = metrics.Gauge('infra_db_size_bytes', 'Database file size including the WAL')
+TARGETS_BACKED_OFF = metrics.Gauge('infra_targets_backed_off', 'Targets skipped by the circuit breaker',
+                                   ['source'])
+
+
+class LazyConsole:
+    """rich Console created on first use, so runs that print nothing never import rich"""
+
+    def __init__(self):
+        self._console = None
+
+    def get(self):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+console = LazyConsole()
+
+# Discovery sources in display order: name -> progress label
+SOURCES = {
+    'proxmox': 'Proxmox',
+    'docker': 'Docker Hosts',
+    'network': 'Network',
+}
+
+# Seconds each source may run before it is reported as timed out
+DEFAULT_DEADLINES = {'proxmox': 300, 'docker': 600, 'network': 120}
+
+# Circuit breaker for Docker hosts: consecutive failures before a host is
+# skipped, and the backoff (seconds) before it is probed again
+DEFAULT_BREAKER = {'threshold': 3, 'base_backoff': 60, 'max_backoff': 3600, 'probe_timeout': 1.0}
+
+# Seconds after which an interrupted full sync is no longer resumed (0 disables)
+DEFAULT_RESUME_WINDOW = 1800
+
+# Daemon job intervals in seconds (0 disables a job); 'full' is run_full_sync
+DEFAULT_INTERVALS = {'docker': 30, 'proxmox': 300, 'network': 900, 'full': 3600}
+
+
+def utc_timestamp() -> str:
+    """Current time in SQLite CURRENT_TIMESTAMP format (UTC)"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def combine_status(statuses: List[str]) -> str:
+    """Overall status of a run (or source) from its parts"""
+    if all(status in ('success', 'skipped') for status in statuses):
+        return 'success'
+    if any(status in ('success', 'partial') for status in statuses):
+        return 'partial'
+    return 'failed'
+
 
 class InfrastructureSync:
     """Master synchronization orchestrator"""
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, keep_alive: bool = False):
         self.config = config
         self.db = InfrastructureDB(config['db_path'])
+
+        # Daemon mode keeps the Proxmox session and SSH connections between runs
+        self.keep_alive = keep_alive
+        self._proxmox_discovery = None
+        self._docker_discovery = {}
+        self._parse_pool = None
         self.results = {
             'proxmox': {'status': 'pending', 'error': None},
             'docker': {'status': 'pending', 'error': None, 'hosts': []},
             'network': {'status': 'pending', 'error': None},
         }
 
-    def sync_proxmox(self):
-        """Synchronize Proxmox infrastructure"""
+        # Set once Proxmox discovery has finished (Docker hosts without a
+        # host record wait for it); set up front when Proxmox is not running
+        self.proxmox_done = threading.Event()
+        self.proxmox_done.set()
+
+        # Hosts that keep failing are skipped (and probed) instead of costing
+        # a connect timeout on every run; created by the first Docker sync
+        self.docker_breaker = None
+
+        self.deadlines = {**DEFAULT_DEADLINES, **config.get('deadlines', {})}
+        self.started_at = {}
+        # Set by run_sources when a source's deadline passes; the source stops
+        # at its next node / host / network
+        self.cancel: Dict[str, threading.Event] = {}
+        self.progress = None
+        self.progress_tasks = {}
+        self._results_lock = threading.Lock()
+
+    def remaining(self, source: str) -> Optional[float]:
+        """Seconds left before a source's deadline (None when not running under one)"""
+        if source not in self.started_at:
+            return None
+        return self.deadlines[source] - (time.monotonic() - self.started_at[source])
+
+    def cancelled(self, source: str) -> bool:
+        """True once run_sources has cancelled the source (its deadline passed)"""
+        event = self.cancel.get(source)
+        return event is not None and event.is_set()
+
+    def set_result(self, source: str, status: str, error: Optional[str] = None):
+        """Record a source's outcome, unless run_sources already marked it timed out"""
+        with self._results_lock:
+            if self.results[source]['status'] == 'timeout':
+                return
+            self.results[source]['status'] = status
+            if error is not None:
+                self.results[source]['error'] = error
+
+    def update_progress(self, source: str, status: str):
+        """Show a status line for a source in the combined progress view"""
+        if self.progress is not None:
+            self.progress.update(self.progress_tasks[source], status=status)
+
+    def proxmox_discovery(self):
+        """Proxmox client (logged in once and reused in keep-alive mode)"""
+        if self._proxmox_discovery is not None:
+            return self._proxmox_discovery
+
+        from discover_proxmox import ProxmoxDiscovery
+
+        discovery = ProxmoxDiscovery(
+            self.db,
+            self.config['proxmox_host'],
+            self.config['proxmox_user'],
+            self.config['proxmox_password'],
+            self.config['proxmox_verify_ssl'],
+            guest_batch=self.config.get('proxmox_guest_batch', 20)
+        )
+        if self.keep_alive:
+            self._proxmox_discovery = discovery
+        return discovery
+
+    def parse_pool(self):
+        """Parse stage shared by all Docker hosts (worker processes start on first use)"""
+        if self._parse_pool is None:
+            from discover_docker import parse_collector_line
+            from parse_pool import ParsePool
+
+            self._parse_pool = ParsePool(parse_collector_line, **self.config.get('parse', {}))
+        return self._parse_pool
+
+    def docker_discovery(self, host: str):
+        """Docker discovery for one host (connection kept open in keep-alive mode)"""
+        from discover_docker import DockerDiscovery
+
+        options = {
+            'connect_timeout': self.config.get('ssh_connect_timeout', 10),
+            'command_timeout': self.config.get('ssh_command_timeout', 120),
+            'parse_pool': self.parse_pool(),
+        }
+        if not self.keep_alive:
+            return DockerDiscovery(self.db, **options)
+        if host not in self._docker_discovery:
+            self._docker_discovery[host] = DockerDiscovery(self.db, keep_alive=True, **options)
+        return self._docker_discovery[host]
+
+    def close(self):
+        """Close kept-alive connections and the parse workers"""
+        for discovery in self._docker_discovery.values():
+            discovery.close()
+        self._docker_discovery.clear()
+        self._proxmox_discovery = None
+        if self._parse_pool is not None:
+            self._parse_pool.close()
+
+    @contextmanager
+    def sync_run(self, mode: str, run: Optional[Dict] = None, resume: bool = False):
+        """Record a run in sync_runs; yields the run (id, generation)
+
+        Passing the enclosing run makes this a no-op, so sources record their
+        phases into a full sync's run. History is best effort: if it cannot
+        be written (e.g. migration 007 not applied) the sync still runs.
+
+        A resumable run checkpoints its completed units and, when the
+        previous run of the same mode was interrupted less than
+        resume_window seconds ago, skips the units that run completed.
+        """
+        if run is not None:
+            yield run
+            return
+
+        run = {'id': None, 'mode': mode, 'generation': new_generation(),
+               'resumable': False, 'resumed_from': None, 'carried': {}}
+        start = time.monotonic()
         try:
-            console.print("[bold blue]Discovering Proxmox infrastructure...[/bold blue]")
-
-            discovery = ProxmoxDiscovery(
-                self.db,
-                self.config['proxmox_host'],
-                self.config['proxmox_user'],
-                self.config['proxmox_password'],
-                self.config['proxmox_verify_ssl']
-            )
-
-            discovery.sync_proxmox_infrastructure()
+            run['id'] = self.db.start_sync_run(mode, run['generation'])
+        except sqlite3.Error as e:
+            logger.warning(f"Sync run history not recorded: {e}")
+
+        window = self.config.get('resume_window', DEFAULT_RESUME_WINDOW)
+        if resume and window > 0 and run['id'] is not None:
+            try:
+                run['resumed_from'], run['carried'] = self.db.resume_sync_run(run['id'], mode, window)
+                run['resumable'] = True
+            except sqlite3.Error as e:
+                logger.warning(f"Sync checkpoints unavailable, not resuming: {e}")
+            if run['resumed_from'] is not None:
+                units = sum(len(units) for units in run['carried'].values())
+                console.print(f"[yellow]Resuming interrupted run {run['resumed_from']}: "
+                              f"skipping {units} completed units[/yellow]")
 
-            self.results['proxmox']['status'] = 'success'
-            console.print("[bold green]✓ Proxmox discovery completed[/bold green]")
-
-        except Exception as e:
-            self.results['proxmox']['status'] = 'failed'
-            self.results['proxmox']['error'] = str(e)
-            logger.error(f"Proxmox discovery failed: {e}")
-            console.print(f"[bold red]✗ Proxmox discovery failed: {e}[/bold red]")
-
-    def sync_docker_hosts(self):
-        """Synchronize all Docker hosts"""
         try:
-            console.print("[bold blue]Discovering Docker hosts...[/bold blue]")
-
-            discovery = DockerDiscovery(self.db)
-            docker_hosts = self.config['docker_hosts']
-
-            for host_spec in docker_hosts:
-                if not host_spec.strip():
-                    continue
+            yield run
+        finally:
+            sources = list(SOURCES) if mode == 'full' else mode.split('+')
+            status = combine_status([self.source_status(source) for source in sources])
+            duration = time.monotonic() - start
+
+            SYNC_RUNS.labels(mode, status).inc()
+            SYNC_RUN_SECONDS.labels(mode).observe(duration)
+            if status == 'success':
+                SYNC_LAST_SUCCESS.labels(mode).set(time.time())
+
+            if run['id'] is not None:
+                errors = [f"{source}: {self.results[source]['error']}"
+                          for source in sources if self.results[source].get('error')]
+                try:
+                    self.db.finish_sync_run(run['id'], status, duration, '; '.join(errors) or None)
+                    if run['resumable'] and status == 'success':
+                        self.db.clear_checkpoints(run['id'])
+                except sqlite3.Error as e:
+                    logger.warning(f"Sync run {run['id']} not closed in history: {e}")
+
+    def checkpoints(self, run: Dict, source: str) -> SyncCheckpoints:
+        """Checkpoints of a source in a run (recording nothing unless the run is resumable)"""
+        return SyncCheckpoints(self.db, run['id'] if run['resumable'] else None, source,
+                               run['generation'], run['carried'].get(source))
+
+    def source_status(self, source: str) -> str:
+        """Status of a source for run history ('partial' if only some Docker hosts failed)
+
+        Backed-off Docker hosts count as failed: they were not inventoried.
+        """
+        status = self.results[source]['status']
+        if source == 'docker' and status == 'success' and self.results['docker']['hosts']:
+            status = combine_status([host['status'] if host['status'] != 'skipped' else 'failed'
+                                     for host in self.results['docker']['hosts']])
+        return status
+
+    def record_phase(self, run: Dict, phase: Dict):
+        """Store a source or host phase of a run (skipped when history is unavailable)"""
+        if phase.get('target') is None:
+            SYNC_SOURCE_SECONDS.labels(phase['source']).observe(phase.get('duration_s') or 0.0)
+            SYNC_REMOTE_CALLS.labels(phase['source']).inc(phase.get('remote_calls') or 0)
+            for outcome, count in (phase.get('counts') or {}).items():
+                SYNC_ROWS.labels(phase['source'], outcome).inc(count)
+        else:
+            SYNC_TARGETS.labels(phase['source'], phase['status']).inc()
+            if phase['status'] != 'skipped':
+                SYNC_TARGET_SECONDS.labels(phase['source'], phase['target']).observe(phase.get('duration_s') or 0.0)
+
+        if run['id'] is None:
+            return
+        try:
+            self.db.record_sync_phase(run['id'], phase)
+        except sqlite3.Error as e:
+            logger.warning(f"Sync phase not recorded: {e}")
 
-                # Parse host specification
-                if '@' in host_spec:
-                    username, host = host_spec.split('@')
-                else:
-                    username = 'root'
-                    host = host_spec
+    def sync_proxmox(self, run: Optional[Dict] = None):
+        """Synchronize Proxmox infrastructure"""
+        with self.sync_run('proxmox', run) as run:
+            self.results['proxmox'] = {'status': 'running', 'error': None}
+            phase = {'source': 'proxmox', 'started_at': utc_timestamp()}
+            start = time.monotonic()
+            try:
+                console.print("[bold blue]Discovering Proxmox infrastructure...[/bold blue]")
+
+                discovery = self.proxmox_discovery()
+                calls_before = discovery.api_calls
+                try:
+                    with self.db.tally() as phase['counts']:
+                        discovery.sync_proxmox_infrastructure(generation=run['generation'],
+                                                              checkpoints=self.checkpoints(run, 'proxmox'),
+                                                              cancel=self.cancel.get('proxmox'))
+                finally:
+                    phase['remote_calls'] = discovery.api_calls - calls_before
+
+                self.set_result('proxmox', 'success')
+                console.print("[bold green]✓ Proxmox discovery completed[/bold green]")
+
+            except Exception as e:
+                self.set_result('proxmox', 'failed', str(e))
+                logger.error(f"Proxmox discovery failed: {e}")
+
+                # Log in again next time (expired ticket, API restart)
+                self._proxmox_discovery = None
+                console.print(f"[bold red]✗ Proxmox discovery failed: {e}[/bold red]")
+
+            finally:
+                # Release Docker hosts waiting for their host records
+                self.proxmox_done.set()
+
+                phase.update(status=self.results['proxmox']['status'],
+                             duration_s=time.monotonic() - start,
+                             error=self.results['proxmox']['error'])
+                self.record_phase(run, phase)
+
+    def sync_docker_hosts(self, run: Optional[Dict] = None, light: bool = False):
+        """Synchronize all Docker hosts (concurrently, docker_workers at a time)
+
+        light=True is the daemon's frequent state job: container state only,
+        without image sizes, the image sync or the image GC (see
+        DockerDiscovery.sync_docker_host); the full reconcile keeps them.
+        """
+        with self.sync_run('docker', run) as run:
+            self.results['docker'] = {'status': 'running', 'error': None, 'hosts': []}
+            started_at = utc_timestamp()
+            start = time.monotonic()
+            try:
+                console.print("[bold blue]Discovering Docker hosts...[/bold blue]")
+
+                from concurrent.futures import ThreadPoolExecutor
+                from circuit_breaker import CircuitBreaker
+
+                if self.docker_breaker is None:
+                    self.docker_breaker = CircuitBreaker(
+                        self.db, 'docker', **{**DEFAULT_BREAKER, **self.config.get('breaker', {})})
+
+                host_specs = [spec for spec in self.config['docker_hosts'] if spec.strip()]
+                workers = max(1, min(self.config.get('docker_workers', 4), len(host_specs) or 1))
+                checkpoints = self.checkpoints(run, 'docker')
 
                 try:
-                    console.print(f"  → Discovering {host}...")
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='docker-sync') as pool:
+                        list(pool.map(lambda spec: self.sync_docker_host(spec, run, checkpoints, light),
+                                      host_specs))
+                finally:
+                    # Parse workers only outlive the run in daemon mode
+                    if not self.keep_alive and self._parse_pool is not None:
+                        self._parse_pool.close()
+
+                self.set_result('docker', 'success')
+                console.print("[bold green]✓ Docker discovery completed[/bold green]")
+
+            except Exception as e:
+                self.set_result('docker', 'failed', str(e))
+                logger.error(f"Docker discovery failed: {e}")
+                console.print(f"[bold red]✗ Docker discovery failed: {e}[/bold red]")
+
+            # Source phase: totals over the host phases
+            hosts = self.results['docker']['hosts']
+            counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+            for host in hosts:
+                for outcome, count in (host.get('counts') or {}).items():
+                    counts[outcome] += count
+            failed = [host['host'] for host in hosts if host['status'] not in ('success', 'skipped')]
+            skipped = [host['host'] for host in hosts if host['status'] == 'skipped']
+            problems = []
+            if failed:
+                problems.append(f"{len(failed)}/{len(hosts)} hosts failed: {', '.join(failed)}")
+            if skipped:
+                problems.append(f"{len(skipped)} backed off: {', '.join(skipped)}")
+            self.record_phase(run, {
+                'source': 'docker',
+                'status': self.source_status('docker'),
+                'started_at': started_at,
+                'duration_s': time.monotonic() - start,
+                'remote_calls': sum(host.get('remote_calls') or 0 for host in hosts),
+                'counts': counts,
+                'error': self.results['docker']['error'] or '; '.join(problems) or None,
+            })
+
+    def sync_docker_host(self, host_spec: str, run: Dict, checkpoints: Optional[SyncCheckpoints] = None,
+                         light: bool = False):
+        """Synchronize one Docker host ('user@host' or 'host') and record the result"""
+        from circuit_breaker import CircuitOpenError
+
+        # Parse host specification
+        if '@' in host_spec:
+            username, host = host_spec.split('@')
+        else:
+            username = 'root'
+            host = host_spec
+
+        started_at = utc_timestamp()
+        start = time.monotonic()
+        counts = None
+        remote_calls = None
+
+        if checkpoints is not None and checkpoints.done(host):
+            result = {'host': host, 'status': 'success', 'resumed': True}
+            console.print(f"  [green]↷ {host} already synced by run {run['resumed_from']}[/green]")
+            self.record_phase(run, {
+                'source': 'docker', 'target': host, 'status': 'skipped', 'started_at': started_at,
+                'duration_s': 0.0, 'error': f"completed by run {run['resumed_from']}",
+            })
+            with self._results_lock:
+                self.results['docker']['hosts'].append(result)
+                done = len(self.results['docker']['hosts'])
+            self.update_progress('docker', f"{done}/{len(self.config['docker_hosts'])} hosts")
+            return
+
+        try:
+            remaining = self.remaining('docker')
+            if self.cancelled('docker') or (remaining is not None and remaining <= 0):
+                raise TimeoutError("Docker deadline reached before the host was started")
+
+            # Host records for VMs/LXCs are created by Proxmox discovery
+            if not self.proxmox_done.is_set() and not self.db.get_host_by_ip(host):
+                self.update_progress('docker', f"{host}: waiting for Proxmox")
+                if not self.proxmox_done.wait(timeout=remaining):
+                    raise TimeoutError("Docker deadline reached waiting for Proxmox host records")
+
+            if not self.db.get_host_by_ip(host):
+                raise LookupError(f"no host record with management IP {host}")
+
+            # Backed-off hosts are skipped here, before any SSH connect
+            self.docker_breaker.check(host)
+
+            console.print(f"  → Discovering {host}...")
+            self.update_progress('docker', f"{host}: discovering")
+            discovery = self.docker_discovery(host)
+            calls_before = discovery.remote_calls
+            try:
+                with self.db.tally() as counts:
                     discovery.sync_docker_host(
                         host,
                         username,
-                        self.config.get('ssh_key_path')
+                        self.config.get('ssh_key_path'),
+                        generation=run['generation'],
+                        light=light
                     )
-                    self.results['docker']['hosts'].append({
-                        'host': host,
-                        'status': 'success'
-                    })
-                    console.print(f"  [green]✓ {host} completed[/green]")
-
-                except Exception as e:
-                    self.results['docker']['hosts'].append({
-                        'host': host,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-                    logger.error(f"Docker discovery failed for {host}: {e}")
-                    console.print(f"  [red]✗ {host} failed: {e}[/red]")
-
-            self.results['docker']['status'] = 'success'
-            console.print("[bold green]✓ Docker discovery completed[/bold green]")
+            except Exception as e:
+                self.docker_breaker.record_failure(host, str(e))
+                raise
+            finally:
+                remote_calls = discovery.remote_calls - calls_before
+            self.docker_breaker.record_success(host)
+            if checkpoints is not None:
+                checkpoints.complete(host)
+            result = {'host': host, 'status': 'success'}
+            console.print(f"  [green]✓ {host} completed[/green]")
+
+        except CircuitOpenError as e:
+            result = {'host': host, 'status': 'skipped', 'error': str(e)}
+            logger.info(f"Skipping Docker host {host}: {e}")
+            console.print(f"  [yellow]↷ {host} skipped: {e}[/yellow]")
 
         except Exception as e:
-            self.results['docker']['status'] = 'failed'
-            self.results['docker']['error'] = str(e)
-            logger.error(f"Docker discovery failed: {e}")
-            console.print(f"[bold red]✗ Docker discovery failed: {e}[/bold red]")
-
-    def sync_network(self):
-        """Synchronize network topology (placeholder for future implementation)"""
-        try:
-            console.print("[bold blue]Discovering network topology...[/bold blue]")
-
-            # TODO: Implement network discovery
-            # - Query OPNsense API for firewall rules
-            # - Parse ARP tables for IP/MAC mappings
-            # - Discover routing tables
-            # - Inventory VLANs and network segments
-
-            self.results['network']['status'] = 'skipped'
-            console.print("[yellow]⚠ Network discovery not yet implemented[/yellow]")
-
-        except Exception as e:
-            self.results['network']['status'] = 'failed'
-            self.results['network']['error'] = str(e)
-            logger.error(f"Network discovery failed: {e}")
-            console.print(f"[bold red]✗ Network discovery failed: {e}[/bold red]")
+            result = {'host': host, 'status': 'failed', 'error': str(e)}
+            logger.error(f"Docker discovery failed for {host}: {e}")
+            console.print(f"  [red]✗ {host} failed: {e}[/red]")
+
+        result.update(counts=counts, remote_calls=remote_calls)
+        self.record_phase(run, {
+            'source': 'docker',
+            'target': host,
+            'status': result['status'],
+            'started_at': started_at,
+            'duration_s': time.monotonic() - start,
+            'remote_calls': remote_calls,
+            'counts': counts,
+            'error': result.get('error'),
+        })
+
+        with self._results_lock:
+            self.results['docker']['hosts'].append(result)
+            done = len(self.results['docker']['hosts'])
+        self.update_progress('docker', f"{done}/{len(self.config['docker_hosts'])} hosts")
+
+    def sync_network(self, run: Optional[Dict] = None):
+        """Synchronize live addresses on the known networks (sweep + neighbor table)"""
+        with self.sync_run('network', run) as run:
+            self.results['network'] = {'status': 'running', 'error': None}
+            phase = {'source': 'network', 'started_at': utc_timestamp()}
+            start = time.monotonic()
+            try:
+                console.print("[bold blue]Discovering network topology...[/bold blue]")
+
+                discovery = self.network_discovery()
+                try:
+                    with self.db.tally() as phase['counts']:
+                        summary = discovery.sync_networks(generation=run['generation'],
+                                                          cancel=self.cancel.get('network'))
+                finally:
+                    phase['remote_calls'] = discovery.remote_calls
+
+                self.set_result('network', 'success')
+                self.results['network']['details'] = (f"{summary['live']}/{summary['addresses']} addresses "
+                                                      f"live in {summary['networks']} networks")
+                console.print(f"[bold green]✓ Network discovery completed[/bold green] "
+                              f"({self.results['network']['details']})")
+
+            except Exception as e:
+                self.set_result('network', 'failed', str(e))
+                logger.error(f"Network discovery failed: {e}")
+                console.print(f"[bold red]✗ Network discovery failed: {e}[/bold red]")
+
+            finally:
+                phase.update(status=self.results['network']['status'],
+                             duration_s=time.monotonic() - start,
+                             error=self.results['network']['error'])
+                self.record_phase(run, phase)
+
+    def network_discovery(self):
+        """Network sweep configured from NETWORK_* settings"""
+        from discover_network import NetworkDiscovery, NetworkSweeper, neighbor_source
+
+        settings = self.config.get('network', {})
+        neighbors = None
+        if settings.get('neighbors'):
+            neighbors = neighbor_source(settings['neighbors'], self.config.get('ssh_key_path'))
+        return NetworkDiscovery(self.db, NetworkSweeper(**settings.get('sweep', {})), neighbors,
+                                max_hosts=settings.get('max_hosts', 1024))
+
+    def run_sources(self, sources: dict):
+        """Run discovery sources in parallel threads under per-source deadlines
+
+        Sources are independent except that Docker hosts without a host record
+        wait for Proxmox discovery. A source still running at its deadline is
+        reported as timed out and cancelled: it stops before its next Proxmox
+        node or guest batch, Docker host or network. Returns only once every
+        source thread has stopped, so nothing writes after the run is closed.
+        """
+        from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+        if 'proxmox' in sources:
+            self.proxmox_done.clear()
+
+        progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[bold]{task.description:<14}"),
+            TextColumn("{task.fields[status]}"),
+            TimeElapsedColumn(),
+            console=console.get(),
+        )
+        threads = {}
+
+        with progress:
+            self.progress = progress
+            for name, target in sources.items():
+                self.progress_tasks[name] = progress.add_task(SOURCES[name], total=1, status='running')
+                self.started_at[name] = time.monotonic()
+                self.cancel[name] = threading.Event()
+                threads[name] = threading.Thread(
+                    target=self._run_source, args=(name, target),
+                    name=f"sync-{name}", daemon=True
+                )
+                threads[name].start()
+
+            for name, thread in threads.items():
+                thread.join(max(0.0, self.remaining(name)))
+                if thread.is_alive():
+                    self.cancel[name].set()
+                    with self._results_lock:
+                        self.results[name]['status'] = 'timeout'
+                        self.results[name]['error'] = f"deadline of {self.deadlines[name]}s exceeded"
+                    logger.error(f"{SOURCES[name]} discovery exceeded its {self.deadlines[name]}s deadline, "
+                                 f"stopping it")
+                    self.update_progress(name, "[red]timeout, stopping[/red]")
+
+            # A cancelled source finishes the unit it is in (one SSH command
+            # or API call at most, bounded by their timeouts)
+            for thread in threads.values():
+                thread.join()
+
+            self.progress = None
+            self.started_at = {}
+            self.cancel = {}
+
+    def _run_source(self, name: str, target):
+        """Thread body: run one source and mark it finished in the progress view"""
+        start = time.monotonic()
+        target()
+        with self._results_lock:
+            self.results[name]['duration'] = time.monotonic() - start
+            status = self.results[name]['status']
+        if self.progress is not None:
+            color = 'green' if status == 'success' else 'yellow' if status == 'skipped' else 'red'
+            self.progress.update(self.progress_tasks[name], completed=1,
+                                 status=f"[{color}]{status}[/{color}]")
+
+    def run_full_sync(self, sources: Optional[List[str]] = None):
+        """Execute complete infrastructure synchronization
+
+        sources limits the run to some of SOURCES (`--source`); the run is
+        recorded under the source name(s) instead of 'full'.
+        """
+        from rich.table import Table
+
+        sources = [name for name in SOURCES if sources is None or name in sources]
+        mode = 'full' if len(sources) == len(SOURCES) else '+'.join(sources)
 
-    def run_full_sync(self):
-        """Execute complete infrastructure synchronization"""
         start_time = datetime.now()
         console.print(f"\n[bold]Infrastructure Discovery - {start_time.strftime('%Y-%m-%d %H:%M:%S')}[/bold]\n")
 
-        # Run all discovery tasks
-        self.sync_proxmox()
-        self.sync_docker_hosts()
-        self.sync_network()
+        # Run the discovery sources concurrently, recorded as one run that
+        # picks up after an interrupted one
+        with self.sync_run(mode, resume=True) as run:
+            targets = {
+                'proxmox': lambda: self.sync_proxmox(run),
+                'docker': lambda: self.sync_docker_hosts(run),
+                'network': lambda: self.sync_network(run),
+            }
+            self.run_sources({name: targets[name] for name in sources})
 
         # Print summary
         end_time = datetime.now()
@@ -148,43 +653,114 @@ class InfrastructureSync:
         table.add_column("Component", style="cyan")
         table.add_column("Status", justify="center")
         table.add_column("Details")
+        table.add_column("Time", justify="right")
 
         # Proxmox status
-        px_status = self.results['proxmox']['status']
-        px_color = 'green' if px_status == 'success' else 'red'
-        table.add_row(
-            "Proxmox",
-            f"[{px_color}]{px_status}[/{px_color}]",
-            self.results['proxmox'].get('error', '')
-        )
+        if 'proxmox' in sources:
+            px_status = self.results['proxmox']['status']
+            px_color = 'green' if px_status == 'success' else 'red'
+            table.add_row(
+                "Proxmox",
+                f"[{px_color}]{px_status}[/{px_color}]",
+                self.results['proxmox'].get('error', ''),
+                self.format_duration('proxmox')
+            )
 
         # Docker status
-        docker_status = self.results['docker']['status']
-        docker_color = 'green' if docker_status == 'success' else 'red'
-        docker_hosts_success = len([h for h in self.results['docker']['hosts'] if h['status'] == 'success'])
-        docker_hosts_total = len(self.results['docker']['hosts'])
-        table.add_row(
-            "Docker Hosts",
-            f"[{docker_color}]{docker_status}[/{docker_color}]",
-            f"{docker_hosts_success}/{docker_hosts_total} hosts discovered"
-        )
+        if 'docker' in sources:
+            docker_status = self.results['docker']['status']
+            docker_color = 'green' if docker_status == 'success' else 'red'
+            docker_hosts_success = len([h for h in self.results['docker']['hosts'] if h['status'] == 'success'])
+            docker_hosts_total = len(self.results['docker']['hosts'])
+            docker_hosts_resumed = len([h for h in self.results['docker']['hosts'] if h.get('resumed')])
+            table.add_row(
+                "Docker Hosts",
+                f"[{docker_color}]{docker_status}[/{docker_color}]",
+                f"{docker_hosts_success}/{docker_hosts_total} hosts discovered"
+                + (f" ({docker_hosts_resumed} resumed)" if docker_hosts_resumed else ''),
+                self.format_duration('docker')
+            )
 
         # Network status
-        net_status = self.results['network']['status']
-        net_color = 'yellow' if net_status == 'skipped' else 'green' if net_status == 'success' else 'red'
-        table.add_row(
-            "Network",
-            f"[{net_color}]{net_status}[/{net_color}]",
-            self.results['network'].get('error', '')
-        )
+        if 'network' in sources:
+            net_status = self.results['network']['status']
+            net_color = 'yellow' if net_status == 'skipped' else 'green' if net_status == 'success' else 'red'
+            table.add_row(
+                "Network",
+                f"[{net_color}]{net_status}[/{net_color}]",
+                self.results['network'].get('error') or self.results['network'].get('details', ''),
+                self.format_duration('network')
+            )
 
         console.print(table)
 
         # Print infrastructure stats
         self.print_infrastructure_stats()
 
+    def run_daemon(self):
+        """Run sources on their own intervals until SIGINT/SIGTERM
+
+        Docker state, Proxmox config and the full reconcile (run_full_sync)
+        are separate jobs; jobs touching the same source never overlap (a
+        job returns only once its timed-out source threads have stopped, see
+        run_sources), and connections stay warm between runs. The Docker job
+        is a light state sync; image sizes and image GC come with the full
+        reconcile.
+        """
+        from scheduler import Scheduler
+
+        intervals = {**DEFAULT_INTERVALS, **self.config.get('intervals', {})}
+        jitter = self.config.get('jitter', 0.1)
+        scheduler = Scheduler(max_workers=len(intervals))
+
+        # The full reconcile runs first; the per-source jobs follow on their intervals
+        jobs = {
+            'full': (self.run_full_sync, ('proxmox', 'docker', 'network'), 0),
+            'docker': (lambda: self.sync_docker_hosts(light=True), ('docker',), None),
+            'proxmox': (self.sync_proxmox, ('proxmox',), None),
+            'network': (self.sync_network, ('network',), None),
+        }
+        for name, (func, resources, first_run) in jobs.items():
+            if intervals[name] > 0:
+                scheduler.add_job(name, func, intervals[name], resources, jitter,
+                                  first_run=first_run if first_run is not None else intervals[name])
+
+        def shutdown(signum, frame):
+            console.print(f"[yellow]Received signal {signum}, stopping after running jobs...[/yellow]")
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        port = self.config.get('metrics_port', 0)
+        if port:
+            DB_SIZE.callback = lambda: metrics.sqlite_size_bytes(self.config['db_path'])
+            TARGETS_BACKED_OFF.callback = self.backed_off_targets
+            metrics.start_http_server(port, self.config.get('metrics_addr', '0.0.0.0'))
+
+        console.print(f"[bold]Infrastructure sync daemon started[/bold] "
+                      f"({', '.join(f'{name} every {seconds}s' for name, seconds in intervals.items() if seconds > 0)})")
+        try:
+            scheduler.run_forever()
+        finally:
+            self.close()
+
+    def backed_off_targets(self) -> Dict[tuple, int]:
+        """Open circuits per source, read at scrape time"""
+        rows = self.db.execute_query("""
+            SELECT source, COUNT(*) as cnt FROM target_health WHERE state = 'open' GROUP BY source
+        """)
+        return {(row['source'],): row['cnt'] for row in rows}
+
+    def format_duration(self, source: str) -> str:
+        """Wall time of a finished source for the summary table"""
+        duration = self.results[source].get('duration')
+        return f"{duration:.1f}s" if duration is not None else '-'
+
     def print_infrastructure_stats(self):
         """Print current infrastructure statistics"""
+        from rich.table import Table
+
         console.print("\n[bold]Infrastructure Statistics[/bold]")
 
         stats_table = Table(show_header=True, header_style="bold cyan")
@@ -207,9 +783,124 @@ class InfrastructureSync:
         console.print(stats_table)
 
 
+def print_sync_report(db: InfrastructureDB, days: int = 7):
+    """Print recent runs, daily duration trend and slowest hosts from sync history"""
+    from rich.table import Table
+
+    window = f"-{days} days"
+
+    runs = db.execute_query("""
+        SELECT id, mode, status, started_at, duration_s, remote_calls,
+               rows_created, rows_updated, rows_unchanged, rows_deleted, error, resumed_from
+        FROM sync_runs
+        ORDER BY id DESC
+        LIMIT 15
+    """)
+    table = Table(title="Recent Sync Runs", show_header=True, header_style="bold magenta")
+    for column in ("Run", "Started (UTC)", "Mode", "Status", "Time", "Calls",
+                   "New", "Upd", "Same", "Del"):
+        table.add_column(column, justify="left" if column in ("Started (UTC)", "Mode", "Status") else "right")
+    for run in runs:
+        color = 'green' if run['status'] == 'success' else 'yellow' if run['status'] in ('partial', 'running') else 'red'
+        table.add_row(
+            str(run['id']), run['started_at'][5:16],
+            run['mode'] + (f" (resumes {run['resumed_from']})" if run['resumed_from'] else ''),
+            f"[{color}]{run['status']}[/{color}]",
+            f"{run['duration_s']:.1f}s" if run['duration_s'] is not None else '-',
+            *(str(run[key]) if run[key] is not None else '-'
+              for key in ('remote_calls', 'rows_created', 'rows_updated', 'rows_unchanged', 'rows_deleted')),
+        )
+    console.print(table)
+    for run in [run for run in runs if run['error']][:3]:
+        console.print(f"  [red]run {run['id']}:[/red] {run['error']}")
+
+    trend = db.execute_query("""
+        SELECT day, mode, runs, unsuccessful, avg_duration_s, max_duration_s, avg_remote_calls
+        FROM v_sync_daily
+        WHERE day >= date('now', ?)
+    """, (window,))
+    table = Table(title=f"Daily Trend (last {days} days)", show_header=True, header_style="bold cyan")
+    for column in ("Day", "Mode", "Runs", "Unsuccessful", "Avg", "Max", "Avg calls"):
+        table.add_column(column, justify="left" if column in ("Day", "Mode") else "right")
+    for row in trend:
+        table.add_row(row['day'], row['mode'], str(row['runs']), str(row['unsuccessful']),
+                      f"{row['avg_duration_s']:.1f}s", f"{row['max_duration_s']:.1f}s",
+                      str(row['avg_remote_calls']) if row['avg_remote_calls'] is not None else '-')
+    console.print(table)
+
+    # Slowest hosts, with the last 24h against the whole window to spot drift
+    hosts = db.execute_query("""
+        SELECT source, target,
+               COUNT(*) as runs,
+               SUM(CASE WHEN status != 'success' THEN 1 ELSE 0 END) as unsuccessful,
+               AVG(duration_s) as avg_duration_s,
+               MAX(duration_s) as max_duration_s,
+               AVG(CASE WHEN started_at >= datetime('now', '-1 day') THEN duration_s END) as avg_24h_s
+        FROM sync_run_phases
+        WHERE target IS NOT NULL AND started_at >= datetime('now', ?)
+        GROUP BY source, target
+        ORDER BY avg_duration_s DESC
+        LIMIT 10
+    """, (window,))
+    table = Table(title="Slowest Hosts", show_header=True, header_style="bold cyan")
+    for column in ("Source", "Host", "Runs", "Unsuccessful", "Avg", "Max", "Avg 24h"):
+        table.add_column(column, justify="left" if column in ("Source", "Host") else "right")
+    for row in hosts:
+        table.add_row(row['source'], row['target'], str(row['runs']), str(row['unsuccessful']),
+                      f"{row['avg_duration_s']:.1f}s", f"{row['max_duration_s']:.1f}s",
+                      f"{row['avg_24h_s']:.1f}s" if row['avg_24h_s'] is not None else '-')
+    console.print(table)
+
+    unhealthy = db.execute_query("SELECT * FROM v_target_health")
+    if unhealthy:
+        table = Table(title="Failing Targets", show_header=True, header_style="bold cyan")
+        for column in ("Source", "Host", "State", "Failures", "Next try", "Last error"):
+            table.add_column(column, justify="right" if column == "Failures" else "left")
+        for row in unhealthy:
+            color = 'red' if row['state'] == 'open' else 'yellow'
+            table.add_row(row['source'], row['target'], f"[{color}]{row['state']}[/{color}]",
+                          str(row['consecutive_failures']), row['next_attempt_at'][5:16] if row['next_attempt_at'] else '-',
+                          (row['last_error'] or '')[:60])
+        console.print(table)
+
+
+def load_env_file(filename: str = '.env') -> Optional[str]:
+    """Load KEY=VALUE lines of the nearest .env (this directory or a parent)
+
+    Variables already set in the environment win. Covers what .env.example
+    uses (comments, `export`, quotes, inline ` #` comments) without
+    importing python-dotenv, which costs ~20ms of startup. Returns the
+    file's path, or None when there is none.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('export '):
+                line = line[len('export '):].lstrip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = (part.strip() for part in line.split('=', 1))
+            if value[:1] in ('"', "'") and value[0] in value[1:]:
+                value = value[1:value.index(value[0], 1)]
+            else:
+                value = value.split(' #', 1)[0].rstrip()
+            os.environ.setdefault(key, value)
+    return path
+
+
 def load_config() -> dict:
     """Load configuration from environment"""
-    load_dotenv()
+    load_env_file()
 
     config = {
         'db_path': os.getenv('DB_PATH', '../infrastructure.db'),
@@ -219,6 +910,43 @@ def load_config() -> dict:
         'proxmox_verify_ssl': os.getenv('PROXMOX_VERIFY_SSL', 'false').lower() == 'true',
         'docker_hosts': [h.strip() for h in os.getenv('DOCKER_HOSTS', '').split(',') if h.strip()],
         'ssh_key_path': os.path.expanduser(os.getenv('SSH_KEY_PATH', '~/.ssh/id_rsa')),
+        'docker_workers': int(os.getenv('DOCKER_SYNC_WORKERS', '4')),
+        'parse': {
+            'workers': int(os.getenv('DOCKER_PARSE_WORKERS', '0')),
+            'threshold': int(os.getenv('DOCKER_PARSE_THRESHOLD', '500')),
+        },
+        'deadlines': {
+            source: int(os.getenv(f"SYNC_{source.upper()}_DEADLINE", default))
+            for source, default in DEFAULT_DEADLINES.items()
+        },
+        'intervals': {
+            job: int(os.getenv(f"SYNC_{job.upper()}_INTERVAL", default))
+            for job, default in DEFAULT_INTERVALS.items()
+        },
+        'jitter': float(os.getenv('SYNC_JITTER', '0.1')),
+        'metrics_port': int(os.getenv('SYNC_METRICS_PORT', '9105')),
+        'metrics_addr': os.getenv('SYNC_METRICS_ADDR', '0.0.0.0'),
+        'resume_window': int(os.getenv('SYNC_RESUME_WINDOW', DEFAULT_RESUME_WINDOW)),
+        'proxmox_guest_batch': int(os.getenv('PROXMOX_GUEST_BATCH', '20')),
+        'ssh_connect_timeout': float(os.getenv('SSH_CONNECT_TIMEOUT', '10')),
+        'ssh_command_timeout': float(os.getenv('SSH_COMMAND_TIMEOUT', '120')),
+        'breaker': {
+            'threshold': int(os.getenv('SYNC_BREAKER_THRESHOLD', DEFAULT_BREAKER['threshold'])),
+            'base_backoff': float(os.getenv('SYNC_BACKOFF_BASE', DEFAULT_BREAKER['base_backoff'])),
+            'max_backoff': float(os.getenv('SYNC_BACKOFF_MAX', DEFAULT_BREAKER['max_backoff'])),
+            'probe_timeout': float(os.getenv('SYNC_PROBE_TIMEOUT', DEFAULT_BREAKER['probe_timeout'])),
+        },
+        'network': {
+            'neighbors': os.getenv('NETWORK_NEIGHBORS'),
+            'max_hosts': int(os.getenv('NETWORK_MAX_HOSTS', '1024')),
+            'sweep': {
+                'method': os.getenv('NETWORK_SWEEP_METHOD', 'tcp'),
+                'ports': [int(port) for port in os.getenv('NETWORK_SWEEP_PORTS', '22,80,443').split(',')],
+                'timeout': float(os.getenv('NETWORK_SWEEP_TIMEOUT', '1.0')),
+                'concurrency': int(os.getenv('NETWORK_SWEEP_CONCURRENCY', '512')),
+                'rate': float(os.getenv('NETWORK_SWEEP_RATE', '2000')),
+            },
+        },
         'log_level': os.getenv('LOG_LEVEL', 'INFO'),
     }
 
@@ -227,7 +955,29 @@ def load_config() -> dict:
 
 def main():
     """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Synchronize the infrastructure database from all sources')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running and sync each source on its own interval (SYNC_*_INTERVAL)')
+    parser.add_argument('--report', action='store_true',
+                        help='Print sync run history (recent runs, trend, slowest hosts) and exit')
+    parser.add_argument('--days', type=int, default=7, help='History window for --report')
+    parser.add_argument('--source', action='append', choices=list(SOURCES),
+                        help='Only sync this source (repeatable); others are not imported or run')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Start from scratch even if the previous run was interrupted')
+    parser.add_argument('--profile', action='store_true',
+                        help='Sample the run; writes a phase/top-N summary and flamegraph stacks next to the log')
+    args = parser.parse_args()
+
     config = load_config()
+    if args.no_resume:
+        config['resume_window'] = 0
+
+    if args.report:
+        print_sync_report(InfrastructureDB(config['db_path']), args.days)
+        return
 
     # Setup logging
     logging.basicConfig(
@@ -239,17 +989,24 @@ def main():
         ]
     )
 
+    sources = args.source or list(SOURCES)
+
     # Validate configuration
-    if not config['proxmox_password']:
+    if 'proxmox' in sources and not config['proxmox_password']:
         console.print("[bold red]Error: PROXMOX_PASSWORD not set in environment[/bold red]")
         sys.exit(1)
 
-    if not config['docker_hosts']:
+    if 'docker' in sources and not config['docker_hosts']:
         console.print("[yellow]Warning: No Docker hosts configured[/yellow]")
 
+    from profiling import profile_run
+
     # Run synchronization
-    sync = InfrastructureSync(config)
-    sync.run_full_sync()
+    with profile_run('sync_profile', enabled=args.profile):
+        if args.daemon:
+            InfrastructureSync(config, keep_alive=True).run_daemon()
+        else:
+            InfrastructureSync(config).run_full_sync(args.source)
 
 
 if __name__ == '__main__':
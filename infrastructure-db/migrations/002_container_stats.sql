@@ -0,0 +1,102 @@
+-- ============================================================================
+-- Infrastructure Database Migration 002: Container Resource Stats
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. docker_container_stats: fixed-size ring buffer of `docker stats` samples
+--    (one slot per sample, slot = sample_seq % ring size, per container)
+-- 2. docker_container_usage: per-container rollup (latest sample plus
+--    avg/max over the ring), rewritten by the discovery writer after each
+--    batch so the API reads current usage with a primary-key join
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Ring buffer of resource samples
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS docker_container_stats (
+    docker_container_id INTEGER NOT NULL REFERENCES docker_containers(id) ON DELETE CASCADE,
+    slot INTEGER NOT NULL,          -- sample_seq % ring size
+    sample_seq INTEGER NOT NULL,    -- Monotonic per-container sample counter
+    sampled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    -- CPU / memory
+    cpu_percent REAL,
+    mem_usage_mb REAL,
+    mem_limit_mb REAL,
+    mem_percent REAL,
+
+    -- Cumulative I/O counters (bytes)
+    net_rx_bytes INTEGER,
+    net_tx_bytes INTEGER,
+    block_read_bytes INTEGER,
+    block_write_bytes INTEGER,
+
+    pids INTEGER,
+
+    PRIMARY KEY (docker_container_id, slot)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_dcs_container_seq ON docker_container_stats(docker_container_id, sample_seq DESC);
+
+-- ============================================================================
+-- STEP 2: Rollup table (one row per container)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS docker_container_usage (
+    docker_container_id INTEGER PRIMARY KEY REFERENCES docker_containers(id) ON DELETE CASCADE,
+
+    -- Latest sample
+    sampled_at TIMESTAMP,
+    cpu_percent REAL,
+    mem_usage_mb REAL,
+    mem_limit_mb REAL,
+    mem_percent REAL,
+    net_rx_bytes INTEGER,
+    net_tx_bytes INTEGER,
+    block_read_bytes INTEGER,
+    block_write_bytes INTEGER,
+    pids INTEGER,
+
+    -- Rollups over the samples currently in the ring
+    sample_count INTEGER,
+    cpu_avg REAL,
+    cpu_max REAL,
+    mem_avg_mb REAL,
+    mem_max_mb REAL
+);
+
+-- ============================================================================
+-- STEP 3: Convenience view for "who is eating RAM" queries
+-- ============================================================================
+
+DROP VIEW IF EXISTS v_docker_container_usage;
+CREATE VIEW v_docker_container_usage AS
+SELECT
+    h.hostname as docker_host,
+    dc.container_name,
+    dc.status,
+    u.sampled_at,
+    u.cpu_percent,
+    u.mem_usage_mb,
+    u.mem_limit_mb,
+    u.mem_percent,
+    u.cpu_avg,
+    u.cpu_max,
+    u.mem_avg_mb,
+    u.mem_max_mb,
+    u.sample_count
+FROM docker_container_usage u
+JOIN docker_containers dc ON u.docker_container_id = dc.id
+JOIN hosts h ON dc.docker_host_id = h.id
+ORDER BY u.mem_usage_mb DESC;
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE name IN ('docker_container_stats', 'docker_container_usage', 'v_docker_container_usage');
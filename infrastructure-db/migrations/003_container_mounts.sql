@@ -0,0 +1,31 @@
+-- ============================================================================
+-- Infrastructure Database Migration 003: Container Mount Links
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. Index docker_container_volumes.host_path for bind-mount lookups
+-- 2. v_docker_mounts: container <-> volume/bind mount links in one view
+--    (answers "which containers use this volume / host path")
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_dcv_host_path ON docker_container_volumes(host_path);
+
+DROP VIEW IF EXISTS v_docker_mounts;
+CREATE VIEW v_docker_mounts AS
+SELECT
+    h.hostname as docker_host,
+    dc.container_name,
+    dc.status,
+    CASE WHEN dcv.docker_volume_id IS NOT NULL THEN 'volume' ELSE 'bind' END as mount_type,
+    dv.volume_name,
+    dcv.host_path,
+    dcv.container_path,
+    dcv.read_only
+FROM docker_container_volumes dcv
+JOIN docker_containers dc ON dcv.docker_container_id = dc.id
+JOIN hosts h ON dc.docker_host_id = h.id
+LEFT JOIN docker_volumes dv ON dcv.docker_volume_id = dv.id;
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- ============================================================================
+-- Infrastructure Database Migration 004: Mark-and-Sweep Sync Generations
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. Add last_seen_generation to every table populated by discovery. Each
+--    sync stamps the rows it sees; rows with an older generation are deleted
+--    (and logged as 'delete' changes) once the host/node sync succeeds.
+--    Existing rows start as NULL and are swept on their scope's next sync
+--    unless rediscovered.
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+ALTER TABLE docker_containers ADD COLUMN last_seen_generation INTEGER;
+ALTER TABLE docker_volumes ADD COLUMN last_seen_generation INTEGER;
+ALTER TABLE docker_networks ADD COLUMN last_seen_generation INTEGER;
+ALTER TABLE proxmox_containers ADD COLUMN last_seen_generation INTEGER;
+
+COMMIT;
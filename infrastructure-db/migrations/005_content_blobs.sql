@@ -0,0 +1,84 @@
+-- ============================================================================
+-- Infrastructure Database Migration 005: Content-Addressed Container Blobs
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. content_blobs: JSON/text blobs stored once, keyed by sha256 of content
+-- 2. docker_containers.*_hash columns referencing content_blobs for
+--    environment_vars, labels, ports, networks and command. The discovery
+--    writer fills the hash and clears the inline column; rows not yet
+--    rewritten keep their inline text until their host's next sync.
+-- 3. v_docker_containers: containers with blobs resolved (hash first,
+--    inline text as fallback) - readers should use this view
+-- 4. v_docker_inventory rebuilt on top of the resolved view
+--
+-- No FOREIGN KEY on the hash columns: unreferenced blobs are garbage
+-- collected by the discovery writer after each host sweep.
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS content_blobs (
+    blob_hash TEXT PRIMARY KEY,     -- sha256 hex digest of content
+    content TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+ALTER TABLE docker_containers ADD COLUMN environment_hash TEXT;
+ALTER TABLE docker_containers ADD COLUMN labels_hash TEXT;
+ALTER TABLE docker_containers ADD COLUMN ports_hash TEXT;
+ALTER TABLE docker_containers ADD COLUMN networks_hash TEXT;
+ALTER TABLE docker_containers ADD COLUMN command_hash TEXT;
+
+DROP VIEW IF EXISTS v_docker_containers;
+CREATE VIEW v_docker_containers AS
+SELECT
+    dc.id,
+    dc.docker_host_id,
+    dc.container_id,
+    dc.container_name,
+    dc.image,
+    dc.image_tag,
+    dc.status,
+    dc.restart_policy,
+    dc.network_mode,
+    COALESCE(bn.content, dc.networks) as networks,
+    COALESCE(bp.content, dc.ports) as ports,
+    COALESCE(be.content, dc.environment_vars) as environment_vars,
+    dc.cpu_limit,
+    dc.memory_limit_mb,
+    dc.health_status,
+    COALESCE(bl.content, dc.labels) as labels,
+    COALESCE(bc.content, dc.command) as command,
+    dc.created_at,
+    dc.updated_at,
+    dc.last_seen_generation
+FROM docker_containers dc
+LEFT JOIN content_blobs bn ON bn.blob_hash = dc.networks_hash
+LEFT JOIN content_blobs bp ON bp.blob_hash = dc.ports_hash
+LEFT JOIN content_blobs be ON be.blob_hash = dc.environment_hash
+LEFT JOIN content_blobs bl ON bl.blob_hash = dc.labels_hash
+LEFT JOIN content_blobs bc ON bc.blob_hash = dc.command_hash;
+
+DROP VIEW IF EXISTS v_docker_inventory;
+CREATE VIEW v_docker_inventory AS
+SELECT
+    dc.container_name,
+    dc.image,
+    dc.image_tag,
+    dc.status,
+    dc.health_status,
+    h.hostname as docker_host,
+    h.management_ip as host_ip,
+    dc.ports,
+    dc.networks,
+    COUNT(DISTINCT dcv.id) as volume_mounts_count,
+    s.service_name,
+    s.status as service_status
+FROM v_docker_containers dc
+JOIN hosts h ON dc.docker_host_id = h.id
+LEFT JOIN docker_container_volumes dcv ON dcv.docker_container_id = dc.id
+LEFT JOIN services s ON s.container_id = dc.id
+GROUP BY dc.id;
+
+COMMIT;
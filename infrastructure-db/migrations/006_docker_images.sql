@@ -0,0 +1,145 @@
+-- ============================================================================
+-- Infrastructure Database Migration 006: Docker Image Inventory
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. docker_images: one row per image per Docker host (image ID, tags,
+--    repo digests, size, creation time, shared/unique layer size), written
+--    in bulk by the discovery writer and swept by sync generation
+-- 2. docker_containers.image_id: full image ID (sha256:...) of the image the
+--    container runs, linking containers to docker_images
+-- 3. v_docker_containers recreated to expose image_id
+-- 4. v_docker_images: images with their container count
+-- 5. v_docker_image_reclaimable: per-host image disk usage and the space
+--    freed by removing unused images
+--
+-- shared_size_bytes/unique_size_bytes come from `docker system df -v` and
+-- stay NULL when the host cannot report them.
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Images
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS docker_images (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    docker_host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE,
+    image_id TEXT NOT NULL,             -- Full image ID (sha256:...)
+
+    -- Naming (first tag; all tags/digests kept as JSON arrays)
+    repository TEXT,                    -- NULL for dangling images
+    tag TEXT,
+    repo_tags TEXT,                     -- JSON array
+    repo_digests TEXT,                  -- JSON array
+    digest TEXT,                        -- Registry manifest digest (sha256:...)
+
+    -- Disk usage (bytes)
+    size_bytes INTEGER,
+    shared_size_bytes INTEGER,          -- Layers shared with other images
+    unique_size_bytes INTEGER,          -- Freed when this image is removed
+
+    architecture TEXT,
+    os TEXT,
+    image_created_at TIMESTAMP,         -- Build time reported by Docker
+
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen_generation INTEGER,
+
+    UNIQUE(docker_host_id, image_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_docker_images_repository ON docker_images(repository, tag);
+
+-- ============================================================================
+-- STEP 2: Link containers to images
+-- ============================================================================
+
+ALTER TABLE docker_containers ADD COLUMN image_id TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_docker_containers_image ON docker_containers(docker_host_id, image_id);
+
+DROP VIEW IF EXISTS v_docker_containers;
+CREATE VIEW v_docker_containers AS
+SELECT
+    dc.id,
+    dc.docker_host_id,
+    dc.container_id,
+    dc.container_name,
+    dc.image,
+    dc.image_tag,
+    dc.image_id,
+    dc.status,
+    dc.restart_policy,
+    dc.network_mode,
+    COALESCE(bn.content, dc.networks) as networks,
+    COALESCE(bp.content, dc.ports) as ports,
+    COALESCE(be.content, dc.environment_vars) as environment_vars,
+    dc.cpu_limit,
+    dc.memory_limit_mb,
+    dc.health_status,
+    COALESCE(bl.content, dc.labels) as labels,
+    COALESCE(bc.content, dc.command) as command,
+    dc.created_at,
+    dc.updated_at,
+    dc.last_seen_generation
+FROM docker_containers dc
+LEFT JOIN content_blobs bn ON bn.blob_hash = dc.networks_hash
+LEFT JOIN content_blobs bp ON bp.blob_hash = dc.ports_hash
+LEFT JOIN content_blobs be ON be.blob_hash = dc.environment_hash
+LEFT JOIN content_blobs bl ON bl.blob_hash = dc.labels_hash
+LEFT JOIN content_blobs bc ON bc.blob_hash = dc.command_hash;
+
+-- ============================================================================
+-- STEP 3: Image views
+-- ============================================================================
+
+DROP VIEW IF EXISTS v_docker_images;
+CREATE VIEW v_docker_images AS
+SELECT
+    h.hostname as docker_host,
+    di.id,
+    di.docker_host_id,
+    di.image_id,
+    di.repository,
+    di.tag,
+    di.digest,
+    di.size_bytes,
+    di.shared_size_bytes,
+    di.unique_size_bytes,
+    di.image_created_at,
+    COUNT(dc.id) as container_count,
+    SUM(CASE WHEN dc.status = 'running' THEN 1 ELSE 0 END) as running_count
+FROM docker_images di
+JOIN hosts h ON di.docker_host_id = h.id
+LEFT JOIN docker_containers dc
+    ON dc.docker_host_id = di.docker_host_id AND dc.image_id = di.image_id
+GROUP BY di.id;
+
+-- reclaimable_bytes: unique size of images no container uses (what
+-- `docker image prune -a` frees at least); unused_size_bytes is the upper
+-- bound when unique sizes are unknown
+DROP VIEW IF EXISTS v_docker_image_reclaimable;
+CREATE VIEW v_docker_image_reclaimable AS
+SELECT
+    docker_host,
+    docker_host_id,
+    COUNT(*) as image_count,
+    SUM(CASE WHEN container_count = 0 THEN 1 ELSE 0 END) as unused_count,
+    SUM(CASE WHEN repository IS NULL THEN 1 ELSE 0 END) as dangling_count,
+    SUM(size_bytes) as total_size_bytes,
+    SUM(CASE WHEN container_count = 0 THEN unique_size_bytes ELSE 0 END) as reclaimable_bytes,
+    SUM(CASE WHEN container_count = 0 THEN size_bytes ELSE 0 END) as unused_size_bytes
+FROM v_docker_images
+GROUP BY docker_host_id
+ORDER BY reclaimable_bytes DESC;
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE name IN ('docker_images', 'v_docker_images', 'v_docker_image_reclaimable');
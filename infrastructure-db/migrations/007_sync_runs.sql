@@ -0,0 +1,118 @@
+-- ============================================================================
+-- Infrastructure Database Migration 007: Sync Run History
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. sync_runs: one row per sync run (full sync or a single daemon job)
+--    with its generation, duration, remote calls and row outcomes
+-- 2. sync_run_phases: per-source (target NULL) and per-host timings of a run
+-- 3. v_sync_daily: runs per day and mode with average/max duration
+-- 4. v_sync_target_timings: per host/source duration over the last 7 days
+--
+-- Written by InfrastructureSync; read by `sync_infrastructure.py --report`
+-- and /api/sync-runs.
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Runs
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS sync_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,                 -- 'full', 'docker', 'proxmox', 'network'
+    generation INTEGER,                 -- Sync generation stamped on discovered rows
+    status TEXT NOT NULL DEFAULT 'running' CHECK(status IN (
+        'running', 'success', 'partial', 'failed'
+    )),
+
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    duration_s REAL,
+
+    -- Totals over the run's source phases
+    remote_calls INTEGER,
+    rows_created INTEGER,
+    rows_updated INTEGER,
+    rows_unchanged INTEGER,
+    rows_deleted INTEGER,
+
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_runs_started ON sync_runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_sync_runs_mode ON sync_runs(mode, started_at);
+
+-- ============================================================================
+-- STEP 2: Phases (per source, per host)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS sync_run_phases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sync_run_id INTEGER NOT NULL REFERENCES sync_runs(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,               -- 'proxmox', 'docker', 'network'
+    target TEXT,                        -- Host for per-host phases, NULL for the source
+    status TEXT NOT NULL CHECK(status IN (
+        'success', 'partial', 'failed', 'skipped', 'timeout'
+    )),
+
+    started_at TIMESTAMP,
+    duration_s REAL,
+    remote_calls INTEGER,
+    rows_created INTEGER,
+    rows_updated INTEGER,
+    rows_unchanged INTEGER,
+    rows_deleted INTEGER,
+
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_run_phases_run ON sync_run_phases(sync_run_id);
+CREATE INDEX IF NOT EXISTS idx_sync_run_phases_target ON sync_run_phases(source, target, started_at);
+
+-- ============================================================================
+-- STEP 3: Trend views
+-- ============================================================================
+
+DROP VIEW IF EXISTS v_sync_daily;
+CREATE VIEW v_sync_daily AS
+SELECT
+    date(started_at) as day,
+    mode,
+    COUNT(*) as runs,
+    SUM(CASE WHEN status != 'success' THEN 1 ELSE 0 END) as unsuccessful,
+    ROUND(AVG(duration_s), 2) as avg_duration_s,
+    ROUND(MAX(duration_s), 2) as max_duration_s,
+    ROUND(AVG(remote_calls), 1) as avg_remote_calls,
+    SUM(rows_created) as rows_created,
+    SUM(rows_updated) as rows_updated,
+    SUM(rows_deleted) as rows_deleted
+FROM sync_runs
+WHERE finished_at IS NOT NULL
+GROUP BY date(started_at), mode
+ORDER BY day DESC, mode;
+
+DROP VIEW IF EXISTS v_sync_target_timings;
+CREATE VIEW v_sync_target_timings AS
+SELECT
+    p.source,
+    COALESCE(p.target, '(all)') as target,
+    COUNT(*) as runs,
+    SUM(CASE WHEN p.status NOT IN ('success', 'skipped') THEN 1 ELSE 0 END) as unsuccessful,
+    ROUND(AVG(p.duration_s), 2) as avg_duration_s,
+    ROUND(MAX(p.duration_s), 2) as max_duration_s,
+    ROUND(AVG(p.remote_calls), 1) as avg_remote_calls,
+    MAX(p.started_at) as last_run_at
+FROM sync_run_phases p
+WHERE p.started_at >= datetime('now', '-7 days')
+GROUP BY p.source, p.target
+ORDER BY avg_duration_s DESC;
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE name IN ('sync_runs', 'sync_run_phases', 'v_sync_daily', 'v_sync_target_timings');
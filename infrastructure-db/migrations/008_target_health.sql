@@ -0,0 +1,71 @@
+-- ============================================================================
+-- Infrastructure Database Migration 008: Discovery Target Health
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. target_health: circuit breaker state per discovery target (Docker host),
+--    so a host that keeps failing is skipped, with exponential backoff,
+--    across runs and daemon restarts
+-- 2. v_target_health: targets currently backed off or failing
+--
+-- States:
+--   closed     target is synced normally
+--   open       target failed `threshold` times in a row; skipped until
+--              next_attempt_at, then probed (TCP connect) before a sync
+--   half_open  probe succeeded; the next sync closes or re-opens the circuit
+--
+-- Written by sync_infrastructure.py (circuit_breaker.CircuitBreaker).
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Target health
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS target_health (
+    source TEXT NOT NULL,               -- 'docker'
+    target TEXT NOT NULL,               -- Host (management IP) as configured
+    state TEXT NOT NULL DEFAULT 'closed' CHECK(state IN (
+        'closed', 'open', 'half_open'
+    )),
+
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    last_failure_at TIMESTAMP,
+    last_success_at TIMESTAMP,
+    opened_at TIMESTAMP,                -- When the circuit last opened
+    next_attempt_at TIMESTAMP,          -- Open circuits are not tried before this
+
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (source, target)
+);
+
+-- ============================================================================
+-- STEP 2: Unhealthy targets view
+-- ============================================================================
+
+DROP VIEW IF EXISTS v_target_health;
+CREATE VIEW v_target_health AS
+SELECT
+    source,
+    target,
+    state,
+    consecutive_failures,
+    last_error,
+    last_failure_at,
+    last_success_at,
+    opened_at,
+    next_attempt_at
+FROM target_health
+WHERE state != 'closed' OR consecutive_failures > 0
+ORDER BY consecutive_failures DESC;
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE name IN ('target_health', 'v_target_health');
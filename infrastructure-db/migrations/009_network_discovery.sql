@@ -0,0 +1,61 @@
+-- ============================================================================
+-- Infrastructure Database Migration 009: Network Discovery
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. ip_addresses: mac_address, last_seen_at and last_seen_generation,
+--    written by the network sweep (discover_network.py)
+-- 2. v_ip_inventory: addresses with their network, host, interface and
+--    how long ago they last answered
+--
+-- Addresses are not swept: a documented allocation that stops answering
+-- keeps its row, and last_seen_at shows since when it has been silent.
+-- Live addresses without a row are added (host_id NULL until a host record
+-- with that management IP exists).
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Discovery columns
+-- ============================================================================
+
+ALTER TABLE ip_addresses ADD COLUMN mac_address TEXT;          -- From the gateway's neighbor table
+ALTER TABLE ip_addresses ADD COLUMN last_seen_at TIMESTAMP;    -- Last sweep the address answered
+ALTER TABLE ip_addresses ADD COLUMN last_seen_generation INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_ip_mac ON ip_addresses(mac_address);
+
+-- ============================================================================
+-- STEP 2: Inventory view
+-- ============================================================================
+
+DROP VIEW IF EXISTS v_ip_inventory;
+CREATE VIEW v_ip_inventory AS
+SELECT
+    ip.id,
+    ip.ip_address,
+    n.network_name,
+    n.cidr,
+    ip.allocation_type,
+    ip.mac_address,
+    COALESCE(h.hostname, ip.hostname) as hostname,
+    ip.host_id,
+    ni.interface_name,
+    ip.purpose,
+    ip.last_seen_at,
+    ROUND((julianday('now') - julianday(ip.last_seen_at)) * 24, 1) as last_seen_hours_ago,
+    CASE WHEN ip.host_id IS NULL THEN 1 ELSE 0 END as unknown_device
+FROM ip_addresses ip
+JOIN networks n ON ip.network_id = n.id
+LEFT JOIN hosts h ON ip.host_id = h.id
+LEFT JOIN network_interfaces ni ON ip.interface_id = ni.id
+ORDER BY n.cidr, ip.ip_address;
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE name IN ('idx_ip_mac', 'v_ip_inventory');
@@ -0,0 +1,48 @@
+-- ============================================================================
+-- Infrastructure Database Migration 010: Sync Checkpoints
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. sync_checkpoints: units of work completed by a sync run (Proxmox node,
+--    Proxmox guest batch, Docker host) with the generation they stamped
+-- 2. sync_runs.resumed_from: the interrupted run a run picked up from
+--
+-- A full sync that dies or times out part way leaves its checkpoints behind.
+-- The next full sync started within SYNC_RESUME_WINDOW seconds carries over
+-- the checkpoints of sources that did not finish successfully and skips
+-- those units. Only the latest run of a mode is ever resumed, so older
+-- checkpoints are deleted when a run starts, and a successful run deletes
+-- its own.
+--
+-- Written by sync_infrastructure.py (db_utils.SyncCheckpoints).
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Checkpoints
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS sync_checkpoints (
+    sync_run_id INTEGER NOT NULL REFERENCES sync_runs(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,               -- 'proxmox', 'docker'
+    unit TEXT NOT NULL,                 -- 'pve2', 'pve2/qemu/100,101,...', '192.168.1.20'
+    generation INTEGER NOT NULL,        -- Generation the unit's rows were stamped with
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (sync_run_id, source, unit)
+);
+
+-- ============================================================================
+-- STEP 2: Resumed runs
+-- ============================================================================
+
+ALTER TABLE sync_runs ADD COLUMN resumed_from INTEGER REFERENCES sync_runs(id);
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE name = 'sync_checkpoints';
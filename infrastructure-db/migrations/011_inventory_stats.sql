@@ -0,0 +1,273 @@
+-- ============================================================================
+-- Infrastructure Database Migration 011: Inventory Stats
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. v_inventory_stats: the dashboard summary counts as one aggregate query
+--    (one scan per table instead of 13 COUNT(*) queries)
+-- 2. inventory_stats: the same counts as a single row kept current by
+--    triggers, so /api/stats is a primary-key read
+-- 3. Triggers on hosts, docker_containers, docker_networks, services and
+--    proxmox_containers adjusting the counts on insert, delete and updates
+--    of the counted columns
+--
+-- The triggers cover every writer (sync_infrastructure.py, scrape_pve2.sh,
+-- manual edits). To rebuild the row from the tables:
+--   INSERT OR REPLACE INTO inventory_stats SELECT 1, v.*, CURRENT_TIMESTAMP FROM v_inventory_stats v;
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Aggregate view
+-- ============================================================================
+
+-- `x IS 'value'` is 0/1 even when x is NULL, so the sums match the triggers
+CREATE VIEW IF NOT EXISTS v_inventory_stats AS
+SELECT
+    h.hosts_total, h.hosts_physical, h.hosts_lxc_active, h.hosts_vm_active,
+    dc.docker_containers, dc.docker_running, dc.docker_healthy,
+    dn.docker_networks,
+    s.services_total, s.services_running,
+    pc.proxmox_containers, pc.proxmox_lxc, pc.proxmox_vm
+FROM (
+    SELECT
+        COUNT(*) AS hosts_total,
+        COALESCE(SUM(host_type IS 'physical'), 0) AS hosts_physical,
+        COALESCE(SUM(host_type IS 'lxc' AND status IS 'active'), 0) AS hosts_lxc_active,
+        COALESCE(SUM(host_type IS 'vm' AND status IS 'active'), 0) AS hosts_vm_active
+    FROM hosts
+) h
+CROSS JOIN (
+    SELECT
+        COUNT(*) AS docker_containers,
+        COALESCE(SUM(status IS 'running'), 0) AS docker_running,
+        COALESCE(SUM(health_status IS 'healthy'), 0) AS docker_healthy
+    FROM docker_containers
+) dc
+CROSS JOIN (SELECT COUNT(*) AS docker_networks FROM docker_networks) dn
+CROSS JOIN (
+    SELECT
+        COUNT(*) AS services_total,
+        COALESCE(SUM(status IS 'running' OR status IS 'healthy'), 0) AS services_running
+    FROM services
+) s
+CROSS JOIN (
+    SELECT
+        COUNT(*) AS proxmox_containers,
+        COALESCE(SUM(container_type IS 'lxc'), 0) AS proxmox_lxc,
+        COALESCE(SUM(container_type IS 'vm'), 0) AS proxmox_vm
+    FROM proxmox_containers
+) pc;
+
+-- ============================================================================
+-- STEP 2: Summary row
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS inventory_stats (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+
+    hosts_total INTEGER NOT NULL DEFAULT 0,
+    hosts_physical INTEGER NOT NULL DEFAULT 0,
+    hosts_lxc_active INTEGER NOT NULL DEFAULT 0,
+    hosts_vm_active INTEGER NOT NULL DEFAULT 0,
+
+    docker_containers INTEGER NOT NULL DEFAULT 0,
+    docker_running INTEGER NOT NULL DEFAULT 0,
+    docker_healthy INTEGER NOT NULL DEFAULT 0,
+    docker_networks INTEGER NOT NULL DEFAULT 0,
+
+    services_total INTEGER NOT NULL DEFAULT 0,
+    services_running INTEGER NOT NULL DEFAULT 0,
+
+    proxmox_containers INTEGER NOT NULL DEFAULT 0,
+    proxmox_lxc INTEGER NOT NULL DEFAULT 0,
+    proxmox_vm INTEGER NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR REPLACE INTO inventory_stats SELECT 1, v.*, CURRENT_TIMESTAMP FROM v_inventory_stats v;
+
+-- ============================================================================
+-- STEP 3: Triggers
+-- ============================================================================
+
+-- hosts
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_hosts_insert
+AFTER INSERT ON hosts
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        hosts_total = hosts_total + 1,
+        hosts_physical = hosts_physical + (NEW.host_type IS 'physical'),
+        hosts_lxc_active = hosts_lxc_active + (NEW.host_type IS 'lxc' AND NEW.status IS 'active'),
+        hosts_vm_active = hosts_vm_active + (NEW.host_type IS 'vm' AND NEW.status IS 'active'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_hosts_delete
+AFTER DELETE ON hosts
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        hosts_total = hosts_total - 1,
+        hosts_physical = hosts_physical - (OLD.host_type IS 'physical'),
+        hosts_lxc_active = hosts_lxc_active - (OLD.host_type IS 'lxc' AND OLD.status IS 'active'),
+        hosts_vm_active = hosts_vm_active - (OLD.host_type IS 'vm' AND OLD.status IS 'active'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_hosts_update
+AFTER UPDATE OF host_type, status ON hosts
+FOR EACH ROW
+WHEN OLD.host_type IS NOT NEW.host_type OR OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE inventory_stats SET
+        hosts_physical = hosts_physical + (NEW.host_type IS 'physical') - (OLD.host_type IS 'physical'),
+        hosts_lxc_active = hosts_lxc_active
+            + (NEW.host_type IS 'lxc' AND NEW.status IS 'active') - (OLD.host_type IS 'lxc' AND OLD.status IS 'active'),
+        hosts_vm_active = hosts_vm_active
+            + (NEW.host_type IS 'vm' AND NEW.status IS 'active') - (OLD.host_type IS 'vm' AND OLD.status IS 'active'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+-- docker_containers
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_docker_containers_insert
+AFTER INSERT ON docker_containers
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        docker_containers = docker_containers + 1,
+        docker_running = docker_running + (NEW.status IS 'running'),
+        docker_healthy = docker_healthy + (NEW.health_status IS 'healthy'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_docker_containers_delete
+AFTER DELETE ON docker_containers
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        docker_containers = docker_containers - 1,
+        docker_running = docker_running - (OLD.status IS 'running'),
+        docker_healthy = docker_healthy - (OLD.health_status IS 'healthy'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_docker_containers_update
+AFTER UPDATE OF status, health_status ON docker_containers
+FOR EACH ROW
+WHEN OLD.status IS NOT NEW.status OR OLD.health_status IS NOT NEW.health_status
+BEGIN
+    UPDATE inventory_stats SET
+        docker_running = docker_running + (NEW.status IS 'running') - (OLD.status IS 'running'),
+        docker_healthy = docker_healthy + (NEW.health_status IS 'healthy') - (OLD.health_status IS 'healthy'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+-- docker_networks
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_docker_networks_insert
+AFTER INSERT ON docker_networks
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET docker_networks = docker_networks + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_docker_networks_delete
+AFTER DELETE ON docker_networks
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET docker_networks = docker_networks - 1, updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+-- services
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_services_insert
+AFTER INSERT ON services
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        services_total = services_total + 1,
+        services_running = services_running + (NEW.status IS 'running' OR NEW.status IS 'healthy'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_services_delete
+AFTER DELETE ON services
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        services_total = services_total - 1,
+        services_running = services_running - (OLD.status IS 'running' OR OLD.status IS 'healthy'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_services_update
+AFTER UPDATE OF status ON services
+FOR EACH ROW
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE inventory_stats SET
+        services_running = services_running
+            + (NEW.status IS 'running' OR NEW.status IS 'healthy') - (OLD.status IS 'running' OR OLD.status IS 'healthy'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+-- proxmox_containers
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_proxmox_insert
+AFTER INSERT ON proxmox_containers
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        proxmox_containers = proxmox_containers + 1,
+        proxmox_lxc = proxmox_lxc + (NEW.container_type IS 'lxc'),
+        proxmox_vm = proxmox_vm + (NEW.container_type IS 'vm'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_proxmox_delete
+AFTER DELETE ON proxmox_containers
+FOR EACH ROW
+BEGIN
+    UPDATE inventory_stats SET
+        proxmox_containers = proxmox_containers - 1,
+        proxmox_lxc = proxmox_lxc - (OLD.container_type IS 'lxc'),
+        proxmox_vm = proxmox_vm - (OLD.container_type IS 'vm'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tr_inventory_stats_proxmox_update
+AFTER UPDATE OF container_type ON proxmox_containers
+FOR EACH ROW
+WHEN OLD.container_type IS NOT NEW.container_type
+BEGIN
+    UPDATE inventory_stats SET
+        proxmox_lxc = proxmox_lxc + (NEW.container_type IS 'lxc') - (OLD.container_type IS 'lxc'),
+        proxmox_vm = proxmox_vm + (NEW.container_type IS 'vm') - (OLD.container_type IS 'vm'),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
+END;
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+-- Both rows should be identical
+SELECT 'table' AS source, * FROM inventory_stats
+UNION ALL
+SELECT 'view', NULL, v.*, NULL FROM v_inventory_stats v;
@@ -0,0 +1,60 @@
+-- ============================================================================
+-- Infrastructure Database Migration 012: Refresh Jobs
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. refresh_jobs: one row per scrape_pve2.sh run started through
+--    POST /api/refresh, with progress, timing and captured output
+-- 2. idx_refresh_jobs_running: at most one running job, so concurrent
+--    refresh requests (from any API worker process) join the running job
+--    instead of starting another scrape
+--
+-- Written by the API (RefreshJobs in api/app.py), read by /api/jobs/<id>.
+-- The process running a job updates heartbeat_at every second; a running job
+-- whose heartbeat stops (the API process died) is marked failed by the next
+-- refresh request.
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+-- ============================================================================
+-- STEP 1: Jobs
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS refresh_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL DEFAULT 'running' CHECK(status IN (
+        'running', 'success', 'failed', 'timeout'
+    )),
+    command TEXT NOT NULL,              -- Script run by the job
+    requests INTEGER NOT NULL DEFAULT 1, -- Refresh requests served by this job (1 + coalesced)
+    pid INTEGER,                        -- API process running the script
+
+    -- Progress, parsed from the script's output
+    step TEXT,                          -- Latest [INFO]/[OK]/[ERROR] message
+    items_done INTEGER NOT NULL DEFAULT 0, -- Guests scraped so far
+
+    exit_code INTEGER,
+    error TEXT,
+    output TEXT,                        -- Combined stdout/stderr (tail, colors stripped)
+
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    duration_s REAL
+);
+
+-- ============================================================================
+-- STEP 2: Single running job
+-- ============================================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_refresh_jobs_running
+    ON refresh_jobs(status) WHERE status = 'running';
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE name IN ('refresh_jobs', 'idx_refresh_jobs_running');
@@ -0,0 +1,66 @@
+-- ============================================================================
+-- Infrastructure Database Migration 013: Generation Stamps Are Not Updates
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. tr_update_timestamp_docker, tr_update_timestamp_proxmox and
+--    tr_proxmox_update_version skip updates that only move
+--    last_seen_generation
+--
+-- Discovery stamps the rows it saw with one set-based UPDATE per scope
+-- (InfrastructureDB.stamp_generation) and writes changed columns separately,
+-- never together with the stamp. Without the WHEN clause every stamp bumped
+-- updated_at, and on proxmox_containers logged an 'update' change, for every
+-- row on every sync.
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+DROP TRIGGER IF EXISTS tr_update_timestamp_docker;
+CREATE TRIGGER tr_update_timestamp_docker
+AFTER UPDATE ON docker_containers
+FOR EACH ROW
+WHEN NEW.last_seen_generation IS OLD.last_seen_generation
+BEGIN
+    UPDATE docker_containers SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+DROP TRIGGER IF EXISTS tr_update_timestamp_proxmox;
+CREATE TRIGGER tr_update_timestamp_proxmox
+AFTER UPDATE ON proxmox_containers
+FOR EACH ROW
+WHEN NEW.last_seen_generation IS OLD.last_seen_generation
+BEGIN
+    UPDATE proxmox_containers SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+DROP TRIGGER IF EXISTS tr_proxmox_update_version;
+CREATE TRIGGER tr_proxmox_update_version
+AFTER UPDATE ON proxmox_containers
+FOR EACH ROW
+WHEN NEW.last_seen_generation IS OLD.last_seen_generation
+BEGIN
+    INSERT INTO infrastructure_changes (
+        change_type, entity_type, entity_id, changed_by, change_source,
+        old_values, new_values, description
+    )
+    VALUES (
+        'update', 'proxmox_container', NEW.id, 'system', 'automation',
+        json_object(
+            'vmid', OLD.vmid, 'container_type', OLD.container_type
+        ),
+        json_object(
+            'vmid', NEW.vmid, 'container_type', NEW.container_type
+        ),
+        'Proxmox container ' || NEW.vmid || ' configuration updated'
+    );
+END;
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE type = 'trigger'
+AND name IN ('tr_update_timestamp_docker', 'tr_update_timestamp_proxmox', 'tr_proxmox_update_version');
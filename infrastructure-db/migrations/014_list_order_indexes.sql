@@ -0,0 +1,30 @@
+-- ============================================================================
+-- Infrastructure Database Migration 014: List Order Indexes
+-- Date: 2026-10-19
+--
+-- Changes:
+-- 1. idx_hosts_vmid: hosts in /api/hosts order (vmid, hostname, id)
+-- 2. idx_ip_network_address: a network's addresses in /api/topology order
+--    (ip_address, id); networks come in (vlan_id, id) order from
+--    idx_networks_vlan
+--
+-- The paged list endpoints order by raw columns so that each page is an
+-- index seek past the cursor that stops at the limit, instead of a scan and
+-- sort of the whole result. /api/containers needs no new index: it walks
+-- hosts by hostname and each host's containers by name through the UNIQUE
+-- constraints.
+-- ============================================================================
+
+BEGIN TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_hosts_vmid ON hosts(vmid, hostname);
+CREATE INDEX IF NOT EXISTS idx_ip_network_address ON ip_addresses(network_id, ip_address);
+
+COMMIT;
+
+-- ============================================================================
+-- POST-MIGRATION VERIFICATION QUERIES
+-- ============================================================================
+
+SELECT name FROM sqlite_master WHERE type = 'index'
+AND name IN ('idx_hosts_vmid', 'idx_ip_network_address');
@@ -229,3 +229,24 @@ JOIN hosts h1 ON dependent_svc.host_id = h1.id
 JOIN hosts h2 ON dependency_svc.host_id = h2.id
 WHERE h1.id != h2.id  -- Different hosts
 ORDER BY sd.dependency_type DESC, dependent_svc.service_name;
+
+-- =============================================================================
+-- BACKUP IMPACT ANALYSIS
+-- =============================================================================
+
+-- Query: Which containers use a volume or bind-mounted host path?
+-- Populated by Docker discovery from `docker inspect` Mounts
+--
+-- Example: What must be stopped/consistent when backing up /srv/immich?
+SELECT
+    docker_host,
+    container_name,
+    status,
+    mount_type,
+    COALESCE(volume_name, host_path) as source,
+    container_path,
+    read_only
+FROM v_docker_mounts
+WHERE host_path LIKE '/srv/immich%'
+   OR volume_name = 'immich_pgdata'
+ORDER BY docker_host, container_name;
@@ -281,3 +281,41 @@ LEFT JOIN hosts h1 ON ip1.host_id = h1.id
 LEFT JOIN hosts h2 ON ip2.host_id = h2.id
 WHERE h1.status = 'active' AND h2.status = 'active'
 ORDER BY n.network_name, h1.hostname, h2.hostname;
+
+-- =============================================================================
+-- NETWORK SWEEP RESULTS (discover_network.py, migration 009)
+-- =============================================================================
+
+-- Query: Live devices with no host record (unknown devices on the LAN)
+SELECT
+    ip_address,
+    mac_address,
+    allocation_type,
+    network_name,
+    last_seen_at
+FROM v_ip_inventory
+WHERE unknown_device = 1
+  AND last_seen_at >= datetime('now', '-1 day')
+ORDER BY cidr, ip_address;
+
+-- Query: Documented addresses that stopped answering the sweep
+SELECT
+    ip_address,
+    hostname,
+    purpose,
+    last_seen_at,
+    last_seen_hours_ago
+FROM v_ip_inventory
+WHERE unknown_device = 0
+  AND (last_seen_at IS NULL OR last_seen_at < datetime('now', '-1 hour'))
+ORDER BY last_seen_hours_ago DESC;
+
+-- Query: MAC addresses answering on more than one IP (multi-homed hosts, ARP spoofing)
+SELECT
+    mac_address,
+    COUNT(*) as ip_count,
+    GROUP_CONCAT(ip_address, ', ') as ip_addresses
+FROM ip_addresses
+WHERE mac_address IS NOT NULL
+GROUP BY mac_address
+HAVING COUNT(*) > 1;
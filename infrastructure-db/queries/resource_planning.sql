@@ -271,3 +271,30 @@ WHERE host_type IN ('vm', 'lxc', 'physical')
   AND status = 'active'
   AND cpu_cores IS NOT NULL
 ORDER BY estimated_monthly_cost_usd DESC;
+
+-- =============================================================================
+-- DOCKER IMAGE DISK USAGE
+-- =============================================================================
+
+-- Query: Reclaimable image space per Docker host (images no container uses)
+SELECT
+    docker_host,
+    image_count,
+    unused_count,
+    dangling_count,
+    ROUND(total_size_bytes / 1e9, 2) as total_gb,
+    ROUND(reclaimable_bytes / 1e9, 2) as reclaimable_gb
+FROM v_docker_image_reclaimable
+ORDER BY reclaimable_bytes DESC;
+
+-- Query: Largest unused images across all hosts
+SELECT
+    docker_host,
+    COALESCE(repository || ':' || tag, image_id) as image,
+    ROUND(size_bytes / 1e6) as size_mb,
+    ROUND(unique_size_bytes / 1e6) as unique_mb,
+    image_created_at
+FROM v_docker_images
+WHERE container_count = 0
+ORDER BY unique_size_bytes DESC
+LIMIT 20;